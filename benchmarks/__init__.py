@@ -0,0 +1,9 @@
+"""
+Benchmarks for the TaskFlow database layer.
+
+    python -m benchmarks run --users 3 --tasks 5000 --out base.json
+    python -m benchmarks compare base.json new.json
+
+Every run builds a fresh synthetic database (see datagen) in a temporary
+directory, so results never depend on, or touch, the app's own data.
+"""
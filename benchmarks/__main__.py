@@ -0,0 +1,90 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.datagen import DatasetSpec, populate
+from benchmarks.report import compare, format_comparison, format_results, load_results, save_results, summarize
+from benchmarks.scenarios import build_scenarios, run_scenario
+
+
+def run(args):
+    spec = DatasetSpec(
+        users=args.users, tasks_per_user=args.tasks, tags_per_task=(args.min_tags, args.max_tags),
+        tag_pool=args.tag_pool, description_words=(args.min_words, args.max_words), seed=args.seed
+    )
+
+    with tempfile.TemporaryDirectory(prefix="taskflow-bench-") as workdir:
+        # database.py resolves its app directory at import time
+        os.environ.setdefault("APPDATA", workdir)
+        from database import Database
+
+        db = Database(os.path.join(workdir, "bench.db"))
+        try:
+            start = time.perf_counter()
+            user_ids = populate(db, spec)
+            print(f"Generated {spec.users} x {spec.tasks_per_user} tasks in {time.perf_counter() - start:.1f}s")
+
+            results = {}
+            for scenario in build_scenarios(db, spec, user_ids):
+                if args.only and args.only not in scenario.name:
+                    continue
+                results[scenario.name] = summarize(run_scenario(scenario, args.repeat, args.warmup))
+        finally:
+            db.close()
+
+    print(format_results(results))
+    if args.out:
+        save_results(args.out, spec, results)
+        print(f"Saved {len(results)} scenario(s) to {args.out}")
+    return 0
+
+
+def compare_runs(args):
+    base, new = load_results(args.base), load_results(args.new)
+    if base['dataset'] != new['dataset']:
+        print("Warning: the runs used different datasets, timings may not be comparable")
+
+    rows = compare(base, new, args.metric, args.threshold)
+    print(format_comparison(rows, args.metric))
+
+    regressions = [row for row in rows if row[4] == 'regression']
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="TaskFlow database benchmarks.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_cmd = commands.add_parser('run', help="generate a dataset and time every scenario")
+    run_cmd.add_argument('--users', type=int, default=3)
+    run_cmd.add_argument('--tasks', type=int, default=5000, help="tasks per user")
+    run_cmd.add_argument('--min-tags', type=int, default=0)
+    run_cmd.add_argument('--max-tags', type=int, default=4)
+    run_cmd.add_argument('--tag-pool', type=int, default=300)
+    run_cmd.add_argument('--min-words', type=int, default=5, help="shortest description")
+    run_cmd.add_argument('--max-words', type=int, default=60, help="longest description")
+    run_cmd.add_argument('--seed', type=int, default=42)
+    run_cmd.add_argument('--repeat', type=int, default=20, help="timed calls per scenario")
+    run_cmd.add_argument('--warmup', type=int, default=2)
+    run_cmd.add_argument('--only', help="run scenarios whose name contains this")
+    run_cmd.add_argument('--out', help="write results to this JSON file")
+    run_cmd.set_defaults(run=run)
+
+    compare_cmd = commands.add_parser('compare', help="flag regressions between two result files")
+    compare_cmd.add_argument('base')
+    compare_cmd.add_argument('new')
+    compare_cmd.add_argument('--metric', default='p50_ms', choices=['p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'])
+    compare_cmd.add_argument('--threshold', type=float, default=0.10, help="fractional slowdown to flag")
+    compare_cmd.set_defaults(run=compare_runs)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
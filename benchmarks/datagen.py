@@ -0,0 +1,92 @@
+import random
+from datetime import datetime, timedelta
+
+import bcrypt
+
+CATEGORIES = ['Work', 'Personal', 'Study', 'Health', 'Finance', 'Errands', 'Home', 'Travel']
+STATUSES = ['To Do', 'In Progress', 'Done']
+STATUS_WEIGHTS = [5, 2, 3]
+
+WORDS = (
+    "plan review draft send call book fix update prepare submit report budget meeting "
+    "invoice groceries workout lecture notes project deadline client team design test "
+    "deploy release bug feature email slides paper garden doctor bank rent trip ticket "
+    "hotel flight car insurance tax form library exam chapter essay lab code refactor"
+).split()
+
+# Shared by every generated user; hashed once with a cheap cost
+PASSWORD = "benchmark"
+
+
+class DatasetSpec:
+    """Shape of a synthetic dataset; the same spec and seed give the same data."""
+
+    def __init__(self, users=3, tasks_per_user=5000, tags_per_task=(0, 4), tag_pool=300,
+                 description_words=(5, 60), deadline_days=(-60, 120), seed=42):
+        self.users = users
+        self.tasks_per_user = tasks_per_user
+        self.tags_per_task = tags_per_task
+        self.tag_pool = tag_pool
+        self.description_words = description_words
+        self.deadline_days = deadline_days
+        self.seed = seed
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def usernames(spec):
+    return [f"bench{n}" for n in range(1, spec.users + 1)]
+
+
+def generate_tasks(spec, rng, today):
+    # Task dicts shaped like Database.add_task's input
+    # Tag popularity is skewed like real data: a few tags are on most tasks
+    tags = [f"tag{n}" for n in range(spec.tag_pool)]
+    tag_weights = [1 / (rank + 1) for rank in range(spec.tag_pool)]
+
+    for _ in range(spec.tasks_per_user):
+        tag_count = rng.randint(*spec.tags_per_task)
+        task_tags = list(dict.fromkeys(rng.choices(tags, tag_weights, k=tag_count)))
+
+        deadline = today + timedelta(
+            days=rng.randint(*spec.deadline_days),
+            minutes=rng.randrange(0, 24 * 60, 15)
+        )
+        yield {
+            'title': " ".join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize(),
+            'category': rng.choice(CATEGORIES),
+            'status': rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+            'deadline': deadline.strftime("%Y-%m-%d %H:%M"),
+            'description': " ".join(rng.choices(WORDS, k=rng.randint(*spec.description_words))),
+            'tags': task_tags,
+        }
+
+
+def populate(db, spec):
+    """
+    Fill an empty database according to spec.
+
+    Deadlines are spread around today's date so timeframe filters always
+    have matches. Returns {username: user_id}.
+    """
+    rng = random.Random(spec.seed)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=4)).decode('utf-8')
+
+    user_ids = {}
+    conn = db.get_connection()
+    try:
+        for name in usernames(spec):
+            cursor = conn.execute(
+                "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?) RETURNING id",
+                (name, f"{name}@example.com", password_hash)
+            )
+            user_ids[name] = cursor.fetchall()[0]['id']
+        conn.commit()
+    finally:
+        db.release_connection(conn)
+
+    for user_id in user_ids.values():
+        db.add_tasks_bulk(generate_tasks(spec, rng, today), user_id, batch_size=1000)
+    return user_ids
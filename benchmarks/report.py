@@ -0,0 +1,85 @@
+import json
+import platform
+import sqlite3
+from datetime import datetime
+
+from utils.query_trace import percentile
+
+
+def summarize(durations):
+    # Latency summary in milliseconds
+    ordered = sorted(durations)
+    return {
+        'runs': len(ordered),
+        'min_ms': ordered[0] * 1000,
+        'p50_ms': percentile(ordered, 50) * 1000,
+        'p95_ms': percentile(ordered, 95) * 1000,
+        'p99_ms': percentile(ordered, 99) * 1000,
+        'max_ms': ordered[-1] * 1000,
+        'mean_ms': sum(ordered) / len(ordered) * 1000,
+    }
+
+
+def save_results(path, spec, results):
+    # Results plus enough context to tell whether two runs are comparable
+    document = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'dataset': spec.as_dict(),
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(base, new, metric='p50_ms', threshold=0.10, min_delta_ms=0.05):
+    """
+    Compare two result documents scenario by scenario.
+
+    Returns a list of (name, base_ms, new_ms, change, verdict) where verdict
+    is 'regression', 'improvement' or 'same'. Changes under threshold (a
+    fraction) or under min_delta_ms are treated as noise.
+    """
+    rows = []
+    for name in sorted(base['results'].keys() | new['results'].keys()):
+        old = base['results'].get(name)
+        cur = new['results'].get(name)
+        if old is None or cur is None:
+            rows.append((name, old and old[metric], cur and cur[metric], None, 'missing'))
+            continue
+
+        before, after = old[metric], cur[metric]
+        change = (after - before) / before if before else 0.0
+        verdict = 'same'
+        if abs(after - before) >= min_delta_ms:
+            if change > threshold:
+                verdict = 'regression'
+            elif change < -threshold:
+                verdict = 'improvement'
+        rows.append((name, before, after, change, verdict))
+    return rows
+
+
+def format_results(results):
+    lines = [f"{'scenario':<56} {'runs':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"]
+    for name, s in results.items():
+        lines.append(f"{name:<56} {s['runs']:>5} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} "
+                     f"{s['p99_ms']:>9.3f} {s['max_ms']:>9.3f}")
+    return "\n".join(lines)
+
+
+def format_comparison(rows, metric='p50_ms'):
+    lines = [f"{'scenario':<56} {'base ' + metric:>12} {'new ' + metric:>12} {'change':>8}  verdict"]
+    for name, before, after, change, verdict in rows:
+        before_s = f"{before:.3f}" if before is not None else "-"
+        after_s = f"{after:.3f}" if after is not None else "-"
+        change_s = f"{change:+.0%}" if change is not None else "-"
+        lines.append(f"{name:<56} {before_s:>12} {after_s:>12} {change_s:>8}  {verdict}")
+    return "\n".join(lines)
@@ -0,0 +1,163 @@
+import itertools
+import random
+import time
+from datetime import datetime
+
+from benchmarks.datagen import PASSWORD, generate_tasks, usernames
+
+
+class Scenario:
+    """
+    One timed operation.
+
+    run() is timed; prepare(), if given, runs untimed before every call.
+    Read scenarios use it to empty the query cache so they measure SQLite.
+    """
+
+    def __init__(self, name, run, prepare=None, repeat=None):
+        self.name = name
+        self.run = run
+        self.prepare = prepare
+        self.repeat = repeat
+
+
+def filter_combinations():
+    # Every on/off combination of the FilterBar filters, over each timeframe
+    for category, status, tag, timeframe, search in itertools.product(
+            [None, 'Work'], [None, 'To Do'], [None, 'tag1'],
+            ['Any Time', 'Overdue', 'Due Today', 'Next 7 Days'], [None, 'report']):
+        filters = {'timeframe': timeframe}
+        parts = []
+        if category:
+            filters['category'] = category
+            parts.append('category')
+        if status:
+            filters['status'] = status
+            parts.append('status')
+        if tag:
+            filters['tag'] = tag
+            parts.append('tag')
+        if timeframe != 'Any Time':
+            parts.append(timeframe.lower().replace(' ', '_'))
+        if search:
+            filters['search'] = search
+            parts.append('search')
+        yield "+".join(parts) or "none", filters
+
+
+def build_scenarios(db, spec, user_ids):
+    """Scenarios covering every public Database query and write method."""
+    user_id = user_ids[usernames(spec)[0]]
+    rng = random.Random(spec.seed + 1)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    task_ids = [row['id'] for row in db.get_all_tasks(user_id)]
+    clear = db.cache.clear
+
+    def new_task():
+        return next(generate_tasks(spec, rng, today))
+
+    scenarios = []
+    add = scenarios.append
+
+    # Reads
+    for label, filters in filter_combinations():
+        add(Scenario(f"get_filtered_tasks[{label}]", lambda f=filters: db.get_filtered_tasks(user_id, f), clear))
+    add(Scenario("get_filtered_tasks[cached]", lambda: db.get_filtered_tasks(user_id, {'category': 'Work'})))
+
+    middle = db.get_tasks_page(user_id, None, None, len(task_ids) // 2)[-1]
+    add(Scenario("get_tasks_page[first]", lambda: db.get_tasks_page(user_id), clear))
+    add(Scenario("get_tasks_page[middle]",
+                 lambda: db.get_tasks_page(user_id, None, (middle['deadline_ts'], middle['id'])), clear))
+    add(Scenario("iter_tasks[all]", lambda: list(db.iter_tasks(user_id)), clear, repeat=5))
+    add(Scenario("count_tasks[none]", lambda: db.count_tasks(user_id), clear))
+    add(Scenario("count_tasks[category+status]",
+                 lambda: db.count_tasks(user_id, {'category': 'Work', 'status': 'Done'}), clear))
+    add(Scenario("count_tasks[search]", lambda: db.count_tasks(user_id, {'search': 'report'}), clear))
+    add(Scenario("get_tasks_page[search]", lambda: db.get_tasks_page(user_id, {'search': 'report'}), clear))
+    add(Scenario("get_all_tasks", lambda: db.get_all_tasks(user_id), clear, repeat=5))
+    add(Scenario("get_tasks_with_tags", lambda: db.get_tasks_with_tags(user_id), clear, repeat=5))
+    add(Scenario("get_all_categories", lambda: db.get_all_categories(user_id), clear))
+    add(Scenario("search_tasks[word]", lambda: db.search_tasks(user_id, 'report'), clear))
+    add(Scenario("search_tasks[prefix]", lambda: db.search_tasks(user_id, 'rep'), clear))
+    add(Scenario("get_analytics", lambda: db.get_analytics(user_id), clear))
+    add(Scenario("get_due_today", lambda: db.get_due_today(user_id), clear))
+    add(Scenario("check_task_stats", db.check_task_stats, repeat=5))
+    add(Scenario("get_user_by_username", lambda: db.get_user_by_username(usernames(spec)[0])))
+    add(Scenario("get_user_by_email", lambda: db.get_user_by_email(f"{usernames(spec)[0]}@example.com")))
+    add(Scenario("verify_user", lambda: db.verify_user(usernames(spec)[0], PASSWORD), repeat=10))
+
+    # Writes
+    add(Scenario("add_task", lambda: db.add_task(new_task(), user_id)))
+    add(Scenario("add_tasks_bulk[1000]",
+                 lambda: db.add_tasks_bulk((new_task() for _ in range(1000)), user_id), repeat=5))
+
+    def update_task():
+        task = new_task()
+        db.update_task(rng.choice(task_ids), task)
+    add(Scenario("update_task", update_task))
+
+    add(Scenario("update_status",
+                 lambda: db.update_status(rng.choice(task_ids), rng.choice(['To Do', 'In Progress', 'Done']))))
+    add(Scenario("update_statuses[100]",
+                 lambda: db.update_statuses({task_id: 'In Progress' for task_id in rng.sample(task_ids, 100)})))
+    add(Scenario("update_status_bulk[1000]",
+                 lambda: db.update_status_bulk(rng.sample(task_ids, 1000), rng.choice(['To Do', 'In Progress', 'Done']))))
+    add(Scenario("update_category_bulk[1000]",
+                 lambda: db.update_category_bulk(rng.sample(task_ids, 1000), rng.choice(['Work', 'Home']))))
+    add(Scenario("add_tags_bulk[1000]",
+                 lambda: db.add_tags_bulk(rng.sample(task_ids, 1000), f"tag{rng.randrange(spec.tag_pool)}")))
+    add(Scenario("remove_tags_bulk[1000]",
+                 lambda: db.remove_tags_bulk(rng.sample(task_ids, 1000), f"tag{rng.randrange(spec.tag_pool)}")))
+
+    def set_task_tags():
+        conn = db.get_connection()
+        try:
+            tags = [f"tag{n}" for n in rng.sample(range(spec.tag_pool), 3)]
+            db.set_task_tags(conn, rng.choice(task_ids), tags)
+            conn.commit()
+        finally:
+            db.release_connection(conn)
+    add(Scenario("set_task_tags", set_task_tags))
+
+    # Each delete removes a task created untimed just before it
+    doomed = []
+    def create_doomed():
+        db.add_task(new_task(), user_id)
+        doomed.append(db.get_all_tasks(user_id)[-1]['id'])
+    add(Scenario("delete_task", lambda: db.delete_task(doomed.pop()), create_doomed))
+
+    # Each bulk delete removes 1000 tasks created untimed just before it
+    doomed_batch = []
+    def create_doomed_batch():
+        db.add_tasks_bulk((new_task() for _ in range(1000)), user_id)
+        doomed_batch[:] = [row['id'] for row in db.get_all_tasks(user_id)[-1000:]]
+    add(Scenario("delete_tasks_bulk[1000]", lambda: db.delete_tasks_bulk(doomed_batch), create_doomed_batch, repeat=5))
+
+    add(Scenario("rebuild_task_stats", db.rebuild_task_stats, repeat=5))
+
+    # bcrypt at the app's cost dominates these
+    counter = itertools.count()
+    def create_user():
+        n = next(counter)
+        db.create_user(f"new{n}", f"new{n}@example.com", PASSWORD)
+    add(Scenario("create_user", create_user, repeat=3))
+    last_user = usernames(spec)[-1]
+    add(Scenario("update_credentials",
+                 lambda: db.update_credentials(user_ids[last_user], last_user, PASSWORD), repeat=3))
+
+    return scenarios
+
+
+def run_scenario(scenario, repeat=20, warmup=2):
+    # Durations in seconds of the timed calls, warmup calls excluded
+    repeat = scenario.repeat or repeat
+    durations = []
+    for i in range(warmup + repeat):
+        if scenario.prepare:
+            scenario.prepare()
+        start = time.perf_counter()
+        scenario.run()
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            durations.append(elapsed)
+    return durations
@@ -1,9 +1,17 @@
 import sqlite3
-import bcrypt
 from datetime import datetime, timedelta
 import os
 from pathlib import Path
 import stat
+import threading
+import time
+import functools
+from itertools import islice
+from utils.query_cache import QueryCache
+from utils.query_trace import QueryTracer
+from utils.hashing import PasswordHasher, load_rounds
+from utils.tags import tag_key, parse_tag_filter, prefix_upper_bound, merge_tag_case_duplicates
+from utils.config import DB_BACKEND, DB_HOST, DB_NAME, DB_USER, DB_PASS, DB_PORT, DB_POOL_MAX
 
 APP_NAME = "TaskFlow"
 
@@ -14,16 +22,627 @@ app_data.mkdir(parents=True, exist_ok=True)
 # Database file path
 DB_FILE = app_data / ".syscache" 
 
-class Database:
-    def __init__(self):
-        # Initialize database and tables
-        self.init_db()
+# Slow-query log, written only when TASKFLOW_TRACE is set
+TRACE_LOG = app_data / "slow_queries.log"
 
-    def get_connection(self):
+# bcrypt cost calibrated for this machine
+HASH_COST_FILE = app_data / "hash_cost.json"
+
+def fts5_available(cursor):
+    # Not every SQLite build ships the FTS5 extension
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        cursor.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def create_task_search(cursor):
+    # Full-text index over task text, kept in sync with tasks by triggers
+    if not fts5_available(cursor):
+        print("FTS5 unavailable, task search falls back to LIKE")
+        return
+
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            title, category, description,
+            content='tasks', content_rowid='id',
+            prefix='2 3'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, title, category, description)
+            VALUES (new.id, new.title, new.category, new.description);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, category, description)
+            VALUES ('delete', old.id, old.title, old.category, old.description);
+        END
+    ''')
+    # Status and deadline changes never touch the index
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update
+        AFTER UPDATE OF title, category, description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, title, category, description)
+            VALUES ('delete', old.id, old.title, old.category, old.description);
+            INSERT INTO tasks_fts (rowid, title, category, description)
+            VALUES (new.id, new.title, new.category, new.description);
+        END
+    ''')
+    # Index the rows that already exist
+    cursor.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+def create_tag_trigrams(cursor):
+    # Trigram index over tag keys for substring tag filters, kept by triggers
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS tags_trigram USING fts5(
+                key, content='tags', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError:
+        # FTS5 missing, or a build older than the trigram tokenizer (3.34)
+        print("Trigram tokenizer unavailable, substring tag filters scan tags")
+        return
+
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tags_trigram_insert AFTER INSERT ON tags BEGIN
+            INSERT INTO tags_trigram (rowid, key) VALUES (new.id, new.key);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tags_trigram_delete AFTER DELETE ON tags BEGIN
+            INSERT INTO tags_trigram (tags_trigram, rowid, key) VALUES ('delete', old.id, old.key);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tags_trigram_update AFTER UPDATE OF key ON tags BEGIN
+            INSERT INTO tags_trigram (tags_trigram, rowid, key) VALUES ('delete', old.id, old.key);
+            INSERT INTO tags_trigram (rowid, key) VALUES (new.id, new.key);
+        END
+    ''')
+    cursor.execute("INSERT INTO tags_trigram (tags_trigram) VALUES ('rebuild')")
+
+
+def create_tag_refcounts(cursor):
+    # Tasks linked to each tag, kept by triggers; 0 marks an orphan to sweep
+    cursor.execute("ALTER TABLE tags ADD COLUMN ref_count INTEGER NOT NULL DEFAULT 0")
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tags_ref_insert AFTER INSERT ON task_tags BEGIN
+            UPDATE tags SET ref_count = ref_count + 1 WHERE id = new.tag_id;
+        END
+    ''')
+    # Also fires for links removed by ON DELETE CASCADE from tasks
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tags_ref_delete AFTER DELETE ON task_tags BEGIN
+            UPDATE tags SET ref_count = ref_count - 1 WHERE id = old.tag_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tags_ref_update AFTER UPDATE OF tag_id ON task_tags BEGIN
+            UPDATE tags SET ref_count = ref_count - 1 WHERE id = old.tag_id;
+            UPDATE tags SET ref_count = ref_count + 1 WHERE id = new.tag_id;
+        END
+    ''')
+    cursor.execute(RECOUNT_TAG_REFS)
+
+
+# Recompute every tag's reference count straight from task_tags
+RECOUNT_TAG_REFS = '''
+    UPDATE tags SET ref_count = (SELECT COUNT(*) FROM task_tags tt WHERE tt.tag_id = tags.id)
+'''
+
+
+def create_task_stats(cursor):
+    # Per-user rollup of task counts by category and status, kept by triggers
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_stats (
+            user_id INTEGER NOT NULL,
+            category TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, category, status)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS task_stats_insert
+        AFTER INSERT ON tasks WHEN new.user_id IS NOT NULL BEGIN
+            INSERT INTO task_stats (user_id, category, status, count)
+            VALUES (new.user_id, new.category, new.status, 1)
+            ON CONFLICT (user_id, category, status) DO UPDATE SET count = count + 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS task_stats_delete
+        AFTER DELETE ON tasks WHEN old.user_id IS NOT NULL BEGIN
+            UPDATE task_stats SET count = count - 1
+            WHERE user_id = old.user_id AND category = old.category AND status = old.status;
+            DELETE FROM task_stats
+            WHERE user_id = old.user_id AND category = old.category AND status = old.status
+            AND count <= 0;
+        END
+    ''')
+    # Title, deadline and description edits leave the counts alone
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS task_stats_update
+        AFTER UPDATE OF user_id, category, status ON tasks BEGIN
+            UPDATE task_stats SET count = count - 1
+            WHERE user_id = old.user_id AND category = old.category AND status = old.status;
+            DELETE FROM task_stats
+            WHERE user_id = old.user_id AND category = old.category AND status = old.status
+            AND count <= 0;
+            INSERT INTO task_stats (user_id, category, status, count)
+            SELECT new.user_id, new.category, new.status, 1 WHERE new.user_id IS NOT NULL
+            ON CONFLICT (user_id, category, status) DO UPDATE SET count = count + 1;
+        END
+    ''')
+    cursor.execute(REBUILD_TASK_STATS)
+
+
+# Recompute every rollup row straight from tasks
+REBUILD_TASK_STATS = '''
+    INSERT INTO task_stats (user_id, category, status, count)
+    SELECT user_id, category, status, COUNT(*) FROM tasks
+    WHERE user_id IS NOT NULL
+    GROUP BY user_id, category, status
+'''
+
+
+def create_done_at(cursor):
+    # When each task was last marked Done, kept by triggers; the archiver's clock
+    cursor.execute("ALTER TABLE tasks ADD COLUMN done_at INTEGER")
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_done_insert
+        AFTER INSERT ON tasks WHEN new.status = 'Done' BEGIN
+            UPDATE tasks SET done_at = CAST(strftime('%s', 'now') AS INTEGER) WHERE id = new.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_done_update
+        AFTER UPDATE OF status ON tasks WHEN new.status IS NOT old.status BEGIN
+            UPDATE tasks SET done_at = CASE WHEN new.status = 'Done'
+                THEN CAST(strftime('%s', 'now') AS INTEGER) END
+            WHERE id = new.id;
+        END
+    ''')
+    # Nothing records when existing tasks were finished; the deadline is the
+    # best guess, and deadlines still ahead count as now
+    now = int(time.time())
+    cursor.execute("UPDATE tasks SET done_at = MIN(COALESCE(deadline_ts, ?), ?) WHERE status = 'Done'", (now, now))
+
+
+def create_archive_schema(cursor, fts=True):
+    # Tables of the attached archive database. Run at every startup, since
+    # the archive file comes and goes independently of the main one.
+    # Archived rows are never updated, only inserted and deleted.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archive.archived_tasks (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER,
+            title TEXT NOT NULL,
+            category TEXT NOT NULL,
+            status TEXT NOT NULL,
+            deadline TEXT NOT NULL,
+            deadline_ts INTEGER,
+            deadline_tz TEXT,
+            description TEXT NOT NULL,
+            tags TEXT,
+            tag_keys TEXT,
+            done_at INTEGER,
+            archived_at INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS archive.idx_archived_user_deadline_ts ON archived_tasks(user_id, deadline_ts)"
+    )
+
+    # The archive file keeps its own schema version, like the main one
+    cursor.execute("PRAGMA archive.user_version")
+    archive_version = cursor.fetchone()['user_version']
+    for version, description, steps in ARCHIVE_MIGRATIONS:
+        if archive_version < version:
+            for step in steps:
+                cursor.execute(step)
+            cursor.execute(f"PRAGMA archive.user_version = {version}")
+
+    cursor.execute("SELECT 1 FROM archive.sqlite_master WHERE name = 'archived_fts'")
+    if not fts or cursor.fetchone():
+        return
+
+    cursor.execute('''
+        CREATE VIRTUAL TABLE archive.archived_fts USING fts5(
+            title, category, description,
+            content='archived_tasks', content_rowid='id',
+            prefix='2 3'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS archive.archived_fts_insert AFTER INSERT ON archived_tasks BEGIN
+            INSERT INTO archived_fts (rowid, title, category, description)
+            VALUES (new.id, new.title, new.category, new.description);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS archive.archived_fts_delete AFTER DELETE ON archived_tasks BEGIN
+            INSERT INTO archived_fts (archived_fts, rowid, title, category, description)
+            VALUES ('delete', old.id, old.title, old.category, old.description);
+        END
+    ''')
+    cursor.execute("INSERT INTO archived_fts (archived_fts) VALUES ('rebuild')")
+
+
+def create_change_log(cursor):
+    # Append-only log of task changes, filled by triggers; the AUTOINCREMENT
+    # version only grows, and writers commit one at a time, so versions
+    # become visible in order
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_changes (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL,
+            user_id INTEGER,
+            op TEXT NOT NULL,
+            changed_at INTEGER NOT NULL
+        )
+    ''')
+    # Highest version pruning has removed; readers behind it must reload
+    cursor.execute("CREATE TABLE IF NOT EXISTS task_changes_pruned (version INTEGER NOT NULL)")
+    cursor.execute("INSERT INTO task_changes_pruned (version) VALUES (0)")
+
+    now = "CAST(strftime('%s', 'now') AS INTEGER)"
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS task_changes_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO task_changes (task_id, user_id, op, changed_at)
+            VALUES (new.id, new.user_id, 'insert', {now});
+        END
+    ''')
+    # done_at is bookkeeping of its own triggers, not a visible change
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS task_changes_update
+        AFTER UPDATE OF title, category, status, deadline, deadline_ts, deadline_tz, description ON tasks BEGIN
+            INSERT INTO task_changes (task_id, user_id, op, changed_at)
+            VALUES (new.id, new.user_id, 'update', {now});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS task_changes_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO task_changes (task_id, user_id, op, changed_at)
+            VALUES (old.id, old.user_id, 'delete', {now});
+        END
+    ''')
+    # Tag links changing are updates of their task; links removed by a
+    # cascading task delete find no task and log nothing
+    for event, row in (('INSERT', 'new'), ('DELETE', 'old')):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS task_changes_tag_{event.lower()} AFTER {event} ON task_tags BEGIN
+                INSERT INTO task_changes (task_id, user_id, op, changed_at)
+                SELECT id, user_id, 'update', {now} FROM tasks WHERE id = {row}.task_id;
+            END
+        ''')
+
+
+def parse_tags(value):
+    # Accept "a, b" strings or lists; strip blanks and keep the first spelling
+    # of each tag, since tags differing only in case are the same tag
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+
+    names = {}
+    for tag in value:
+        tag = tag.strip() if tag else ''
+        if tag:
+            names.setdefault(tag_key(tag), tag)
+    return list(names.values())
+
+
+def escape_like(text):
+    # Literal text for a LIKE pattern with ESCAPE '\'
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def archived_tag_pattern(text):
+    # LIKE pattern over an archived task's tag_keys (", a, b,") for FilterBar
+    # tag text, in the same exact/prefix/substring modes as live tags
+    key, mode = parse_tag_filter(text)
+    if not key:
+        return None
+
+    key = escape_like(key)
+    if mode == 'exact':
+        return f"%, {key},%"
+    if mode == 'prefix':
+        return f"%, {key}%"
+    return f"%{key}%"
+
+
+def build_fts_query(text):
+    # Each word becomes a quoted prefix term; all of them must match
+    terms = [t.replace('"', '""') for t in text.split()]
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+# Matching task ids with BM25 rank (title weighted over category over description)
+# and a highlighted excerpt, for search_tasks' best-first ordering.
+# Materialized because snippet() only works directly against the FTS table.
+TASK_HITS_CTE = '''
+    WITH hits AS MATERIALIZED (
+        SELECT
+            rowid AS task_id,
+            bm25(tasks_fts, 10.0, 5.0, 1.0) AS rank,
+            snippet(tasks_fts, -1, '[', ']', '…', 10) AS snippet
+        FROM tasks_fts
+        WHERE tasks_fts MATCH ?
+    )
+'''
+
+# Highlighted excerpts of the hits among the task ids in a `matches` CTE.
+# One pass over the FTS hits; the unary + keeps the rowid test out of the
+# FTS lookup, so snippet() runs only for the rows being returned.
+SNIPPETS_SQL = '''
+    SELECT rowid AS task_id, snippet({fts}, -1, '[', ']', '…', 10) AS snippet
+    FROM {schema}{fts}
+    WHERE {fts} MATCH ? AND +rowid IN (SELECT id FROM matches)
+'''
+TASK_SNIPPETS_SQL = SNIPPETS_SQL.format(schema='', fts='tasks_fts')
+ARCHIVE_SNIPPETS_SQL = SNIPPETS_SQL.format(schema='archive.', fts='archived_fts')
+
+# Tags of t as one string; a correlated subquery keeps the outer query free of
+# GROUP BY so ORDER BY ... LIMIT can stop early on the deadline index
+TASK_TAGS_COLUMN = '''(
+    SELECT {concat} FROM task_tags tt
+    JOIN tags tg ON tt.tag_id = tg.id
+    WHERE tt.task_id = t.id
+) AS tags'''
+
+# Tag keys of t as ", a, b,", the form archived tasks keep them in
+TASK_TAG_KEYS_COLUMN = '''(
+    SELECT ', ' || {concat} || ',' FROM task_tags tt
+    JOIN tags tg ON tt.tag_id = tg.id
+    WHERE tt.task_id = t.id
+)'''
+
+def parse_deadline(value):
+    """
+    Normalize a deadline string to (deadline_ts, deadline_tz).
+
+    deadline_ts is the UTC epoch second; deadline_tz is the UTC offset it was
+    entered in, e.g. "+02:00". Values without an offset are local time.
+    Raises ValueError for anything that is not an ISO date or date-time.
+    """
+    dt = datetime.fromisoformat(str(value).strip())
+    if dt.tzinfo is None:
+        dt = dt.astimezone()
+
+    offset = dt.strftime('%z')
+    return int(dt.timestamp()), f"{offset[:3]}:{offset[3:]}"
+
+
+# Longest reminder offset in minutes, so reminder lookups can bound their
+# scan of the deadline index
+MAX_REMIND_BEFORE = 7 * 24 * 60
+
+def parse_remind_before(value):
+    # Minutes before the deadline to remind: None for the default, -1 for no
+    # reminder, otherwise clamped to 0..MAX_REMIND_BEFORE
+    if value is None or value == '':
+        return None
+    minutes = int(value)
+    if minutes < 0:
+        return -1
+    return min(minutes, MAX_REMIND_BEFORE)
+
+
+def local_day_start(days=0):
+    # Epoch second of local midnight, `days` days from today
+    midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return int((midnight + timedelta(days=days)).timestamp())
+
+
+def backfill_deadline_ts(cursor):
+    # Parse every stored deadline once; unparseable values are left NULL
+    cursor.execute("SELECT id, deadline FROM tasks")
+    rows = []
+    skipped = 0
+    for row in cursor.fetchall():
+        try:
+            rows.append((*parse_deadline(row['deadline']), row['id']))
+        except ValueError:
+            skipped += 1
+    cursor.executemany("UPDATE tasks SET deadline_ts = ?, deadline_tz = ? WHERE id = ?", rows)
+    if skipped:
+        print(f"Migration Warning: {skipped} task deadline(s) could not be parsed")
+
+
+# Default number of rows per page for paged task queries
+PAGE_SIZE = 200
+
+# Seconds cached reads trust the last change log version read before
+# reading it again; writes by other processes show up within this long
+CACHE_VERSION_TTL = 2
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version.
+# Each entry is (version, description, steps); a step is a SQL string or a
+# callable that receives the open cursor. Never edit a shipped entry, add a new one.
+MIGRATIONS = [
+    (1, "Secondary indexes for per-user task queries", [
+        # (user_id, deadline) also serves plain user_id lookups
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_deadline ON tasks(user_id, deadline)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_status ON tasks(user_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_category_status ON tasks(user_id, category, status)",
+        "CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags(tag_id)",
+    ]),
+    (2, "FTS5 full-text search over tasks", [
+        create_task_search,
+    ]),
+    (3, "Trigger-maintained task_stats rollups", [
+        create_task_stats,
+    ]),
+    (4, "Integer epoch deadlines", [
+        "ALTER TABLE tasks ADD COLUMN deadline_ts INTEGER",
+        "ALTER TABLE tasks ADD COLUMN deadline_tz TEXT",
+        backfill_deadline_ts,
+        # Timeframe filters and (deadline_ts, id) ordering are range scans on this
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_deadline_ts ON tasks(user_id, deadline_ts)",
+        "DROP INDEX IF EXISTS idx_tasks_user_deadline",
+    ]),
+    (5, "Case-insensitive tag keys", [
+        "ALTER TABLE tags ADD COLUMN key TEXT",
+        merge_tag_case_duplicates,
+        # Exact and prefix tag filters are lookups and range scans on this
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_tags_key ON tags(key)",
+        create_tag_trigrams,
+    ]),
+    (6, "Tag reference counts", [
+        create_tag_refcounts,
+        # The sweeper's only access path: orphans, without scanning live tags
+        "CREATE INDEX IF NOT EXISTS idx_tags_orphans ON tags(id) WHERE ref_count = 0",
+    ]),
+    (7, "Completion times for archiving", [
+        create_done_at,
+        # The archiver's scan: finished tasks, longest finished first
+        "CREATE INDEX IF NOT EXISTS idx_tasks_done_at ON tasks(done_at) WHERE status = 'Done'",
+    ]),
+    (8, "Task change log", [
+        create_change_log,
+        # get_changes_since reads one user's entries after a version
+        "CREATE INDEX IF NOT EXISTS idx_task_changes_user_version ON task_changes(user_id, version)",
+    ]),
+    (9, "Task reminder offsets", [
+        "ALTER TABLE tasks ADD COLUMN remind_before INTEGER",
+        # Reminder edits reschedule, so the change log records them too
+        "DROP TRIGGER IF EXISTS task_changes_update",
+        '''CREATE TRIGGER task_changes_update
+        AFTER UPDATE OF title, category, status, deadline, deadline_ts, deadline_tz, description, remind_before
+        ON tasks BEGIN
+            INSERT INTO task_changes (task_id, user_id, op, changed_at)
+            VALUES (new.id, new.user_id, 'update', CAST(strftime('%s', 'now') AS INTEGER));
+        END''',
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Migrations of the attached archive file, tracked with archive.user_version
+# and applied by create_archive_schema
+ARCHIVE_MIGRATIONS = [
+    (1, "Task reminder offsets", [
+        "ALTER TABLE archive.archived_tasks ADD COLUMN remind_before INTEGER",
+    ]),
+]
+
+def cache_key(value):
+    # Hashable, order-independent form of query arguments
+    if isinstance(value, dict):
+        return tuple(sorted((k, cache_key(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(cache_key(v) for v in value)
+    return value
+
+
+def cached_query(method):
+    # Serve a per-user read through Database.cache
+    @functools.wraps(method)
+    def wrapper(self, user_id, *args, **kwargs):
+        key = (method.__name__, cache_key(args), cache_key(kwargs))
+
+        # Timeframe filters compare against the clock, so results expire each minute
+        filters = args[0] if args and isinstance(args[0], dict) else kwargs.get('filters')
+        if filters and filters.get('timeframe') not in (None, '', 'Any Time'):
+            key += (datetime.now().strftime("%Y-%m-%d %H:%M"),)
+
+        return self.cache.get_or_load(user_id, key, lambda: method(self, user_id, *args, **kwargs),
+                                      version=self._cache_version())
+    return wrapper
+
+
+class Record(tuple):
+    """
+    Compact, read-only query row.
+
+    Values live in the tuple itself; column names are resolved through a
+    map shared by every row with the same layout, so a row costs about as
+    much as a plain tuple. Supports row['col'], row.get(), keys(), values(),
+    items() and dict(row); iterating yields values, like sqlite3.Row.
+    """
+    __slots__ = ()
+    _columns = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._columns[key])
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        index = self._columns.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def __contains__(self, key):
+        return key in self._columns
+
+    def keys(self):
+        return self._columns.keys()
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._columns, self)
+
+    def __repr__(self):
+        return f"Record({dict(self.items())!r})"
+
+
+# Record subclass per column layout; the last one used is checked by identity
+# first since consecutive rows almost always come from the same statement
+_record_classes = {}
+_last_record_class = (None, None)
+
+
+def record_factory(cursor, row):
+    # Row factory building Record rows with a cached column map
+    global _last_record_class
+    description, cls = _last_record_class
+    if cursor.description is not description:
+        description = cursor.description
+        names = tuple(col[0] for col in description)
+        cls = _record_classes.get(names)
+        if cls is None:
+            columns = {name: idx for idx, name in enumerate(names)}
+            cls = _record_classes[names] = type('Record', (Record,), {'__slots__': (), '_columns': columns})
+        _last_record_class = (description, cls)
+    return cls(row)
+
+
+class ConnectionManager:
+    """Hands out one long-lived connection per thread, configured once."""
+
+    def __init__(self, db_file, row_factory, health_check_interval=30, on_open=None):
+        self.db_file = db_file
+        self.row_factory = row_factory
+        self.health_check_interval = health_check_interval
+        self.on_open = on_open
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._closed = False
+
+        # Usage counters (see get_stats)
+        self.opened = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def _open(self):
         # Create and configure a database connection
         try:
-            conn = sqlite3.connect(DB_FILE, timeout=10)
-            conn.row_factory = self.dict_factory
+            conn = sqlite3.connect(self.db_file, timeout=10, check_same_thread=False)
+            conn.row_factory = self.row_factory
 
             conn.execute("PRAGMA foreign_keys = ON")
             conn.execute("PRAGMA journal_mode = WAL")
@@ -31,24 +650,149 @@ class Database:
             conn.execute("PRAGMA temp_store = MEMORY")
             conn.execute("PRAGMA secure_delete = ON")
 
-            return conn
+            # secure_delete rewrites freed pages, so deletes bloat the WAL;
+            # cap what stays on disk after each checkpoint resets it
+            conn.execute("PRAGMA journal_size_limit = 8388608")
+
+            if self.on_open:
+                self.on_open(conn)
         except Exception as e:
             print(f"Connection Error: {e}")
             raise
 
-    def dict_factory(self, cursor, row):
-        # Convert query results into dictionaries
-        d = {}
-        for idx, col in enumerate(cursor.description):
-            d[col[0]] = row[idx]
-        return d
-    
-    def secure_db_file(self):
-        # Restrict database file permissions
-        if DB_FILE.exists():
-            os.chmod(DB_FILE, stat.S_IREAD | stat.S_IWRITE)
+        with self._lock:
+            self._connections.append(conn)
+            self.opened += 1
+        return conn
 
-    def init_db(self):
+    def _is_healthy(self, conn):
+        # Cheap round trip, only run once the connection has been idle a while
+        if time.monotonic() - self._local.checked_at < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        self._local.checked_at = time.monotonic()
+        return True
+
+    def _discard(self, conn):
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+            self.discarded += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def acquire(self):
+        # Return this thread's connection, opening it on first use
+        if self._closed:
+            raise sqlite3.ProgrammingError("Database has been closed")
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            if self._is_healthy(conn):
+                with self._lock:
+                    self.reused += 1
+                return conn
+            self._discard(conn)
+
+        conn = self._open()
+        self._local.conn = conn
+        self._local.checked_at = time.monotonic()
+        return conn
+
+    def release(self, conn):
+        # Drop any work the caller left uncommitted so the next caller starts clean
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            self._local.conn = None
+
+    def close_all(self):
+        # Close every connection opened by any thread
+        with self._lock:
+            self._closed = True
+            connections, self._connections = self._connections, []
+
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'opened': self.opened,
+                'reused': self.reused,
+                'discarded': self.discarded,
+                'open_now': len(self._connections)
+            }
+
+
+class SQLiteBackend:
+    """
+    Storage backend for the local SQLite file; the default.
+
+    A backend owns the connections and the schema and supplies the few bits
+    of SQL that differ between databases, so Database itself stays portable.
+    The other implementation is utils.postgres_backend.PostgresBackend.
+    """
+
+    name = 'sqlite'
+    IntegrityError = sqlite3.IntegrityError
+
+    # Case-insensitive substring match (SQLite's LIKE already ignores ASCII case)
+    like = 'LIKE'
+
+    # One machine's file, so query results may be cached; other processes
+    # writing it (dbtool, imports) show up in the change log version
+    shared = False
+
+    # Row-lock clauses; SQLite's write lock already covers the whole file
+    lock_for_share = ''
+    lock_for_update = ''
+
+    # Change log column that versions are measured in; see change_version
+    change_column = 'version'
+
+    def __init__(self, db_file, row_factory, on_open=None):
+        self.db_file = Path(db_file)
+
+        # Archived tasks live in a second file, attached to every connection as "archive"
+        self.archive_file = self.db_file.with_name(self.db_file.name + ".archive")
+
+        self.on_open = on_open
+        self.connections = ConnectionManager(self.db_file, row_factory, on_open=self._attach_archive)
+
+    def _attach_archive(self, conn):
+        conn.execute("ATTACH DATABASE ? AS archive", (str(self.archive_file),))
+        conn.execute("PRAGMA archive.journal_mode = WAL")
+        # Archiving commits the copy before deleting the original; FULL makes
+        # that commit durable first, so a crash can duplicate a task but not lose it
+        conn.execute("PRAGMA archive.synchronous = FULL")
+
+        if self.on_open:
+            self.on_open(conn)
+
+    def acquire(self):
+        return self.connections.acquire()
+
+    def release(self, conn):
+        self.connections.release(conn)
+
+    def close_all(self):
+        self.connections.close_all()
+
+    def get_stats(self):
+        return self.connections.get_stats()
+
+    def init_schema(self, conn):
         # User accounts table
         create_users = '''
             CREATE TABLE IF NOT EXISTS users (
@@ -91,38 +835,245 @@ class Database:
             );
         '''
 
+        cursor = conn.cursor()
+        cursor.execute(create_users)
+        cursor.execute(create_tasks)
+        cursor.execute(create_tags)
+        cursor.execute(create_task_tags)
+        conn.commit()
+
+        self.migrate(conn)
+
+        cursor.execute("BEGIN IMMEDIATE")
+        create_archive_schema(cursor, fts=fts5_available(cursor))
+        conn.commit()
+
+    def schema_version(self, conn):
+        # Schema version stored in the database header
+        return conn.execute("PRAGMA user_version").fetchone()['user_version']
+
+    def migrate(self, conn):
+        # Upgrade an existing database file in place, one transaction per version
+        if self.schema_version(conn) >= SCHEMA_VERSION:
+            return
+
+        cursor = conn.cursor()
+        for version, description, steps in MIGRATIONS:
+            # IMMEDIATE takes the write lock so two clients cannot migrate at once
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                if self.schema_version(conn) >= version:
+                    conn.rollback()
+                    continue
+
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+
+                cursor.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Migration Error (v{version}, {description}): {e}")
+                raise
+
+    def has_fts(self, conn):
+        # False when the FTS5 table could not be created
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'").fetchone() is not None
+
+    def has_tag_trigrams(self, conn):
+        # False when the trigram table could not be created
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'tags_trigram'").fetchone() is not None
+
+    def begin_write(self, cursor):
+        # Take the write lock up front rather than on the first write
+        cursor.execute("BEGIN IMMEDIATE")
+
+    def change_version(self, cursor):
+        # Latest committed change log version (0 before any change)
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'task_changes'")
+        row = cursor.fetchone()
+        return row['seq'] if row else 0
+
+    def group_concat(self, expr):
+        return f"GROUP_CONCAT({expr}, ', ')"
+
+    def insert_tasks(self, cursor, columns, rows):
+        # Insert rows and return their new ids, in order
+        placeholders = ", ".join("?" * len(columns))
+        first_id = self._last_task_id(cursor) + 1
+        cursor.executemany(f"INSERT INTO tasks ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+        # AUTOINCREMENT ids are consecutive while we hold the write lock
+        if self._last_task_id(cursor) != first_id + len(rows) - 1:
+            raise sqlite3.DatabaseError("Bulk insert produced non-sequential task ids")
+        return range(first_id, first_id + len(rows))
+
+    def _last_task_id(self, cursor):
+        # Highest id ever handed out for tasks (0 on an empty database)
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'")
+        row = cursor.fetchone()
+        return row['seq'] if row else 0
+
+    def stream(self, conn, sql, params, batch_size):
+        # SQLite steps the statement lazily, so a plain cursor already streams
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+    def secure(self):
+        # Restrict database file permissions
+        for path in (self.db_file, self.archive_file):
+            if path.exists():
+                os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
+
+
+def create_backend(db_file, on_open=None):
+    # DB_BACKEND=postgres (environment or .env) selects the shared server
+    if DB_BACKEND == 'postgres':
+        from utils.postgres_backend import PostgresBackend
+        return PostgresBackend(
+            record_factory, host=DB_HOST, port=DB_PORT, dbname=DB_NAME,
+            user=DB_USER, password=DB_PASS, max_connections=DB_POOL_MAX
+        )
+    return SQLiteBackend(db_file, record_factory, on_open=on_open)
+
+
+class Database:
+    def __init__(self, db_file=DB_FILE):
+        # Benchmarks and tools may point at a database other than the app's
+        self.db_file = Path(db_file)
+
+        # Opt-in call tracing: TASKFLOW_TRACE=1, slow threshold from TASKFLOW_SLOW_MS
+        self.tracer = None
+        if os.getenv("TASKFLOW_TRACE"):
+            self.tracer = QueryTracer(TRACE_LOG, threshold_ms=float(os.getenv("TASKFLOW_SLOW_MS", "100")))
+
+        # Connections and schema: the SQLite file unless configured otherwise
+        self.backend = create_backend(self.db_file, on_open=self.tracer.attach if self.tracer else None)
+        self.tags_column = TASK_TAGS_COLUMN.format(concat=self.backend.group_concat('tg.name'))
+        self.tag_keys_column = TASK_TAG_KEYS_COLUMN.format(concat=self.backend.group_concat('tg.key'))
+
+        # Per-user read cache, invalidated by _tasks_changed; other clients of
+        # a shared database write behind its back, so it is disabled there
+        self.cache = QueryCache(max_entries=0 if self.backend.shared else 256)
+        # (change log version, time.monotonic() it was read at); see _cache_version
+        self._cache_checked = (None, None)
+
+        # Callables told which users' tasks a committed write touched
+        self.change_listeners = []
+
+        # Password hashing at this machine's calibrated bcrypt cost
+        self.hasher = PasswordHasher(rounds=load_rounds(HASH_COST_FILE))
+
+        # Initialize database and tables
+        self.init_db()
+
+        if self.tracer:
+            self.tracer.instrument(self)
+
+    def get_connection(self):
+        # Borrow this thread's connection
+        return self.backend.acquire()
+
+    def release_connection(self, conn):
+        # Return a borrowed connection (it stays open for reuse)
+        self.backend.release(conn)
+
+    def close(self):
+        # Close all pooled connections on shutdown
+        if self.tracer:
+            self.tracer.write_summary()
+            self.tracer.close()
+        self.hasher.shutdown()
+        self.backend.close_all()
+
+    def get_connection_stats(self):
+        # Connections opened vs. reused since startup
+        return self.backend.get_stats()
+
+    def get_cache_stats(self):
+        # Query cache hits, misses and evictions since startup
+        return self.cache.get_stats()
+
+    def get_trace_stats(self):
+        # Per-method latency percentiles; empty unless tracing is enabled
+        return self.tracer.get_stats() if self.tracer else {}
+
+    def _tasks_changed(self, user_ids):
+        # Called after a committed write to these users' tasks
+        user_ids = set(user_ids)
+        for user_id in user_ids:
+            self.cache.invalidate(user_id)
+
+        for listener in self.change_listeners:
+            try:
+                listener(user_ids)
+            except Exception as e:
+                print(f"Change Listener Error: {e}")
+
+    def add_change_listener(self, listener):
+        # listener(user_ids) runs on the writing thread after each commit
+        self.change_listeners.append(listener)
+
+    def _task_owners(self, cursor, task_ids):
+        # Users owning the given tasks
+        task_ids = list(task_ids)
+        owners = set()
+        for start in range(0, len(task_ids), 500):
+            chunk = task_ids[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(f"SELECT DISTINCT user_id FROM tasks WHERE id IN ({placeholders})", chunk)
+            owners.update(row['user_id'] for row in cursor.fetchall())
+        return owners
+
+    def init_db(self):
         conn = self.get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(create_users)
-            cursor.execute(create_tasks)
-            cursor.execute(create_tags)
-            cursor.execute(create_task_tags)
-            conn.commit()
+            # Tables, then any pending migrations
+            self.backend.init_schema(conn)
+
+            # Search falls back to LIKE when full-text search is unavailable
+            self.has_fts = self.backend.has_fts(conn)
+            self.has_tag_trigrams = self.backend.has_tag_trigrams(conn)
         finally:
-            conn.close()
+            self.release_connection(conn)
+
+        self.backend.secure()
+
+    def get_schema_version(self, conn):
+        # Version of the schema the database is at
+        return self.backend.schema_version(conn)
 
-        self.secure_db_file()
+    def migrate(self, conn):
+        # Bring the schema up to date
+        self.backend.migrate(conn)
 
     def create_user(self, username, email, password):
         # Create a new user with hashed password
-        hashed_pw = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        hashed_pw = self.hasher.hash(password)
         query = "INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)"
         
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute(query, (username, email, hashed_pw.decode('utf-8')))
+            cursor.execute(query, (username, email, hashed_pw))
             conn.commit()
             return True
-        except sqlite3.IntegrityError:
+        except self.backend.IntegrityError:
             # Duplicate username
             return False
         except Exception as e:
             print(f"Register Error: {e}")
             return False
         finally:
-            conn.close()
+            self.release_connection(conn)
 
     def verify_user(self, username, password):
         # Validate user login credentials
@@ -133,14 +1084,22 @@ class Database:
             cursor = conn.cursor()
             cursor.execute(query, (username,))
             user = cursor.fetchone()
-            
-            if user:
-                stored_hash = user['password_hash'].encode('utf-8')
-                if bcrypt.checkpw(password.encode('utf-8'), stored_hash):
-                    return user['id']
-            return None
+            stored_hash = user['password_hash'] if user else None
+
+            if not self.hasher.check(password, stored_hash):
+                return None
+
+            # Upgrade hashes made at a lower cost while we know the password;
+            # the WHERE clause leaves a concurrent password change alone
+            if self.hasher.needs_rehash(stored_hash):
+                cursor.execute(
+                    "UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?",
+                    (self.hasher.hash(password), user['id'], stored_hash)
+                )
+                conn.commit()
+            return user['id']
         finally:
-            conn.close()
+            self.release_connection(conn)
 
     def get_user_by_email(self, email):
         # To find a user by email
@@ -151,8 +1110,19 @@ class Database:
             cursor.execute(query, (email,))
             return cursor.fetchone() # Returns None if not found
         finally:
-            conn.close()
+            self.release_connection(conn)
     
+    def get_user_by_username(self, username):
+        # To find a user by username
+        query = "SELECT id, username FROM users WHERE username = ?"
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, (username,))
+            return cursor.fetchone() # Returns None if not found
+        finally:
+            self.release_connection(conn)
+
     def get_all_tasks(self, user_id):
         # Retrieve all tasks for a user
         query = "SELECT * FROM tasks WHERE user_id = ? ORDER BY id"
@@ -162,28 +1132,125 @@ class Database:
             cursor.execute(query, (user_id,))
             return cursor.fetchall()
         finally:
-            conn.close()
+            self.release_connection(conn)
 
     def add_task(self, data, user_id):
         # Insert a new task and assign tags
         tags_input = data.pop('tags', '')
 
         query = '''
-            INSERT INTO tasks (user_id, title, category, status, deadline, description)
-            VALUES (:user_id, :title, :category, :status, :deadline, :description)
+            INSERT INTO tasks (user_id, title, category, status, deadline, deadline_ts, deadline_tz, description, remind_before)
+            VALUES (:user_id, :title, :category, :status, :deadline, :deadline_ts, :deadline_tz, :description, :remind_before)
+            RETURNING id
         '''
+        deadline_ts, deadline_tz = parse_deadline(data['deadline'])
+        remind_before = parse_remind_before(data.get('remind_before'))
+
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute(query, {**data, 'user_id': user_id})
+            cursor.execute(query, {**data, 'user_id': user_id, 'deadline_ts': deadline_ts, 'deadline_tz': deadline_tz,
+                                   'remind_before': remind_before})
 
-            new_task_id = cursor.lastrowid
+            new_task_id = cursor.fetchall()[0]['id']
             if tags_input:
                 self.set_task_tags(conn, new_task_id, tags_input)
 
             conn.commit()
         finally:
-            conn.close()
+            self.release_connection(conn)
+
+        self._tasks_changed([user_id])
+
+    def add_tasks_bulk(self, tasks, user_id, batch_size=500, on_progress=None):
+        """
+        Insert many tasks in one transaction.
+
+        `tasks` is any iterable of dicts shaped like add_task's data and is
+        consumed in batches, so a generator keeps memory flat. `on_progress`
+        is called with the running count after each batch.
+        """
+        columns = ('user_id', 'title', 'category', 'status', 'deadline', 'deadline_ts', 'deadline_tz', 'description')
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            self.backend.begin_write(cursor)
+
+            rows = iter(tasks)
+            tag_ids = {}
+            total = 0
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+
+                task_rows = []
+                batch_tags = []
+                for row_num, data in enumerate(batch, start=total + 1):
+                    for field in ('title', 'category', 'deadline'):
+                        if not data.get(field):
+                            raise ValueError(f"Task {row_num}: missing {field}")
+                    try:
+                        deadline_ts, deadline_tz = parse_deadline(data['deadline'])
+                    except ValueError:
+                        raise ValueError(f"Task {row_num}: invalid deadline {data['deadline']!r}") from None
+                    task_rows.append((
+                        user_id, data['title'], data['category'],
+                        data.get('status') or 'To Do', data['deadline'],
+                        deadline_ts, deadline_tz,
+                        data.get('description') or ''
+                    ))
+                    batch_tags.append(parse_tags(data.get('tags')))
+
+                task_ids = self.backend.insert_tasks(cursor, columns, task_rows)
+
+                # One pass over the batch's tag names, then link everything at once
+                self._resolve_tag_ids(cursor, dict.fromkeys(n for names in batch_tags for n in names), tag_ids)
+                links = [
+                    (task_id, tag_ids[name])
+                    for task_id, names in zip(task_ids, batch_tags)
+                    for name in names
+                ]
+                cursor.executemany("INSERT INTO task_tags (task_id, tag_id) VALUES (?, ?)", links)
+
+                total += len(task_rows)
+                if on_progress:
+                    on_progress(total)
+
+            conn.commit()
+        finally:
+            self.release_connection(conn)
+
+        self._tasks_changed([user_id])
+        return total
+
+    def _resolve_tag_ids(self, cursor, names, tag_ids):
+        # Fill tag_ids (name -> id) for names, creating missing tags; names
+        # that differ only in case resolve to the same tag
+        missing = [n for n in names if n not in tag_ids]
+
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(missing), 250):
+            chunk = missing[start:start + 250]
+            keys = {n: tag_key(n) for n in chunk}
+
+            values = ", ".join("(?, ?)" for _ in chunk)
+            cursor.execute(
+                f"INSERT INTO tags (name, key) VALUES {values} ON CONFLICT DO NOTHING",
+                [v for n in chunk for v in (n, keys[n])]
+            )
+
+            unique_keys = list(dict.fromkeys(keys.values()))
+            # Locked so the orphan sweeper cannot delete a tag about to be linked
+            placeholders = ", ".join("?" * len(unique_keys))
+            cursor.execute(
+                f"SELECT id, key FROM tags WHERE key IN ({placeholders}){self.backend.lock_for_share}",
+                unique_keys
+            )
+            ids = {row['key']: row['id'] for row in cursor.fetchall()}
+            for n in chunk:
+                tag_ids[n] = ids[keys[n]]
 
     def update_task(self, task_id, data):
         # Update task details and tags
@@ -192,58 +1259,246 @@ class Database:
         query = '''
             UPDATE tasks 
             SET title=:title, category=:category, status=:status, 
-                deadline=:deadline, description=:description
+                deadline=:deadline, deadline_ts=:deadline_ts, deadline_tz=:deadline_tz,
+                description=:description, remind_before=:remind_before
             WHERE id=:id
+            RETURNING user_id
         '''
+        deadline_ts, deadline_tz = parse_deadline(data['deadline'])
+        remind_before = parse_remind_before(data.get('remind_before'))
+
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute(query, {**data, 'id': task_id})
+            cursor.execute(query, {**data, 'id': task_id, 'deadline_ts': deadline_ts, 'deadline_tz': deadline_tz,
+                                   'remind_before': remind_before})
+            owners = [row['user_id'] for row in cursor.fetchall()]
             self.set_task_tags(conn, task_id, tags_input)
             conn.commit()
         finally:
-            conn.close()
+            self.release_connection(conn)
+
+        self._tasks_changed(owners)
 
     def update_status(self, task_id, new_status):
         # Change task status only
-        query = "UPDATE tasks SET status=? WHERE id=?"
+        query = "UPDATE tasks SET status=? WHERE id=? RETURNING user_id"
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
             cursor.execute(query, (new_status, task_id))
+            owners = [row['user_id'] for row in cursor.fetchall()]
             conn.commit()
         finally:
-            conn.close()
+            self.release_connection(conn)
+
+        self._tasks_changed(owners)
+
+    def update_statuses(self, changes):
+        # Apply several {task_id: status} changes in one transaction
+        query = "UPDATE tasks SET status=? WHERE id=?"
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(query, [(status, task_id) for task_id, status in changes.items()])
+            owners = self._task_owners(cursor, changes)
+            conn.commit()
+        finally:
+            self.release_connection(conn)
+
+        self._tasks_changed(owners)
 
     def delete_task(self, task_id):
         # Remove a task
-        query = "DELETE FROM tasks WHERE id = ?"
+        query = "DELETE FROM tasks WHERE id = ? RETURNING user_id"
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
             cursor.execute(query, (task_id,))
+            owners = [row['user_id'] for row in cursor.fetchall()]
             conn.commit()
         finally:
-            conn.close()
-    
-    def search_tasks(self, user_id, query):
-        # Search tasks by text fields
-        search_term = f"%{query}%"
-        
-        sql = '''
-            SELECT * FROM tasks 
-            WHERE user_id = ? 
-            AND (title LIKE ? OR category LIKE ? OR description LIKE ?)
-            ORDER BY id
-        '''
-        
+            self.release_connection(conn)
+
+        self._tasks_changed(owners)
+
+    def update_status_bulk(self, task_ids, new_status):
+        # Give many tasks one status in a single transaction; returns how many changed
+        return self._update_column_bulk(task_ids, 'status', new_status)
+
+    def update_category_bulk(self, task_ids, category):
+        # Move many tasks to one category in a single transaction; returns how many changed
+        return self._update_column_bulk(task_ids, 'category', category)
+
+    def _update_column_bulk(self, task_ids, column, value):
+        # Rows already holding the value are left alone, so they fire no
+        # triggers (a Done task keeps its done_at) and log no change
+        task_ids = list(task_ids)
+        owners = set()
+        changed = 0
+
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute(sql, (user_id, search_term, search_term, search_term))
+            self.backend.begin_write(cursor)
+            for start in range(0, len(task_ids), 500):
+                chunk = task_ids[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(
+                    f"UPDATE tasks SET {column} = ? WHERE id IN ({placeholders}) AND {column} != ? RETURNING user_id",
+                    [value, *chunk, value]
+                )
+                rows = cursor.fetchall()
+                changed += len(rows)
+                owners.update(row['user_id'] for row in rows)
+            conn.commit()
+        finally:
+            self.release_connection(conn)
+
+        self._tasks_changed(owners)
+        return changed
+
+    def delete_tasks_bulk(self, task_ids):
+        # Remove many tasks in a single transaction; returns how many went
+        task_ids = list(task_ids)
+        owners = set()
+        deleted = 0
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            self.backend.begin_write(cursor)
+            for start in range(0, len(task_ids), 500):
+                chunk = task_ids[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"DELETE FROM tasks WHERE id IN ({placeholders}) RETURNING user_id", chunk)
+                rows = cursor.fetchall()
+                deleted += len(rows)
+                owners.update(row['user_id'] for row in rows)
+            conn.commit()
+        finally:
+            self.release_connection(conn)
+
+        self._tasks_changed(owners)
+        return deleted
+
+    def add_tags_bulk(self, task_ids, tags):
+        """
+        Add tags ("a, b" or a list) to many tasks in a single transaction.
+
+        Each chunk of tasks is linked to every tag by one INSERT ... SELECT;
+        links a task already has are skipped. Returns the number of tasks
+        that gained a tag.
+        """
+        task_ids = list(task_ids)
+        names = parse_tags(tags)
+        if not task_ids or not names:
+            return 0
+        tagged = set()
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            self.backend.begin_write(cursor)
+            tag_ids = {}
+            self._resolve_tag_ids(cursor, names, tag_ids)
+            unique_tag_ids = list(set(tag_ids.values()))
+            tag_placeholders = ", ".join("?" * len(unique_tag_ids))
+
+            for start in range(0, len(task_ids), 500):
+                chunk = task_ids[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f'''
+                    INSERT INTO task_tags (task_id, tag_id)
+                    SELECT t.id, tg.id FROM tasks t, tags tg
+                    WHERE t.id IN ({placeholders}) AND tg.id IN ({tag_placeholders})
+                    ON CONFLICT DO NOTHING
+                    RETURNING task_id
+                ''', [*chunk, *unique_tag_ids])
+                tagged.update(row['task_id'] for row in cursor.fetchall())
+            owners = self._task_owners(cursor, tagged)
+            conn.commit()
+        finally:
+            self.release_connection(conn)
+
+        self._tasks_changed(owners)
+        return len(tagged)
+
+    def remove_tags_bulk(self, task_ids, tags):
+        # Unlink tags from many tasks in a single transaction; returns the
+        # number of tasks that lost a tag. Orphaned tags go to the sweeper.
+        task_ids = list(task_ids)
+        keys = list({tag_key(name) for name in parse_tags(tags)})
+        if not task_ids or not keys:
+            return 0
+        untagged = set()
+        key_placeholders = ", ".join("?" * len(keys))
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            self.backend.begin_write(cursor)
+            for start in range(0, len(task_ids), 500):
+                chunk = task_ids[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f'''
+                    DELETE FROM task_tags
+                    WHERE task_id IN ({placeholders})
+                      AND tag_id IN (SELECT id FROM tags WHERE key IN ({key_placeholders}))
+                    RETURNING task_id
+                ''', [*chunk, *keys])
+                untagged.update(row['task_id'] for row in cursor.fetchall())
+            owners = self._task_owners(cursor, untagged)
+            conn.commit()
+        finally:
+            self.release_connection(conn)
+
+        self._tasks_changed(owners)
+        return len(untagged)
+
+    def search_tasks(self, user_id, query):
+        # Search tasks by text fields, best matches first
+        if not self.has_fts:
+            return self._search_tasks_like(user_id, query)
+
+        fts_query = build_fts_query(query)
+        if not fts_query:
+            return []
+
+        sql = TASK_HITS_CTE + '''
+            SELECT t.*, h.snippet
+            FROM hits h
+            JOIN tasks t ON t.id = h.task_id
+            WHERE t.user_id = ?
+            ORDER BY h.rank
+        '''
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, (fts_query, user_id))
             return cursor.fetchall()
         finally:
-            conn.close()
+            self.release_connection(conn)
+
+    def _search_tasks_like(self, user_id, query):
+        # Substring search when full-text search is unavailable
+        search_term = f"%{query}%"
+        
+        sql = '''
+            SELECT * FROM tasks 
+            WHERE user_id = ? 
+            AND (title {like} ? OR category {like} ? OR description {like} ?)
+            ORDER BY id
+        '''.format(like=self.backend.like)
+        
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, (user_id, search_term, search_term, search_term))
+            return cursor.fetchall()
+        finally:
+            self.release_connection(conn)
 
     def update_credentials(self, user_id, new_username, new_password):
         # Update username and/or password
@@ -253,10 +1508,10 @@ class Database:
             
             # Update username and password
             if new_password:
-                hashed_pw = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
+                hashed_pw = self.hasher.hash(new_password)
                 cursor.execute(
                     "UPDATE users SET username=?, password_hash=? WHERE id=?",
-                    (new_username, hashed_pw.decode('utf-8'), user_id)
+                    (new_username, hashed_pw, user_id)
                 )
             # Update username only
             else:
@@ -267,46 +1522,47 @@ class Database:
                 
             conn.commit()
             return True
-        except sqlite3.IntegrityError:
+        except self.backend.IntegrityError:
             # Username already exists
             return False
         finally:
-            conn.close()
+            self.release_connection(conn)
 
     def get_analytics(self, user_id):
         # Generate task statistics for dashboard
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
-            today = datetime.now().strftime("%Y-%m-%d")
 
             cursor.execute("SELECT username FROM users WHERE id = ?", (user_id,))
             result = cursor.fetchone()
             username = result['username'] if result else "Unknown"
 
-            # Count all tasks
-            cursor.execute("SELECT COUNT(*) as total FROM tasks WHERE user_id = ?", (user_id,))
-            total_tasks = cursor.fetchone()['total']
-
-            # Count overdue tasks
+            # Count overdue tasks (time-dependent, so read through the deadline index)
             cursor.execute(
-                "SELECT COUNT(*) as overdue FROM tasks WHERE user_id = ? AND deadline < ? AND status != 'Done'",
-                (user_id, today)
+                "SELECT COUNT(*) as overdue FROM tasks WHERE user_id = ? AND deadline_ts < ? AND status != 'Done'",
+                (user_id, int(time.time()))
             )
             overdue_tasks = cursor.fetchone()['overdue']
 
-            # Count tasks by category and status
-            cursor.execute('''
-                SELECT category, status, COUNT(*) as count 
-                FROM tasks 
-                WHERE user_id = ? 
-                GROUP BY category, status
-            ''', (user_id,))
+            # Archived tasks have left the rollups; counted on their own
+            cursor.execute(
+                "SELECT COUNT(*) AS archived FROM archive.archived_tasks WHERE user_id = ?",
+                (user_id,)
+            )
+            archived_tasks = cursor.fetchone()['archived']
+
+            # Precomputed counts by category and status
+            cursor.execute(
+                "SELECT category, status, count FROM task_stats WHERE user_id = ?",
+                (user_id,)
+            )
             
             raw_data = cursor.fetchall()
             
             # Organize results for UI display
             matrix = {}
+            total_tasks = 0
             for row in raw_data:
                 cat = row['category']
                 status = row['status']
@@ -320,30 +1576,424 @@ class Database:
                 
                 matrix[cat][status] = count
                 matrix[cat]['total'] += count
+                total_tasks += count
 
             return {
                 'username': username,
                 'total_tasks': total_tasks,
                 'overdue_tasks': overdue_tasks,
+                'archived_tasks': archived_tasks,
                 'matrix': matrix
             }
         finally:
-            conn.close()
+            self.release_connection(conn)
+
+    def rebuild_task_stats(self):
+        # Recompute the analytics rollups from scratch
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            self.backend.begin_write(cursor)
+            cursor.execute("DELETE FROM task_stats")
+            cursor.execute(REBUILD_TASK_STATS)
+            conn.commit()
+        finally:
+            self.release_connection(conn)
+
+    def check_task_stats(self):
+        """
+        Compare task_stats with live counts from tasks.
+
+        Returns a list of (user_id, category, status, expected, stored) for
+        every rollup row that is wrong or missing; empty means consistent.
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT user_id, category, status, COUNT(*) AS count FROM tasks
+                WHERE user_id IS NOT NULL
+                GROUP BY user_id, category, status
+            ''')
+            expected = {(r['user_id'], r['category'], r['status']): r['count'] for r in cursor.fetchall()}
+
+            cursor.execute("SELECT user_id, category, status, count FROM task_stats")
+            stored = {(r['user_id'], r['category'], r['status']): r['count'] for r in cursor.fetchall()}
+        finally:
+            self.release_connection(conn)
+
+        return [
+            (*key, expected.get(key, 0), stored.get(key, 0))
+            for key in sorted(expected.keys() | stored.keys(), key=str)
+            if expected.get(key, 0) != stored.get(key, 0)
+        ]
+
+    def sweep_orphan_tags(self, batch_size=200):
+        """
+        Delete up to batch_size tags that no task uses any more.
+
+        One short transaction per call, so a caller sweeping a large backlog
+        in a loop never holds the write lock for long. Returns the number of
+        tags deleted; fewer than batch_size means none are left.
+        """
+        query = '''
+            DELETE FROM tags WHERE ref_count = 0 AND id IN (
+                SELECT id FROM tags WHERE ref_count = 0 LIMIT ?{lock}
+            )
+        '''.format(lock=self.backend.lock_for_update)
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            self.backend.begin_write(cursor)
+            cursor.execute(query, (batch_size,))
+            deleted = cursor.rowcount
+            conn.commit()
+            return deleted
+        finally:
+            self.release_connection(conn)
+
+    def get_tag_stats(self):
+        # Tag table size and how much of it the sweeper could reclaim
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) AS total FROM tags")
+            total = cursor.fetchone()['total']
+            cursor.execute("SELECT COUNT(*) AS orphans FROM tags WHERE ref_count = 0")
+            return {'tags': total, 'orphans': cursor.fetchone()['orphans']}
+        finally:
+            self.release_connection(conn)
+
+    def recount_tag_refs(self):
+        # Recompute every tag's reference count from task_tags
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            self.backend.begin_write(cursor)
+            cursor.execute(RECOUNT_TAG_REFS)
+            conn.commit()
+        finally:
+            self.release_connection(conn)
+
+    def archive_done_tasks(self, before_ts, batch_size=200):
+        """
+        Move up to batch_size tasks marked Done before before_ts into the archive.
+
+        Each batch is copied into archive.archived_tasks and committed before
+        the originals are deleted, so a crash in between leaves a task in both
+        places (the next batch copies it again) rather than in neither. Tasks
+        reopened in between stay live. Returns the number archived; fewer
+        than batch_size means none are left.
+        """
+        select = '''
+            SELECT id FROM tasks WHERE status = 'Done' AND done_at < ?
+            ORDER BY done_at LIMIT ?{lock}
+        '''.format(lock=self.backend.lock_for_update)
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            self.backend.begin_write(cursor)
+            cursor.execute(select, (before_ts, batch_size))
+            task_ids = [row['id'] for row in cursor.fetchall()]
+            if not task_ids:
+                conn.rollback()
+                return 0
+            placeholders = ", ".join("?" * len(task_ids))
+
+            # Copy, replacing any copy an interrupted earlier batch left behind
+            cursor.execute(f"DELETE FROM archive.archived_tasks WHERE id IN ({placeholders})", task_ids)
+            cursor.execute(f'''
+                INSERT INTO archive.archived_tasks
+                    (id, user_id, title, category, status, deadline, deadline_ts, deadline_tz,
+                     description, remind_before, tags, tag_keys, done_at, archived_at)
+                SELECT t.id, t.user_id, t.title, t.category, t.status, t.deadline, t.deadline_ts, t.deadline_tz,
+                       t.description, t.remind_before, {self.tags_column}, {self.tag_keys_column}, t.done_at, ?
+                FROM tasks t WHERE t.id IN ({placeholders})
+            ''', [int(time.time()), *task_ids])
+            conn.commit()
+
+            # Then delete the originals; their tag links, search entries and
+            # rollup counts go with them through the usual triggers
+            self.backend.begin_write(cursor)
+            cursor.execute(
+                f"DELETE FROM tasks WHERE id IN ({placeholders}) AND status = 'Done' RETURNING id, user_id",
+                task_ids
+            )
+            deleted = cursor.fetchall()
+
+            reopened = list(set(task_ids) - {row['id'] for row in deleted})
+            if reopened:
+                placeholders = ", ".join("?" * len(reopened))
+                cursor.execute(f"DELETE FROM archive.archived_tasks WHERE id IN ({placeholders})", reopened)
+            conn.commit()
+        finally:
+            self.release_connection(conn)
+
+        self._tasks_changed(row['user_id'] for row in deleted)
+        return len(deleted)
+
+    def restore_tasks(self, task_ids):
+        """
+        Move archived tasks back into tasks, tags included.
+
+        The reverse of archive_done_tasks, in the same order: the restored
+        rows are committed before the archived copies are deleted. Tasks keep
+        their ids; Done ones count as finished now, so they are not archived
+        again straight away. Returns the number restored.
+        """
+        task_ids = list(task_ids)
+        if not task_ids:
+            return 0
+        placeholders = ", ".join("?" * len(task_ids))
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            self.backend.begin_write(cursor)
+            cursor.execute(f"SELECT id, tags FROM archive.archived_tasks WHERE id IN ({placeholders})", task_ids)
+            tags = {row['id']: row['tags'] for row in cursor.fetchall()}
+
+            # A task already live was restored by an interrupted earlier call
+            cursor.execute(f'''
+                INSERT INTO tasks
+                    (id, user_id, title, category, status, deadline, deadline_ts, deadline_tz, description, remind_before)
+                SELECT id, user_id, title, category, status, deadline, deadline_ts, deadline_tz, description, remind_before
+                FROM archive.archived_tasks WHERE id IN ({placeholders})
+                ON CONFLICT (id) DO NOTHING
+                RETURNING id, user_id
+            ''', task_ids)
+            restored = cursor.fetchall()
+            for row in restored:
+                if tags[row['id']]:
+                    self.set_task_tags(conn, row['id'], tags[row['id']])
+            conn.commit()
+
+            self.backend.begin_write(cursor)
+            cursor.execute(f"DELETE FROM archive.archived_tasks WHERE id IN ({placeholders})", task_ids)
+            conn.commit()
+        finally:
+            self.release_connection(conn)
+
+        self._tasks_changed(row['user_id'] for row in restored)
+        return len(restored)
+
+    def delete_archived_tasks(self, task_ids):
+        # Permanently remove tasks from the archive
+        task_ids = list(task_ids)
+        if not task_ids:
+            return
+        placeholders = ", ".join("?" * len(task_ids))
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            self.backend.begin_write(cursor)
+            # No trigger watches the archive; log the deletes so views and
+            # other processes' caches see them like any other task change
+            cursor.execute(f'''
+                INSERT INTO task_changes (task_id, user_id, op, changed_at)
+                SELECT id, user_id, 'delete', ? FROM archive.archived_tasks WHERE id IN ({placeholders})
+            ''', [int(time.time()), *task_ids])
+            cursor.execute(
+                f"DELETE FROM archive.archived_tasks WHERE id IN ({placeholders}) RETURNING user_id",
+                task_ids
+            )
+            owners = [row['user_id'] for row in cursor.fetchall()]
+            conn.commit()
+        finally:
+            self.release_connection(conn)
+
+        self._tasks_changed(owners)
+
+    def get_archive_stats(self, before_ts=None):
+        # Archived task count, and how many live tasks are due to join them
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) AS archived FROM archive.archived_tasks")
+            stats = {'archived': cursor.fetchone()['archived']}
+            if before_ts is not None:
+                cursor.execute(
+                    "SELECT COUNT(*) AS due FROM tasks WHERE status = 'Done' AND done_at < ?",
+                    (before_ts,)
+                )
+                stats['due'] = cursor.fetchone()['due']
+            return stats
+        finally:
+            self.release_connection(conn)
+
+    def _cache_version(self):
+        # Change log version cached reads are checked against. Every task
+        # write bumps it, including those of dbtool and other processes,
+        # which never reach _tasks_changed here. Writes of this process
+        # already bump their users' generations, so the database is only
+        # asked again once the last answer is CACHE_VERSION_TTL old.
+        if not self.cache.max_entries:
+            return None
+        version, checked_at = self._cache_checked
+        now = time.monotonic()
+        if checked_at is None or now - checked_at >= CACHE_VERSION_TTL:
+            version = self.get_change_version()
+            self._cache_checked = (version, now)
+        return version
+
+    def get_change_version(self):
+        # Current change log version; read it before loading a view, then
+        # pass it to get_changes_since to learn what changed after the load
+        conn = self.get_connection()
+        try:
+            return self.backend.change_version(conn.cursor())
+        finally:
+            self.release_connection(conn)
+
+    def get_changes_since(self, user_id, version):
+        """
+        Tasks of a user changed after `version`, from the change log.
+
+        Returns {'version', 'reset', 'inserted', 'updated', 'deleted'}: the
+        version to pass next time, and task id lists with each task in at
+        most one of them (a task created and deleted again is left out).
+        'reset' is True when `version` is None or older than what pruning
+        kept; the lists are then empty and the caller must reload fully.
+        """
+        column = self.backend.change_column
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            current = self.backend.change_version(cursor)
+            if version is None:
+                return {'version': current, 'reset': True, 'inserted': [], 'updated': [], 'deleted': []}
+
+            cursor.execute(f'''
+                SELECT task_id, op FROM task_changes
+                WHERE user_id = ? AND {column} > ? AND {column} <= ?
+                ORDER BY version
+            ''', (user_id, version, current))
+            rows = cursor.fetchall()
+
+            # Read after the entries, so a prune that raced with them shows here
+            cursor.execute("SELECT version FROM task_changes_pruned")
+            if version < cursor.fetchone()['version']:
+                return {'version': current, 'reset': True, 'inserted': [], 'updated': [], 'deleted': []}
+        finally:
+            self.release_connection(conn)
+
+        # Collapse each task's entries into its net change
+        first, last = {}, {}
+        for row in rows:
+            first.setdefault(row['task_id'], row['op'])
+            last[row['task_id']] = row['op']
+
+        changes = {'version': current, 'reset': False, 'inserted': [], 'updated': [], 'deleted': []}
+        for task_id, op in last.items():
+            created = first[task_id] == 'insert'
+            if op == 'delete':
+                if not created:
+                    changes['deleted'].append(task_id)
+            elif created:
+                changes['inserted'].append(task_id)
+            else:
+                changes['updated'].append(task_id)
+        return changes
+
+    def prune_changes(self, before_ts, batch_size=1000):
+        """
+        Delete up to batch_size change log entries written before before_ts.
+
+        Entries go oldest first, and the highest pruned version is recorded
+        so get_changes_since can tell a caller it fell behind. Returns the
+        number deleted; fewer than batch_size means none are left.
+        """
+        column = self.backend.change_column
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            self.backend.begin_write(cursor)
+            # Versions grow with time, so the old entries are a prefix of the log
+            cursor.execute(f'''
+                DELETE FROM task_changes WHERE version IN (
+                    SELECT version FROM task_changes WHERE changed_at < ?
+                    ORDER BY version LIMIT ?
+                ) RETURNING {column}
+            ''', (before_ts, batch_size))
+            pruned = [row[column] for row in cursor.fetchall()]
+            if pruned:
+                cursor.execute(
+                    "UPDATE task_changes_pruned SET version = ? WHERE version < ?",
+                    (max(pruned), max(pruned))
+                )
+            conn.commit()
+            return len(pruned)
+        finally:
+            self.release_connection(conn)
+
+    def get_change_stats(self):
+        # Change log size, age and pruning mark
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) AS entries, MIN(changed_at) AS oldest FROM task_changes")
+            row = cursor.fetchone()
+            stats = {'entries': row['entries'], 'oldest': row['oldest'],
+                     'version': self.backend.change_version(cursor)}
+            cursor.execute("SELECT version FROM task_changes_pruned")
+            stats['pruned_through'] = cursor.fetchone()['version']
+            return stats
+        finally:
+            self.release_connection(conn)
 
     def get_due_today(self, user_id):
         # Fetch tasks due today or earlier
-        today = datetime.now().strftime("%Y-%m-%d 23:59") 
-        
-        query = "SELECT title, deadline FROM tasks WHERE user_id = ? AND deadline <= ? AND status != 'Done'"
+        query = "SELECT title, deadline FROM tasks WHERE user_id = ? AND deadline_ts < ? AND status != 'Done'"
         
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute(query, (user_id, today))
+            cursor.execute(query, (user_id, local_day_start(1)))
             return cursor.fetchall()
         finally:
-            conn.close()
+            self.release_connection(conn)
+
+    def get_reminders(self, user_id, after_ts, until_ts, default_before, task_ids=None):
+        """
+        Reminders of a user's open tasks that fire in (after_ts, until_ts].
+
+        A task fires remind_before minutes ahead of its deadline, or
+        default_before minutes when it has no offset of its own; -1 turns
+        its reminder off. Rows are id, title, deadline_ts and fire_at, in
+        firing order. With task_ids, only those tasks are looked at.
+        """
+        offset = "COALESCE(remind_before, ?) * 60"
+        sql = f'''
+            SELECT id, title, deadline_ts, deadline_ts - {offset} AS fire_at FROM tasks
+            WHERE user_id = ? AND deadline_ts > ? AND deadline_ts <= ? AND status != 'Done'
+              AND COALESCE(remind_before, ?) >= 0 AND deadline_ts - {offset} > ? AND deadline_ts - {offset} <= ?
+        '''
+        # Deadlines further out than the longest offset cannot fire in the window
+        params = [default_before, user_id, after_ts, until_ts + MAX_REMIND_BEFORE * 60,
+                  default_before, default_before, after_ts, default_before, until_ts]
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            if task_ids is None:
+                cursor.execute(sql + " ORDER BY fire_at, id", params)
+                return cursor.fetchall()
+
+            task_ids = list(task_ids)
+            rows = []
+            for start in range(0, len(task_ids), 500):
+                chunk = task_ids[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(sql + f" AND id IN ({placeholders})", params + chunk)
+                rows.extend(cursor.fetchall())
+            return sorted(rows, key=lambda row: (row['fire_at'], row['id']))
+        finally:
+            self.release_connection(conn)
 
+    @cached_query
     def get_tasks_with_tags(self, user_id):
         # Retrieve tasks with their associated tags
         query = '''
@@ -351,67 +2001,82 @@ class Database:
                 t.id, 
                 t.title, 
                 t.category, 
-                GROUP_CONCAT(tg.name, ', ') as tags,
+                {concat} as tags,
                 t.status, 
                 t.deadline,
+                t.deadline_ts,
                 t.description
             FROM tasks t
             LEFT JOIN task_tags tt ON t.id = tt.task_id
             LEFT JOIN tags tg ON tt.tag_id = tg.id
             WHERE t.user_id = ?
             GROUP BY t.id
-            ORDER BY t.deadline
-        '''
+            ORDER BY t.deadline_ts NULLS FIRST, t.id
+        '''.format(concat=self.backend.group_concat('tg.name'))
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
             cursor.execute(query, (user_id,))
             return cursor.fetchall()
         finally:
-            conn.close()
+            self.release_connection(conn)
 
     def set_task_tags(self, conn, task_id, tag_string):
-        # Assign tags to a task
+        # Sync a task's tags, touching only the links that changed
         cursor = conn.cursor()
-        
-        cursor.execute("DELETE FROM task_tags WHERE task_id = ?", (task_id,))
-        
-        if not tag_string:
-            return
+        wanted = parse_tags(tag_string)
 
-        tags = [t.strip() for t in tag_string.split(',') if t.strip()]
-        
-        for tag_name in tags:
-            cursor.execute("SELECT id FROM tags WHERE name = ?", (tag_name,))
-            res = cursor.fetchone()
-            
-            if res:
-                tag_id = res['id']
-            else:
-                cursor.execute("INSERT INTO tags (name) VALUES (?)", (tag_name,))
-                tag_id = cursor.lastrowid
+        cursor.execute('''
+            SELECT tg.id, tg.key FROM task_tags tt
+            JOIN tags tg ON tt.tag_id = tg.id
+            WHERE tt.task_id = ?
+        ''', (task_id,))
+        current = {row['key']: row['id'] for row in cursor.fetchall()}
+        wanted = {tag_key(name): name for name in wanted}
+
+        removed = [tag_id for key, tag_id in current.items() if key not in wanted]
+        added = [name for key, name in wanted.items() if key not in current]
 
+        if removed:
+            placeholders = ", ".join("?" * len(removed))
             cursor.execute(
-                "INSERT INTO task_tags (task_id, tag_id) VALUES (?, ?)",
-                (task_id, tag_id)
+                f"DELETE FROM task_tags WHERE task_id = ? AND tag_id IN ({placeholders})",
+                [task_id, *removed]
             )
 
-    def get_filtered_tasks(self, user_id, filters):
+        if added:
+            tag_ids = {}
+            self._resolve_tag_ids(cursor, added, tag_ids)
+            placeholders = ", ".join("(?, ?)" for _ in added)
+            # A concurrent add_tags_bulk may have linked one meanwhile
+            cursor.execute(
+                f"INSERT INTO task_tags (task_id, tag_id) VALUES {placeholders} ON CONFLICT DO NOTHING",
+                [v for name in added for v in (task_id, tag_ids[name])]
+            )
+
+    def _task_filter_sql(self, user_id, filters):
         """
-        Apply category, status, tag, timeframe, and search filters.
+        Translate FilterBar filters into SQL over tasks aliased as t.
+
+        Returns (from_where, params). A full-text search is a bare MATCH on
+        the task ids, with no rank or snippet; see _select_tasks for those.
+        filters['archived'] reads archived tasks instead of live ones.
         """
-        # Base query with tag joins
-        sql = '''
-            SELECT 
-                t.id, t.title, t.category, t.status, t.deadline, t.description,
-                GROUP_CONCAT(tg.name, ', ') as tags
-            FROM tasks t
-            LEFT JOIN task_tags tt ON t.id = tt.task_id
-            LEFT JOIN tags tg ON tt.tag_id = tg.id
-            WHERE t.user_id = ?
-        '''
+        filters = filters or {}
+        archived = filters.get('archived')
+        table = "archive.archived_tasks" if archived else "tasks"
+        search_query = filters.get('search')
+        fts_query = self._fts_query(filters)
+
+        sql = f" FROM {table} t WHERE t.user_id = ?"
         params = [user_id]
 
+        # Restrict to full-text hits when searching
+        if fts_query:
+            schema, fts = ("archive.", "archived_fts") if archived else ("", "tasks_fts")
+            sql += f" AND t.id IN (SELECT rowid FROM {schema}{fts} WHERE {fts} MATCH ?)"
+            params.append(fts_query)
+
         # Filter by category
         if filters.get('category') and filters['category'] != 'All Categories':
             sql += " AND t.category = ?"
@@ -422,60 +2087,241 @@ class Database:
             sql += " AND t.status = ?"
             params.append(filters['status'])
 
-        # Filter by tag
-        tag_search = filters.get('tag')
-        if tag_search:
-            sql += ''' AND t.id IN (
-                        SELECT tt.task_id FROM task_tags tt 
-                        JOIN tags tg ON tt.tag_id = tg.id 
-                        WHERE tg.name LIKE ?
-                      )'''
-            params.append(f"%{tag_search}%")
-
-        # Filter by timeframe
+        # Filter by tag: matching tags come from an index, then their tasks;
+        # archived tasks carry their tag keys as text instead
+        if archived:
+            pattern = archived_tag_pattern(filters.get('tag'))
+            if pattern:
+                sql += " AND t.tag_keys LIKE ? ESCAPE '\\'"
+                params.append(pattern)
+        else:
+            tag_sql, tag_params = self._tag_filter_sql(filters.get('tag'))
+            if tag_sql:
+                sql += f" AND t.id IN (SELECT tt.task_id FROM task_tags tt WHERE tt.tag_id IN ({tag_sql}))"
+                params.extend(tag_params)
+
+        # Filter by timeframe, as half-open ranges over the epoch deadline
         timeframe = filters.get('timeframe')
-        now_str = datetime.now().strftime("%Y-%m-%d %H:%M")
-        
+
         if timeframe == 'Overdue':
-            sql += " AND t.deadline < ? AND t.status != 'Done'"
-            params.append(now_str)
+            sql += " AND t.deadline_ts < ? AND t.status != 'Done'"
+            params.append(int(time.time()))
         elif timeframe == 'Due Today':
-            today_start = datetime.now().strftime("%Y-%m-%d 00:00")
-            today_end = datetime.now().strftime("%Y-%m-%d 23:59")
-            sql += " AND t.deadline BETWEEN ? AND ?"
-            params.extend([today_start, today_end])
+            sql += " AND t.deadline_ts >= ? AND t.deadline_ts < ?"
+            params.extend([local_day_start(), local_day_start(1)])
         elif timeframe == 'Next 7 Days':
-            today_start = datetime.now().strftime("%Y-%m-%d 00:00")
-            next_week = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d 23:59")
-            sql += " AND t.deadline BETWEEN ? AND ?"
-            params.extend([today_start, next_week])
+            sql += " AND t.deadline_ts >= ? AND t.deadline_ts < ?"
+            params.extend([local_day_start(), local_day_start(8)])
 
-        # Filter by title search
-        search_query = filters.get('search')
-        if search_query:
-            sql += " AND t.title LIKE ?"
-            params.append(f"%{search_query}%")
+        # Filter by text search (substring fallback without FTS5)
+        if search_query and not self.has_fts:
+            sql += " AND (t.title {like} ? OR t.category {like} ? OR t.description {like} ?)".format(like=self.backend.like)
+            params.extend([f"%{search_query}%"] * 3)
+
+        return sql, params
+
+    def _fts_query(self, filters):
+        # FTS5 query for the search filter, or None without one or without FTS5
+        search_query = (filters or {}).get('search')
+        if not search_query or not self.has_fts:
+            return None
+        return build_fts_query(search_query) or None
+
+    def _select_tasks(self, user_id, filters, where="", where_params=(), limit=None):
+        """
+        (sql, params) selecting task rows that match filters and `where`,
+        ordered by (deadline_ts, id) and cut at `limit`.
+
+        With a full-text search, rows also carry a snippet. The matching ids
+        are picked first, then snippets are made for those rows only and
+        the rows are joined back to the task table on its primary key.
+        """
+        from_where, params = self._task_filter_sql(user_id, filters)
+        from_where += where
+        params.extend(where_params)
+        order = " ORDER BY t.deadline_ts NULLS FIRST, t.id"
+        if limit is not None:
+            order += " LIMIT ?"
+            params.append(limit)
+
+        columns = self._task_columns(filters)
+        fts_query = self._fts_query(filters)
+        if not fts_query:
+            return "SELECT " + columns + from_where + order, params
+
+        archived = (filters or {}).get('archived')
+        table = "archive.archived_tasks" if archived else "tasks"
+        snippets = ARCHIVE_SNIPPETS_SQL if archived else TASK_SNIPPETS_SQL
+        sql = (f"WITH matches AS MATERIALIZED (SELECT t.id{from_where}{order}) "
+               f"SELECT {columns}, s.snippet FROM ({snippets}) s JOIN {table} t ON t.id = s.task_id"
+               " ORDER BY t.deadline_ts NULLS FIRST, t.id")
+        return sql, params + [fts_query]
+
+    def _tag_filter_sql(self, text):
+        """
+        SQL selecting the ids of tags matched by FilterBar tag text.
+
+        Exact and prefix matches use idx_tags_key; substring matches use the
+        trigram index where one exists. Returns (None, []) for no filter.
+        """
+        key, mode = parse_tag_filter(text)
+        if not key:
+            return None, []
+
+        if mode == 'exact':
+            return "SELECT id FROM tags WHERE key = ?", [key]
+        if mode == 'prefix':
+            return "SELECT id FROM tags WHERE key >= ? AND key < ?", [key, prefix_upper_bound(key)]
+
+        # Trigrams need at least three characters to match on
+        if self.has_tag_trigrams and len(key) >= 3:
+            return "SELECT rowid FROM tags_trigram WHERE tags_trigram MATCH ?", ['"' + key.replace('"', '""') + '"']
+
+        # Keys are already case-folded, so a plain LIKE is case-insensitive
+        # on every backend (and PostgreSQL's trigram index serves it)
+        return "SELECT id FROM tags WHERE key LIKE ? ESCAPE '\\'", [f"%{escape_like(key)}%"]
+
+    def _task_columns(self, filters=None):
+        # Row shape shared by the filtered and paged task queries
+        tags = "t.tags" if (filters or {}).get('archived') else self.tags_column
+        return "t.id, t.title, t.category, t.status, t.deadline, t.deadline_ts, t.description, t.remind_before, " + tags
+
+    @cached_query
+    def get_filtered_tasks(self, user_id, filters):
+        """
+        Apply category, status, tag, timeframe, and search filters.
+        """
+        sql, params = self._select_tasks(user_id, filters)
 
-        # Final query
-        sql += " GROUP BY t.id ORDER BY t.deadline"
-        
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
             cursor.execute(sql, params)
             return cursor.fetchall()
         finally:
-            conn.close()
+            self.release_connection(conn)
+
+    @cached_query
+    def get_tasks_page(self, user_id, filters=None, after=None, page_size=PAGE_SIZE):
+        """
+        Fetch one page of tasks ordered by (deadline_ts, id).
+
+        `after` is the (deadline_ts, id) of the last row of the previous page,
+        or None for the first page. A page shorter than page_size is the last.
+        """
+        # Keyset condition walks idx_tasks_user_deadline_ts instead of using OFFSET;
+        # unparsed legacy deadlines are NULL and sort first
+        if after and after[0] is None:
+            where, where_params = " AND (t.deadline_ts IS NOT NULL OR t.id > ?)", [after[1]]
+        elif after:
+            where, where_params = " AND (t.deadline_ts, t.id) > (?, ?)", list(after)
+        else:
+            where, where_params = "", []
+
+        sql, params = self._select_tasks(user_id, filters, where, where_params, limit=page_size)
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        finally:
+            self.release_connection(conn)
+
+    def get_tasks_by_ids(self, user_id, task_ids, filters=None):
+        """
+        The given tasks, shaped like get_tasks_page rows, that still match filters.
+
+        For applying a get_changes_since delta: ids missing from the result
+        were deleted or no longer match.
+        """
+        task_ids = list(task_ids)
+        rows = []
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            for start in range(0, len(task_ids), 500):
+                chunk = task_ids[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                sql, params = self._select_tasks(user_id, filters, f" AND t.id IN ({placeholders})", chunk)
+                cursor.execute(sql, params)
+                rows.extend(cursor.fetchall())
+            return rows
+        finally:
+            self.release_connection(conn)
+
+    def iter_tasks(self, user_id, filters=None, page_size=PAGE_SIZE):
+        # Yield matching tasks page by page without holding the full result
+        after = None
+        while True:
+            page = self.get_tasks_page(user_id, filters, after, page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = (page[-1]['deadline_ts'], page[-1]['id'])
+
+    def stream_tasks(self, user_id, filters=None, batch_size=PAGE_SIZE):
+        """
+        Yield every matching task from one query, batch_size rows at a time.
+
+        Unlike iter_tasks this keeps a connection until the generator is
+        exhausted or closed; on PostgreSQL it reads a server-side cursor.
+        """
+        sql, params = self._select_tasks(user_id, filters)
+
+        conn = self.get_connection()
+        try:
+            yield from self.backend.stream(conn, sql, params, batch_size)
+        finally:
+            self.release_connection(conn)
+
+    @cached_query
+    def count_tasks(self, user_id, filters=None):
+        # Total number of tasks matching the filters
+        from_where, params = self._task_filter_sql(user_id, filters)
+        sql = "SELECT COUNT(*) AS total" + from_where
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            return cursor.fetchone()['total']
+        finally:
+            self.release_connection(conn)
 
     # Retrieve unique task categories
+    @cached_query
     def get_all_categories(self, user_id):
+        # Most used first; read from the task_stats rollup, not the tasks table
+        return [category for category, _ in self.get_category_usage(user_id)]
+
+    def get_category_usage(self, user_id):
+        # (category, task count) pairs, most used first
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute(
-                "SELECT DISTINCT category FROM tasks WHERE user_id = ?",
-                (user_id,)
-            )
-            return [row['category'] for row in cursor.fetchall()]
+            cursor.execute('''
+                SELECT category, SUM(count) AS uses FROM task_stats
+                WHERE user_id = ?
+                GROUP BY category
+                ORDER BY uses DESC, category
+            ''', (user_id,))
+            return [(row['category'], row['uses']) for row in cursor.fetchall()]
         finally:
-            conn.close()
+            self.release_connection(conn)
+
+    def get_tag_usage(self, user_id):
+        # (tag name, task count) pairs for the tags on a user's tasks
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT tg.name, COUNT(*) AS uses FROM tasks t
+                JOIN task_tags tt ON tt.task_id = t.id
+                JOIN tags tg ON tg.id = tt.tag_id
+                WHERE t.user_id = ?
+                GROUP BY tg.id, tg.name
+            ''', (user_id,))
+            return [(row['name'], row['uses']) for row in cursor.fetchall()]
+        finally:
+            self.release_connection(conn)
@@ -1,11 +1,17 @@
 import tkinter as tk
 from tkinter import messagebox
-from utils.config import setup_styles, COLORS
+from utils.config import setup_styles, COLORS, ARCHIVE_AFTER_DAYS, CHANGE_LOG_DAYS, REMIND_BEFORE_MINUTES
 from database import Database
+from utils.status_writer import StatusWriter
+from utils.tag_sweeper import TagSweeper
+from utils.maintenance import MaintenanceService
+from utils.archiver import TaskArchiver
+from utils.change_log import ChangeLogPruner
+from utils.reminders import ReminderScheduler
+from utils.async_db import AsyncDatabase
+from utils.autocomplete import AutocompleteIndex
 from pages import login, register, listview, kanban, settings, profile
 import os
-import threading
-import time
 from plyer import notification
 import ctypes
 import sys
@@ -51,8 +57,30 @@ class TaskApp(tk.Tk):
         self.current_user_id = None
         self.current_user = None
 
-        # Notification thread control
-        self.stop_thread = False
+        # Background committer for drag-and-drop status changes
+        self.status_writer = StatusWriter(self.db)
+        self.status_writer.poll(self)
+
+        # Deletes tags left unused by edits and deletions
+        self.tag_sweeper = TagSweeper(self.db)
+
+        # WAL checkpoints and rotating backups of the local database file
+        self.maintenance = MaintenanceService(self.db) if self.db.backend.name == 'sqlite' else None
+
+        # Moves long-finished tasks out of the live table
+        self.archiver = TaskArchiver(self.db, ARCHIVE_AFTER_DAYS) if ARCHIVE_AFTER_DAYS > 0 else None
+
+        # Keeps the change log behind incremental page refreshes short
+        self.change_pruner = ChangeLogPruner(self.db, CHANGE_LOG_DAYS)
+
+        # Worker threads for page loads, results delivered back on the Tk thread
+        self.async_db = AsyncDatabase(self)
+
+        # Tag and category suggestions for the logged-in user
+        self.autocomplete = AutocompleteIndex(self.db, self.async_db)
+
+        # Desktop reminders ahead of the logged-in user's deadlines
+        self.reminders = ReminderScheduler(self.db, self.show_notification, REMIND_BEFORE_MINUTES)
 
         # Container for all pages
         self.container = tk.Frame(self, bg=COLORS['primary_bg'])
@@ -85,6 +113,19 @@ class TaskApp(tk.Tk):
             frame.grid(row=0, column=0, sticky="nsew")
 
     def show_view(self, page_name):
+        # The next page must see queued status changes; while any are still
+        # being written, wait for them on a worker and switch pages after
+        if self.status_writer.is_idle():
+            self.async_db.cancel(('main', 'view'))
+            self.raise_view(page_name)
+        else:
+            self.async_db.submit(
+                self.status_writer.flush,
+                on_done=lambda done: self.raise_view(page_name),
+                channel=('main', 'view')
+            )
+
+    def raise_view(self, page_name):
         # Raise the selected page
         frame = self.frames[page_name]
         frame.tkraise()
@@ -95,20 +136,17 @@ class TaskApp(tk.Tk):
         # Set user session after login
         self.current_user_id = user_id
         self.current_user = username
+        self.autocomplete.load(user_id)
         self.show_view("KanbanPage")
 
-        # Start notification checker
-        self.stop_thread = False
-        self.notify_thread = threading.Thread(
-            target=self.check_notifications,
-            daemon=True
-        )
-        self.notify_thread.start()
+        # Schedule the user's reminders
+        self.reminders.start(user_id)
 
     def logout(self, prompt=True):
         # Logout without confirmation
         if not prompt:
-            self.stop_thread = True
+            self.reminders.clear()
+            self.autocomplete.clear()
             self.current_user_id = None
             self.current_user = None
             self.show_view("LoginPage")
@@ -116,7 +154,8 @@ class TaskApp(tk.Tk):
 
         # Logout with confirmation
         if tk.messagebox.askyesno("Logout", "Are you sure you want to log out?"):
-            self.stop_thread = True
+            self.reminders.clear()
+            self.autocomplete.clear()
             self.current_user_id = None
             self.current_user = None
             self.show_view("LoginPage")
@@ -136,45 +175,35 @@ class TaskApp(tk.Tk):
             if ans is False:
                 self.iconify()
             elif ans is True:
-                self.stop_thread = True
+                self._shutdown_services()
                 self.destroy()
         else:
-            self.stop_thread = True
+            self._shutdown_services()
             self.destroy()
 
-    def check_notifications(self):
-        # Initial delay before checking
-        time.sleep(2)
-
-        while not self.stop_thread:
-            if self.current_user_id:
-                # Get tasks due today
-                tasks = self.db.get_due_today(self.current_user_id)
-
-                if tasks:
-                    count = len(tasks)
-                    title_text = "TaskFlow Reminder"
-                    msg_text = f"You have {count} task/s due or overdue today!"
-
-                    icon_path = resource_path(os.path.join("assets", "icon.ico"))
-
-                    try:
-                        # Show desktop notification
-                        notification.notify(
-                            title=title_text,
-                            message=msg_text,
-                            app_name='TaskFlow',
-                            app_icon=icon_path if os.path.exists(icon_path) else None,
-                            timeout=10
-                        )
-                    except Exception as e:
-                        print(f"Notification failed: {e}")
-
-            # Check again after 6 hours
-            for _ in range(21600):
-                if self.stop_thread:
-                    break
-                time.sleep(1)
+    def _shutdown_services(self):
+        # Stop the background services, then close the database they use
+        self.reminders.stop()
+        self.async_db.shutdown()
+        self.status_writer.stop()
+        self.tag_sweeper.stop()
+        if self.maintenance:
+            self.maintenance.stop()
+        if self.archiver:
+            self.archiver.stop()
+        self.change_pruner.stop()
+        self.db.close()
+
+    def show_notification(self, title, message):
+        # Show a desktop notification; called from the reminder thread
+        icon_path = resource_path(os.path.join("assets", "icon.ico"))
+        notification.notify(
+            title=title,
+            message=message,
+            app_name='TaskFlow',
+            app_icon=icon_path if os.path.exists(icon_path) else None,
+            timeout=10
+        )
 
 
 if __name__ == "__main__":
@@ -1,22 +1,40 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from utils.config import COLORS, FONTS
-from utils.components import Header, create_input_field, FilterBar
+from utils.components import Header, create_input_field, FilterBar, Autocomplete
+from utils.reminders import REMINDER_OPTIONS, reminder_label, reminder_minutes
+from database import parse_deadline
+
+# Cards loaded per column before a "Load more" button is shown
+PAGE_SIZE = 50
+
+# Board columns, left to right
+STATUSES = ['To Do', 'In Progress', 'Done']
+
+# Past this many changed tasks a full reload is cheaper than patching cards
+MAX_CHANGES = 500
+
+
+def card_order(task):
+    # Same order as the database: NULL deadlines first, then (deadline_ts, id)
+    deadline_ts = task['deadline_ts']
+    return (deadline_ts is not None, deadline_ts or 0, task['id'])
 
 
 class TaskModal(tk.Toplevel):
     """Modal window for adding or editing a single task."""
 
-    def __init__(self, parent, task=None, on_save=None):
+    def __init__(self, parent, task=None, on_save=None, autocomplete=None):
         super().__init__(parent)
         self.task = task
         self.on_save = on_save
+        self.autocomplete = autocomplete
 
         # --- Window Setup ---
         title = "View/Edit Task" if task else "Add New Task"
         self.title(title)
         window_width = 480
-        window_height = 480
+        window_height = 520
 
         # Center window on screen
         screen_width = self.winfo_screenwidth()
@@ -36,6 +54,7 @@ class TaskModal(tk.Toplevel):
         self.tags_var = tk.StringVar()
         self.status_var = tk.StringVar(value="To Do")
         self.date_var = tk.StringVar()
+        self.reminder_var = tk.StringVar(value=REMINDER_OPTIONS[0][0])
 
         # --- Main Container ---
         self.container = tk.Frame(self, bg=COLORS['primary_bg'])
@@ -53,14 +72,19 @@ class TaskModal(tk.Toplevel):
         # Input fields
         create_input_field(self.container, "Title:", self.title_var, 0, 0, 'entry')
         self.cat_cb = create_input_field(self.container, "Category:", self.cat_var, 1, 0, 'entry')
-        create_input_field(self.container, "Tags (#):", self.tags_var, 2, 0, 'entry')
+        tags_entry = create_input_field(self.container, "Tags (#):", self.tags_var, 2, 0, 'entry')
+        if self.autocomplete:
+            Autocomplete(self.cat_cb, self.autocomplete.suggest_categories)
+            Autocomplete(tags_entry, self.autocomplete.suggest_tags, multiple=True)
         create_input_field(self.container, "Status:", self.status_var, 3, 0, 'dropdown')
         create_input_field(self.container, "Deadline:", self.date_var, 4, 0, 'date_picker')
-        self.desc_text = create_input_field(self.container, "Description:", None, 5, 0, 'textarea')
+        create_input_field(self.container, "Reminder:", self.reminder_var, 5, 0, 'dropdown',
+                           values=[label for label, _ in REMINDER_OPTIONS])
+        self.desc_text = create_input_field(self.container, "Description:", None, 6, 0, 'textarea')
 
         # Action buttons
         btn_frame = tk.Frame(self.container, bg=COLORS['primary_bg'])
-        btn_frame.grid(row=7, column=0, columnspan=2, pady=25, sticky='e')
+        btn_frame.grid(row=8, column=0, columnspan=2, pady=25, sticky='e')
 
         tk.Button(btn_frame, text="Save", bg=COLORS['primary_accent'], fg=COLORS['primary_bg'], font=FONTS['bold'],
                   command=self.save_data).pack(side='right', padx=5)
@@ -75,6 +99,7 @@ class TaskModal(tk.Toplevel):
         self.tags_var.set(self.task.get('tags', ''))
         self.status_var.set(self.task.get('status', 'To Do'))
         self.date_var.set(self.task.get('deadline', ''))
+        self.reminder_var.set(reminder_label(self.task.get('remind_before')))
 
         self.desc_text.delete("1.0", tk.END)
         self.desc_text.insert("1.0", self.task.get('description', ''))
@@ -87,6 +112,7 @@ class TaskModal(tk.Toplevel):
             "tags": self.tags_var.get(),
             "status": self.status_var.get(),
             "deadline": self.date_var.get(),
+            "remind_before": reminder_minutes(self.reminder_var.get()),
             "description": self.desc_text.get("1.0", "end-1c").strip()
         }
 
@@ -95,9 +121,20 @@ class TaskModal(tk.Toplevel):
             messagebox.showerror("Error", "Title is required")
             return
 
-        # Call callback if provided
+        # Legacy deadlines that never parsed stay as typed until replaced
+        try:
+            parse_deadline(data["deadline"])
+        except ValueError:
+            messagebox.showerror("Error", f"Deadline is not a valid date: {data['deadline']}")
+            return
+
+        # Call callback if provided; keep the modal open if saving fails
         if self.on_save:
-            self.on_save(data)
+            try:
+                self.on_save(data)
+            except Exception as e:
+                messagebox.showerror("Database Error", f"Failed to save task:\n{e}")
+                return
 
         # Close modal
         self.destroy()
@@ -128,10 +165,17 @@ class KanbanPage(tk.Frame):
         self.board = tk.Frame(self, bg=COLORS['primary_bg'])
         self.board.pack(fill='both', expand=True, padx=(20, 0), pady=20)
 
-        # Internal state for columns and drag-and-drop
+        # Internal state for columns, cards and drag-and-drop
         self.columns = {}
+        self.column_state = {}
+        self.cards = {}
         self.drag_data = {"ghost": None, "task_id": None, "offset_x": 0, "offset_y": 0}
 
+        # Filters and change log version the board reflects
+        self.filters = None
+        self.change_version = None
+        self.change_user = None
+
     def tkraise(self, *args, **kwargs):
         """Override tkraise to refresh board whenever page is shown."""
         super().tkraise(*args, **kwargs)
@@ -143,25 +187,178 @@ class KanbanPage(tk.Frame):
         if hasattr(self, 'filter_bar'):
             self.filter_bar.refresh_options()
 
+        # Same board as before: patch in what changed since it was loaded
+        if self.can_apply_changes(filters):
+            shown = [status for status, state in self.column_state.items() if not state['hidden']]
+            self.controller.async_db.submit(
+                self.load_changes, self.controller.current_user_id, filters, self.change_version, shown,
+                on_done=self.apply_changes, on_error=self.on_load_error,
+                channel=('kanban', 'board')
+            )
+            return
+
+        # Pending "Load more" requests belong to the board being replaced
+        for status in STATUSES:
+            self.controller.async_db.cancel(('kanban', status))
+
+        self.filters = filters
+        self.change_version = None
+        self.controller.async_db.submit(
+            self.load_board, self.controller.current_user_id, filters,
+            on_done=self.render_board, on_error=self.on_load_error,
+            channel=('kanban', 'board')
+        )
+
+    def can_apply_changes(self, filters):
+        """True when a refresh can patch the board instead of reloading it."""
+        if self.change_version is None or self.change_user != self.controller.current_user_id:
+            return False
+        if filters != self.filters:
+            return False
+        # Timeframes move with the clock, not just with edits
+        return (filters or {}).get('timeframe') in (None, '', 'Any Time')
+
+    def load_board(self, user_id, filters):
+        """Fetch each column's count and first page. Runs on a worker thread."""
+        # Read committed data, not from before a pending drop
+        self.controller.status_writer.flush()
+
+        db = self.controller.db
+        # Version first, so changes made during the load are applied later
+        board = {'user_id': user_id, 'version': db.get_change_version()}
+        selected_status = (filters or {}).get('status')
+        for status in STATUSES:
+            if selected_status not in (None, '', 'All Status', status):
+                board[status] = None
+                continue
+
+            column_filters = {**(filters or {}), 'status': status}
+            total, archived = self.count_column(user_id, column_filters)
+            board[status] = (
+                column_filters,
+                total,
+                db.get_tasks_page(user_id, column_filters, None, PAGE_SIZE),
+                archived
+            )
+        return board
+
+    def count_column(self, user_id, column_filters):
+        """A column's task count, and for Done how many more are archived."""
+        db = self.controller.db
+        # Long-finished tasks are archived; the Done column only counts them
+        archived = db.count_tasks(user_id, {**column_filters, 'archived': True}) if column_filters['status'] == 'Done' else 0
+        return db.count_tasks(user_id, column_filters), archived
+
+    def load_changes(self, user_id, filters, version, shown):
+        """Fetch tasks changed since the board was loaded and recount. Runs on a worker thread."""
+        self.controller.status_writer.flush()
+
+        db = self.controller.db
+        changes = db.get_changes_since(user_id, version)
+        changed = changes['inserted'] + changes['updated']
+        if changes['reset'] or len(changed) + len(changes['deleted']) > MAX_CHANGES:
+            return changes, None, None
+        if not changed and not changes['deleted']:
+            return changes, [], {}
+
+        tasks = db.get_tasks_by_ids(user_id, changed, filters) if changed else []
+        counts = {status: self.count_column(user_id, {**(filters or {}), 'status': status}) for status in shown}
+        return changes, tasks, counts
+
+    def apply_changes(self, result):
+        """Move, redraw, add and remove cards for a load_changes result."""
+        changes, tasks, counts = result
+        if tasks is None:
+            self.change_version = None
+            self.refresh(self.filters)
+            return
+        self.change_version = changes['version']
+
+        # Changed cards are redrawn from the fresh rows, if they still match
+        for task_id in changes['inserted'] + changes['updated'] + changes['deleted']:
+            if task_id in self.cards:
+                card, _ = self.cards.pop(task_id)
+                card.destroy()
+
+        for task in tasks:
+            state = self.column_state.get(task['status'])
+            if state and not state['hidden']:
+                self.insert_card(task['status'], task)
+
+        for status, (total, archived) in counts.items():
+            self.column_state[status]['total'] = total
+            self.column_state[status]['archived'] = archived
+            self.update_column_header(status)
+
+    def render_board(self, board):
+        """Redraw all columns from the result of load_board."""
+        self.change_user = board['user_id']
+        self.change_version = board['version']
+
         # Clear current board
         for widget in self.board.winfo_children():
             widget.destroy()
         self.columns = {}
-
-        user_id = self.controller.current_user_id
-
-        # Fetch tasks
-        tasks = self.controller.db.get_filtered_tasks(user_id, filters) if filters else self.controller.db.get_tasks_with_tags(user_id)
+        self.column_state = {}
+        self.cards = {}
 
         # Draw columns and add tasks
-        for i, status in enumerate(['To Do', 'In Progress', 'Done']):
-            outer_frame, inner_frame = self.create_column_widget(self.board, status, i)
+        for i, status in enumerate(STATUSES):
+            outer_frame, inner_frame, header = self.create_column_widget(self.board, status, i)
             self.columns[status] = outer_frame
 
-            # Filter tasks for this column
-            current_tasks = [t for t in tasks if t['status'] == status]
-            for task in current_tasks:
-                self.create_card(inner_frame, task)
+            column = board[status]
+            self.column_state[status] = {
+                'body': inner_frame, 'header': header, 'total': column[1] if column else 0,
+                'archived': column[3] if column else 0, 'more_btn': None, 'hidden': column is None
+            }
+            self.update_column_header(status)
+
+            if column:
+                column_filters, _, tasks, _ = column
+                self.add_column_cards(status, column_filters, tasks)
+
+    def add_column_cards(self, status, filters, tasks):
+        """Append a page of cards to a column, with a button for the rest."""
+        state = self.column_state[status]
+        for task in tasks:
+            # Already placed by an applied change
+            if task['id'] not in self.cards:
+                self.create_card(state['body'], task)
+
+        state['more_btn'] = None
+        if len(tasks) == PAGE_SIZE:
+            last = (tasks[-1]['deadline_ts'], tasks[-1]['id'])
+            more_btn = tk.Button(state['body'], text="Load more", font=FONTS['small'],
+                                 bg=COLORS['secondary_bg'], fg=COLORS['primary_accent'], bd=0)
+            more_btn.config(command=lambda: self.load_more(status, filters, last, more_btn))
+            more_btn.pack(fill='x', padx=5, pady=5)
+            state['more_btn'] = more_btn
+
+    def load_more(self, status, filters, after, button):
+        """Fetch the next page of a column in the background."""
+        button.config(state='disabled', text="Loading...")
+
+        def show_page(tasks):
+            button.destroy()
+            self.add_column_cards(status, filters, tasks)
+
+        self.controller.async_db.submit(
+            self.controller.db.get_tasks_page, self.controller.current_user_id, filters, after, PAGE_SIZE,
+            on_done=show_page, on_error=self.on_load_error, channel=('kanban', status)
+        )
+
+    def on_load_error(self, error):
+        """Report a failed background load."""
+        messagebox.showerror("Database Error", f"Failed to load tasks:\n{error}")
+
+    def update_column_header(self, status):
+        """Show the column title with its task count."""
+        state = self.column_state[status]
+        text = f"{status} ({state['total']})"
+        if state['archived']:
+            text += f" · {state['archived']} archived"
+        state['header'].config(text=text.upper())
 
     # --- Modal / CRUD Helpers ---
     def open_add_modal(self):
@@ -169,14 +366,14 @@ class KanbanPage(tk.Frame):
         def save_new(data):
             self.controller.db.add_task(data, self.controller.current_user_id)
             self.refresh()
-        TaskModal(self, task=None, on_save=save_new)
+        TaskModal(self, task=None, on_save=save_new, autocomplete=self.controller.autocomplete)
 
     def open_details_modal(self, task):
         """Open modal to view/edit an existing task."""
         def save_edit(data):
             self.controller.db.update_task(task['id'], data)
             self.refresh()
-        TaskModal(self, task=task, on_save=save_edit)
+        TaskModal(self, task=task, on_save=save_edit, autocomplete=self.controller.autocomplete)
 
     def delete_task_action(self, task_id):
         """Delete a task after confirmation."""
@@ -190,8 +387,9 @@ class KanbanPage(tk.Frame):
         outer_frame = tk.Frame(parent, bg=COLORS['primary_bg'], bd=1, relief='solid')
         outer_frame.place(relx=index/3, rely=0, relwidth=0.32, relheight=1)
 
-        tk.Label(outer_frame, text=title.upper(), font=FONTS['bold'],
-                 bg=COLORS['primary_accent'], fg='white', pady=5).pack(fill='x')
+        header = tk.Label(outer_frame, text=title.upper(), font=FONTS['bold'],
+                          bg=COLORS['primary_accent'], fg='white', pady=5)
+        header.pack(fill='x')
 
         container = tk.Frame(outer_frame, bg=COLORS['primary_bg'])
         container.pack(fill='both', expand=True)
@@ -213,12 +411,14 @@ class KanbanPage(tk.Frame):
         inner_frame.bind("<Configure>", on_configure)
         canvas.bind("<Configure>", lambda e: canvas.itemconfig(canvas_window, width=e.width))
 
-        return outer_frame, inner_frame
+        return outer_frame, inner_frame, header
 
-    def create_card(self, parent, task):
+    def create_card(self, parent, task, before=None):
         """Create a single task card with drag & drop and right-click menu."""
         card = tk.Frame(parent, bg='white', bd=1, relief='raised', padx=10, pady=10)
-        card.pack(fill='x', padx=5, pady=5)
+        card.pack(fill='x', padx=5, pady=5, before=before)
+        card.task = task
+        self.cards[task['id']] = (card, task)
 
         # Display tags
         self.display_tags(card, task.get('tags', ''))
@@ -230,6 +430,11 @@ class KanbanPage(tk.Frame):
         tk.Label(card, text=task['category'], font=FONTS['small'], bg='white', fg='gray').pack(anchor='w')
         tk.Label(card, text=f"Due: {task['deadline']}", font=FONTS['small'], bg='white', fg=COLORS['primary_accent']).pack(anchor='w')
 
+        # Highlighted excerpt when the board is filtered by a search
+        if task.get('snippet'):
+            tk.Label(card, text=task['snippet'], font=FONTS['small'], bg='white', fg=COLORS['primary_txt'],
+                     wraplength=250, justify='left').pack(anchor='w', pady=(4, 0))
+
         # Context menu for right-click
         context_menu = tk.Menu(self, tearoff=0)
         context_menu.add_command(label="View Details", command=lambda: self.open_details_modal(task))
@@ -313,7 +518,51 @@ class KanbanPage(tk.Frame):
             for status, col in self.columns.items():
                 if (col.winfo_rootx() <= x <= col.winfo_rootx() + col.winfo_width() and
                     col.winfo_rooty() <= y <= col.winfo_rooty() + col.winfo_height()):
-                    # Update task status in DB
-                    self.controller.db.update_status(self.drag_data["task_id"], status)
-                    self.refresh()
+                    # Move the card now; the database write happens in the background
+                    task_id = self.drag_data["task_id"]
+                    if self.move_card(task_id, status):
+                        self.controller.status_writer.queue_status(task_id, status, on_error=self.on_status_error)
                     break
+
+    def move_card(self, task_id, status):
+        """Optimistically move a card to another column. Returns False if nothing changed."""
+        if task_id not in self.cards:
+            return False
+
+        card, task = self.cards.pop(task_id)
+        old_status = task['status']
+        if old_status == status:
+            self.cards[task_id] = (card, task)
+            return False
+
+        card.destroy()
+        self.column_state[old_status]['total'] -= 1
+        self.update_column_header(old_status)
+
+        state = self.column_state[status]
+        state['total'] += 1
+        self.update_column_header(status)
+        if not state['hidden']:
+            self.insert_card(status, dict(task, status=status))
+        return True
+
+    def insert_card(self, status, task):
+        """Add a card to a column in (deadline_ts, id) order."""
+        state = self.column_state[status]
+        key = card_order(task)
+        before = None
+        for widget in state['body'].pack_slaves():
+            # Cards past the loaded page appear via "Load more"
+            if widget is state['more_btn']:
+                return
+            other = getattr(widget, 'task', None)
+            if other and card_order(other) > key:
+                before = widget
+                break
+
+        self.create_card(state['body'], task, before=before)
+
+    def on_status_error(self, task_id, status, error):
+        """Report a failed background status change and reload the board."""
+        messagebox.showerror("Database Error", f"Failed to move task:\n{error}")
+        self.refresh()
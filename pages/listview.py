@@ -1,7 +1,28 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from bisect import bisect_right
+from tkinter import ttk, messagebox, filedialog, simpledialog
 from utils.config import COLORS, FONTS
-from utils.components import Header, create_input_field, FilterBar
+from utils.components import Header, create_input_field, FilterBar, Autocomplete
+from utils.exporter import export_file
+from utils.reminders import REMINDER_OPTIONS, reminder_label, reminder_minutes
+
+# Rows fetched per page as the table is scrolled
+PAGE_SIZE = 200
+
+# Past this many changed tasks a full reload is cheaper than patching rows
+MAX_CHANGES = 500
+
+
+def row_order(task):
+    # Same order as the database: NULL deadlines first, then (deadline_ts, id)
+    deadline_ts = task['deadline_ts']
+    return (deadline_ts is not None, deadline_ts or 0, task['id'])
+
+
+def row_values(task):
+    return [task['id'], task['title'], task['category'], task['status'],
+            task['deadline'], task['description'], task.get('tags', ''),
+            reminder_label(task.get('remind_before'))]
 
 
 class ListViewPage(tk.Frame):
@@ -14,6 +35,21 @@ class ListViewPage(tk.Frame):
         Header(self, controller, show_nav=True).pack(fill='x')
 
         self.selected_id = None
+
+        # Paging state for the task table
+        self.filters = None
+        self.archived = False
+        self.page_after = None
+        self.has_more = False
+        self.page_pending = False
+        self.loaded_count = 0
+        self.total_tasks = 0
+
+        # Change log version the table reflects, and each row's sort key
+        self.change_version = None
+        self.change_user = None
+        self.row_keys = {}
+
         self.setup_ui()
 
     def setup_ui(self):
@@ -32,7 +68,8 @@ class ListViewPage(tk.Frame):
             'category': tk.StringVar(),
             'tags': tk.StringVar(),
             'status': tk.StringVar(),
-            'deadline': tk.StringVar()
+            'deadline': tk.StringVar(),
+            'reminder': tk.StringVar()
         }
 
         input_frame = tk.Frame(sidebar, bg=COLORS['primary_bg'], padx=10, pady=10)
@@ -40,11 +77,15 @@ class ListViewPage(tk.Frame):
         input_frame.grid_columnconfigure(1, weight=1)
 
         create_input_field(input_frame, 'Title:', self.vars['title'], 0, 0, 'entry')
-        create_input_field(input_frame, 'Category:', self.vars['category'], 1, 0, 'entry')
-        create_input_field(input_frame, 'Tags (#):', self.vars['tags'], 2, 0, 'entry')
+        category_entry = create_input_field(input_frame, 'Category:', self.vars['category'], 1, 0, 'entry')
+        tags_entry = create_input_field(input_frame, 'Tags (#):', self.vars['tags'], 2, 0, 'entry')
+        Autocomplete(category_entry, self.controller.autocomplete.suggest_categories)
+        Autocomplete(tags_entry, self.controller.autocomplete.suggest_tags, multiple=True)
         create_input_field(input_frame, 'Status:', self.vars['status'], 3, 0, 'dropdown')
         create_input_field(input_frame, 'Deadline:', self.vars['deadline'], 4, 0, 'date_picker')
-        self.description = create_input_field(input_frame, 'Description:', None, 5, 0, 'textarea')
+        create_input_field(input_frame, 'Reminder:', self.vars['reminder'], 5, 0, 'dropdown',
+                           values=[label for label, _ in REMINDER_OPTIONS])
+        self.description = create_input_field(input_frame, 'Description:', None, 6, 0, 'textarea')
 
         # Buttons
         btn_frame = tk.Frame(sidebar, bg=COLORS['primary_bg'], pady=10)
@@ -61,9 +102,37 @@ class ListViewPage(tk.Frame):
         # Filter bar
         filter_frame = tk.Frame(content, bg=COLORS['primary_bg'])
         filter_frame.pack(fill='x')
-        self.filter_bar = FilterBar(filter_frame, self.controller, on_filter_command=self.refresh)
+        self.filter_bar = FilterBar(filter_frame, self.controller, on_filter_command=self.refresh, show_scope=True)
         self.filter_bar.pack(fill='x')
 
+        status_row = tk.Frame(filter_frame, bg=COLORS['primary_bg'])
+        status_row.pack(fill='x')
+        tk.Button(status_row, text="Export", command=self.export_tasks, font=FONTS['small'],
+                  bg=COLORS['secondary_bg'], fg=COLORS['primary_accent'], bd=0, padx=8).pack(side='left', pady=(5, 0))
+
+        # Actions on every selected row (shift/ctrl-click, Ctrl+A for all loaded)
+        bulk_btn = tk.Menubutton(status_row, text="Bulk Actions ▾", font=FONTS['small'],
+                                 bg=COLORS['secondary_bg'], fg=COLORS['primary_accent'], bd=0, padx=8)
+        bulk_menu = tk.Menu(bulk_btn, tearoff=0)
+        status_menu = tk.Menu(bulk_menu, tearoff=0)
+        for status in ('To Do', 'In Progress', 'Done'):
+            status_menu.add_command(label=status, command=lambda s=status: self.bulk_set_status(s))
+        bulk_menu.add_cascade(label="Set Status", menu=status_menu)
+        bulk_menu.add_command(label="Set Category...", command=self.bulk_set_category)
+        bulk_menu.add_command(label="Add Tags...", command=lambda: self.bulk_edit_tags(add=True))
+        bulk_menu.add_command(label="Remove Tags...", command=lambda: self.bulk_edit_tags(add=False))
+        bulk_menu.add_separator()
+        bulk_menu.add_command(label="Delete Selected", command=self.delete_task)
+        bulk_btn.config(menu=bulk_menu)
+        bulk_btn.pack(side='left', padx=(5, 0), pady=(5, 0))
+
+        # Only shown while browsing the archive
+        self.restore_btn = tk.Button(status_row, text="Restore", command=self.restore_task, font=FONTS['small'],
+                                     bg=COLORS['secondary_bg'], fg=COLORS['primary_accent'], bd=0, padx=8)
+
+        self.count_lbl = tk.Label(status_row, text="", font=FONTS['small'], bg=COLORS['primary_bg'], fg='gray')
+        self.count_lbl.pack(side='right')
+
         # Table
         self.setup_table(content)
 
@@ -76,9 +145,9 @@ class ListViewPage(tk.Frame):
 
         self.tree = ttk.Treeview(
             parent,
-            columns=("Id", "Title", "Category", "Status", "Deadline", "Description", "Tags"),
+            columns=("Id", "Title", "Category", "Status", "Deadline", "Description", "Tags", "Reminder"),
             show='headings',
-            yscrollcommand=y_tree_scroll.set,
+            yscrollcommand=lambda first, last: self.on_tree_scroll(y_tree_scroll, first, last),
             xscrollcommand=x_tree_scroll.set,
         )
         self.tree.pack(side='left', fill='both', expand=True)
@@ -88,13 +157,21 @@ class ListViewPage(tk.Frame):
         column_config = [
             ("Id", 0, 'w'), ("Title", 150, 'w'), ("Category", 100, 'center'),
             ("Status", 100, 'center'), ("Deadline", 100, 'center'),
-            ("Description", 200, 'w'), ("Tags", 100, 'w')
+            ("Description", 200, 'w'), ("Tags", 100, 'w'), ("Reminder", 120, 'center')
         ]
         for col, width, pos in column_config:
             self.tree.column(col, width=width, anchor=pos, stretch=(col != "Id"))
             self.tree.heading(col, text=col if col != "Id" else '', anchor='center')
 
         self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<Control-a>', lambda e: self.tree.selection_set(self.tree.get_children()))
+
+    def on_tree_scroll(self, scrollbar, first, last):
+        """Update the scrollbar and fetch more rows near the bottom of the table."""
+        scrollbar.set(first, last)
+        if self.has_more and not self.page_pending and float(last) > 0.9:
+            self.page_pending = True
+            self.load_next_page()
 
     # --- Search / Refresh Methods ---
     def perform_search(self, event=None):
@@ -124,20 +201,197 @@ class ListViewPage(tk.Frame):
         if hasattr(self, 'filter_bar'):
             self.filter_bar.refresh_options()
 
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        # Same view as before: patch in what changed since it was loaded
+        if self.can_apply_changes(filters):
+            self.load_changes()
+            return
 
-        user_id = self.controller.current_user_id
-        tasks = self.controller.db.get_filtered_tasks(user_id, filters) if filters else self.controller.db.get_tasks_with_tags(user_id)
+        # Rows are loaded a page at a time as the table is scrolled;
+        # a page still loading for the old filters is dropped
+        self.filters = filters
+        self.change_version = None
+        self.archived = bool((filters or {}).get('archived'))
+        self.page_after = None
+        self.has_more = False
+        self.page_pending = False
+        self.controller.async_db.cancel(('listview', 'page'))
+
+        if self.archived:
+            self.restore_btn.pack(side='left', padx=(5, 0), pady=(5, 0))
+        else:
+            self.restore_btn.pack_forget()
+
+        db = self.controller.db
+
+        def load_first_page(user_id):
+            # Version first, so changes made during the load are applied later
+            version = db.get_change_version()
+            return user_id, version, db.count_tasks(user_id, filters), db.get_tasks_page(user_id, filters, None, PAGE_SIZE)
+
+        def show_first_page(result):
+            self.change_user, self.change_version, self.total_tasks, tasks = result
+            for item in self.tree.get_children():
+                self.tree.delete(item)
+            self.row_keys = {}
+            self.loaded_count = 0
+            self.add_rows(tasks)
+
+        self.controller.async_db.submit(
+            load_first_page, self.controller.current_user_id,
+            on_done=show_first_page, on_error=self.on_load_error,
+            channel=('listview', 'refresh')
+        )
+
+    def load_next_page(self):
+        """Fetch the next page of tasks in the background."""
+        self.controller.async_db.submit(
+            self.controller.db.get_tasks_page,
+            self.controller.current_user_id, self.filters, self.page_after, PAGE_SIZE,
+            on_done=self.add_rows, on_error=self.on_load_error,
+            channel=('listview', 'page')
+        )
+
+    def add_rows(self, tasks):
+        """Append a page of tasks to the table."""
+        self.page_pending = False
+        for task in tasks:
+            iid = str(task['id'])
+            # Already placed by an applied change
+            if iid in self.row_keys:
+                continue
+            self.tree.insert('', 'end', iid=iid, values=row_values(task))
+            self.row_keys[iid] = row_order(task)
+            self.loaded_count += 1
+
+        self.has_more = len(tasks) == PAGE_SIZE
+        if tasks:
+            self.page_after = (tasks[-1]['deadline_ts'], tasks[-1]['id'])
+        self.show_count()
+
+    def can_apply_changes(self, filters):
+        """True when a refresh can patch the loaded rows instead of reloading."""
+        if self.change_version is None or self.change_user != self.controller.current_user_id:
+            return False
+        if filters != self.filters or self.archived:
+            return False
+        # Timeframes move with the clock, not just with edits
+        return (filters or {}).get('timeframe') in (None, '', 'Any Time')
+
+    def load_changes(self):
+        """Fetch the tasks changed since the table was loaded, in the background."""
+        db = self.controller.db
+        filters = self.filters
+        version = self.change_version
+
+        def load(user_id):
+            changes = db.get_changes_since(user_id, version)
+            changed = changes['inserted'] + changes['updated']
+            if changes['reset'] or len(changed) + len(changes['deleted']) > MAX_CHANGES:
+                return changes, None, None
+            if not changed and not changes['deleted']:
+                return changes, [], None
+            tasks = db.get_tasks_by_ids(user_id, changed, filters) if changed else []
+            return changes, tasks, db.count_tasks(user_id, filters)
+
+        self.controller.async_db.submit(
+            load, self.controller.current_user_id,
+            on_done=self.apply_changes, on_error=self.on_load_error,
+            channel=('listview', 'refresh')
+        )
+
+    def apply_changes(self, result):
+        """Update, move, add and remove rows for a load_changes result."""
+        changes, tasks, total = result
+        if tasks is None:
+            self.change_version = None
+            self.refresh(self.filters)
+            return
+        self.change_version = changes['version']
+
+        # Changed tasks that no longer match (or are gone) leave the table
+        matching = {str(task['id']) for task in tasks}
+        for task_id in changes['inserted'] + changes['updated'] + changes['deleted']:
+            iid = str(task_id)
+            if iid in self.row_keys and iid not in matching:
+                self.remove_row(iid)
 
         for task in tasks:
-            values = [task['id'], task['title'], task['category'], task['status'],
-                      task['deadline'], task['description'], task.get('tags', '')]
-            self.tree.insert('', 'end', values=values)
+            self.place_row(task)
+
+        if total is not None:
+            self.total_tasks = total
+        self.show_count()
+
+    def place_row(self, task):
+        """Put a task's row at its sorted position, or drop it if that is past the loaded rows."""
+        iid = str(task['id'])
+        key = row_order(task)
+        if self.row_keys.get(iid) == key:
+            self.tree.item(iid, values=row_values(task))
+            return
+        if iid in self.row_keys:
+            self.remove_row(iid)
+
+        children = self.tree.get_children()
+        index = bisect_right([self.row_keys[child] for child in children], key)
+        # Rows past the last loaded one arrive with a later page
+        if index == len(children) and self.has_more:
+            return
+        self.tree.insert('', index, iid=iid, values=row_values(task))
+        self.row_keys[iid] = key
+        self.loaded_count += 1
+
+    def remove_row(self, iid):
+        self.tree.delete(iid)
+        del self.row_keys[iid]
+        self.loaded_count -= 1
+
+    def show_count(self):
+        """Show how many of the matching tasks are loaded."""
+        kind = "archived tasks" if self.archived else "tasks"
+        text = f"Showing {self.loaded_count} of {self.total_tasks} {kind}"
+        selected = len(self.tree.selection())
+        if selected > 1:
+            text += f" · {selected} selected"
+        self.count_lbl.config(text=text)
+
+    # --- Export ---
+    def export_tasks(self):
+        """Export the tasks matching the current filters to a file."""
+        path = filedialog.asksaveasfilename(
+            title="Export Tasks",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("iCalendar", "*.ics")]
+        )
+        if not path:
+            return
+
+        # Streams on a worker; the table keeps working meanwhile
+        self.count_lbl.config(text="Exporting...")
+        self.controller.async_db.submit(
+            export_file, self.controller.db, path, self.controller.current_user_id, None, self.filters,
+            on_done=lambda total: self.on_export_done(total, path),
+            on_error=self.on_export_error,
+            channel=('listview', 'export')
+        )
+
+    def on_export_done(self, total, path):
+        self.show_count()
+        messagebox.showinfo("Export Complete", f"Exported {total} tasks to\n{path}")
+
+    def on_export_error(self, error):
+        self.show_count()
+        messagebox.showerror("Export Failed", f"Could not export tasks:\n{error}")
+
+    def on_load_error(self, error):
+        """Report a failed background load."""
+        self.page_pending = False
+        messagebox.showerror("Database Error", f"Failed to load tasks:\n{error}")
 
     def on_select(self, event):
         """Populate sidebar fields when a task is selected."""
         sel = self.tree.selection()
+        self.show_count()
         if not sel:
             return
         vals = self.tree.item(sel[0], 'values')
@@ -147,6 +401,7 @@ class ListViewPage(tk.Frame):
         self.vars['tags'].set(vals[6])
         self.vars['status'].set(vals[3])
         self.vars['deadline'].set(vals[4])
+        self.vars['reminder'].set(vals[7])
         self.description.delete('1.0', tk.END)
         self.description.insert('1.0', vals[5])
 
@@ -161,7 +416,9 @@ class ListViewPage(tk.Frame):
 
     def get_data(self):
         """Retrieve current input data from sidebar fields."""
-        return {k: v.get().strip() for k, v in self.vars.items()} | {'description': self.description.get('1.0', 'end-1c').strip()}
+        data = {k: v.get().strip() for k, v in self.vars.items()} | {'description': self.description.get('1.0', 'end-1c').strip()}
+        data['remind_before'] = reminder_minutes(data.pop('reminder'))
+        return data
 
     # --- CRUD Operations ---
     def add_task(self):
@@ -191,7 +448,9 @@ class ListViewPage(tk.Frame):
         if not self.validate_input(data):
             return
 
-        if self.selected_id:
+        if self.selected_id and self.archived:
+            messagebox.showinfo("Archived Task", "Restore this task before editing it.")
+        elif self.selected_id:
             try:
                 self.controller.db.update_task(self.selected_id, data)
             except Exception as e:
@@ -202,17 +461,88 @@ class ListViewPage(tk.Frame):
             messagebox.showwarning("Selection Required", "Please select a task first by clicking on it in the table.")
 
     def delete_task(self):
-        """Delete the selected task from the database."""
-        if not self.selected_id:
+        """Delete the selected tasks from the database."""
+        task_ids = self.selected_ids()
+        if not task_ids:
             return
 
-        if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this task?\nThis action cannot be undone."):
-            try:
-                self.controller.db.delete_task(self.selected_id)
-            except Exception as e:
-                messagebox.showerror("Database Error", f"Failed to delete task:\n{e}")
-            self.refresh()
+        what = "this task" if len(task_ids) == 1 else f"these {len(task_ids)} tasks"
+        if messagebox.askyesno("Confirm Delete", f"Are you sure you want to delete {what}?\nThis action cannot be undone."):
+            db = self.controller.db
+            self.run_bulk(db.delete_archived_tasks if self.archived else db.delete_tasks_bulk, task_ids,
+                          failure="Failed to delete tasks")
+
+    def restore_task(self):
+        """Move the selected archived tasks back to the active tasks."""
+        task_ids = self.selected_ids()
+        if not task_ids:
+            messagebox.showwarning("Selection Required", "Please select a task first by clicking on it in the table.")
+            return
+        self.run_bulk(self.controller.db.restore_tasks, task_ids, failure="Failed to restore tasks")
+
+    # --- Bulk Operations ---
+    def selected_ids(self):
+        """Ids of every selected row."""
+        return [int(iid) for iid in self.tree.selection()]
+
+    def editable_selection(self):
+        """Selected ids, or None after telling the user why they cannot be edited."""
+        task_ids = self.selected_ids()
+        if not task_ids:
+            messagebox.showwarning("Selection Required", "Please select one or more tasks in the table first.")
+            return None
+        if self.archived:
+            messagebox.showinfo("Archived Tasks", "Restore these tasks before editing them.")
+            return None
+        return task_ids
+
+    def bulk_set_status(self, status):
+        """Give every selected task the same status."""
+        task_ids = self.editable_selection()
+        if task_ids:
+            self.run_bulk(self.controller.db.update_status_bulk, task_ids, status,
+                          failure="Failed to update tasks")
+
+    def bulk_set_category(self):
+        """Move every selected task to one category."""
+        task_ids = self.editable_selection()
+        if not task_ids:
+            return
+        category = simpledialog.askstring("Set Category", f"Category for {len(task_ids)} task(s):", parent=self)
+        if category and category.strip():
+            self.run_bulk(self.controller.db.update_category_bulk, task_ids, category.strip(),
+                          failure="Failed to update tasks")
+
+    def bulk_edit_tags(self, add):
+        """Add tags to, or remove tags from, every selected task."""
+        task_ids = self.editable_selection()
+        if not task_ids:
+            return
+        title = "Add Tags" if add else "Remove Tags"
+        tags = simpledialog.askstring(title, f"Tags (comma separated) for {len(task_ids)} task(s):", parent=self)
+        if tags and tags.strip():
+            db = self.controller.db
+            self.run_bulk(db.add_tags_bulk if add else db.remove_tags_bulk, task_ids, tags,
+                          failure="Failed to update tags")
+
+    def run_bulk(self, action, task_ids, *args, failure):
+        """Run one bulk database call in the background, then refresh the table once.
+
+        Bulk calls queue on the writer in order; none replaces another.
+        """
+        def on_done(result):
             self.clear_fields()
+            self.refresh(self.filters)
+
+        def on_error(error):
+            messagebox.showerror("Database Error", f"{failure}:\n{error}")
+            self.refresh(self.filters)
+
+        self.controller.async_db.submit(
+            action, task_ids, *args,
+            on_done=on_done, on_error=on_error,
+            executor=self.controller.async_db.writer
+        )
 
     def clear_fields(self):
         """Clear all sidebar input fields."""
@@ -97,8 +97,19 @@ class LoginPage(tk.Frame):
         """Verify credentials and log user in."""
         user = self.user_var.get()
         pw = self.pass_var.get()
-        user_id = self.controller.db.verify_user(user, pw)
-        
+
+        # bcrypt is deliberately slow, so check off the Tk thread
+        self.config(cursor="watch")
+        self.controller.async_db.submit(
+            self.controller.db.verify_user, user, pw,
+            on_done=lambda user_id: self.finish_login(user_id, user),
+            on_error=self.login_failed,
+            channel=('login', 'verify'),
+            executor=self.controller.db.hasher.executor
+        )
+
+    def finish_login(self, user_id, user):
+        self.config(cursor="")
         if user_id:
             self.user_var.set("")
             self.pass_var.set("")
@@ -106,6 +117,10 @@ class LoginPage(tk.Frame):
         else:
             messagebox.showerror("Login Error", "Incorrect username or password. Please try again.")
 
+    def login_failed(self, error):
+        self.config(cursor="")
+        messagebox.showerror("Login Error", f"Could not log in: {error}")
+
 class ForgotPasswordModal(tk.Toplevel):
     def __init__(self, parent, controller):
         super().__init__(parent)
@@ -255,8 +270,18 @@ class ForgotPasswordModal(tk.Toplevel):
         user_data = self.controller.db.get_user_by_email(self.target_email)
         current_username = user_data['username']
 
-        success = self.controller.db.update_credentials(self.user_id, current_username, new_pw)
-        
+        self.config(cursor="watch")
+        self.controller.async_db.submit(
+            self.controller.db.update_credentials, self.user_id, current_username, new_pw,
+            on_done=self.finish_save,
+            on_error=lambda error: self.finish_save(False),
+            executor=self.controller.db.hasher.executor
+        )
+
+    def finish_save(self, success):
+        if not self.winfo_exists():
+            return
+        self.config(cursor="")
         if success:
             messagebox.showinfo("Success", "Password reset successfully! Please login.")
             self.destroy()
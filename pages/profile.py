@@ -1,5 +1,5 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 from utils.config import COLORS, FONTS
 from utils.components import Header, create_input_field
 
@@ -96,10 +96,24 @@ class ProfilePage(tk.Frame):
         if not user_id:
             return
 
-        # Retrieve analytics data
-        analytics = self.controller.db.get_analytics(user_id)
+        # Retrieve analytics data in the background
+        self.controller.async_db.submit(
+            self.controller.db.get_analytics, user_id,
+            on_done=self.show_analytics, on_error=self.on_load_error,
+            channel=('profile', 'analytics')
+        )
+
+    def on_load_error(self, error):
+        """Report a failed background load"""
+        messagebox.showerror("Database Error", f"Failed to load analytics:\n{error}")
+
+    def show_analytics(self, analytics):
+        """Display analytics returned by the database"""
         self.data_matrix = analytics['matrix']
-        self.total_lbl.config(text=f"Total Tasks: {analytics['total_tasks']}")
+        total_text = f"Total Tasks: {analytics['total_tasks']}"
+        if analytics['archived_tasks']:
+            total_text += f" ({analytics['archived_tasks']} more archived)"
+        self.total_lbl.config(text=total_text)
 
         # Aggregate stats across all categories
         all_stats = {'total': 0, 'To Do': 0, 'In Progress': 0, 'Done': 0}
@@ -98,9 +98,17 @@ class RegisterPage(tk.Frame):
             messagebox.showerror("Password Error", "Passwords do not match.")
             return
 
-        # Create user
-        success = self.controller.db.create_user(username, email, password)
+        # Create user; hashing runs off the Tk thread
+        self.config(cursor="watch")
+        self.controller.async_db.submit(
+            self.controller.db.create_user, username, email, password,
+            on_done=self.finish_register,
+            on_error=lambda error: self.finish_register(False),
+            executor=self.controller.db.hasher.executor
+        )
 
+    def finish_register(self, success):
+        self.config(cursor="")
         if success:
             messagebox.showinfo("Signup Success", "Account created successfully!\nPlease log in.")
             self.user_var.set("")
@@ -3,6 +3,16 @@ from tkinter import ttk, messagebox
 from utils.config import COLORS, FONTS
 from utils.components import Header, create_input_field
 
+
+def change_credentials(db, username, current_pass, new_user, new_pass):
+    # Runs on a worker: returns (new_user, None) for a wrong password,
+    # otherwise (new_user, whether the update succeeded)
+    user_id = db.verify_user(username, current_pass)
+    if not user_id:
+        return new_user, None
+    return new_user, db.update_credentials(user_id, new_user, new_pass)
+
+
 class SettingsPage(tk.Frame):
     """Settings page for updating profile and security details"""
 
@@ -123,6 +133,17 @@ class SettingsPage(tk.Frame):
         self.pass_new_var.set('')
         self.pass_confirm_var.set('')
 
+    def submit_change(self, current_pass, new_user, new_pass, on_done):
+        # bcrypt checks and hashes are slow, so both run on the hashing pool
+        self.controller.async_db.submit(
+            change_credentials, self.controller.db, self.controller.current_user,
+            current_pass, new_user, new_pass,
+            on_done=on_done,
+            on_error=lambda error: messagebox.showerror("Error", f"Failed to update credentials: {error}"),
+            channel=('settings', 'credentials'),
+            executor=self.controller.db.hasher.executor
+        )
+
     # ---------------- USERNAME UPDATE LOGIC ----------------
     def update_username(self):
         new_user = self.new_username_var.get().strip()
@@ -137,16 +158,14 @@ class SettingsPage(tk.Frame):
             messagebox.showwarning("Invalid Username", "Username must be between 4 and 20 characters.")
             return
 
-        # Verify password
-        user_id = self.controller.db.verify_user(self.controller.current_user, current_pass)
-        if not user_id:
-            messagebox.showerror("Error", "Incorrect Password.")
-            return
-
-        # Update username only
-        success = self.controller.db.update_credentials(user_id, new_user, None)
+        # Verify password, then update username only, off the Tk thread
+        self.submit_change(current_pass, new_user, None, self.finish_username_update)
 
-        if success:
+    def finish_username_update(self, result):
+        new_user, success = result
+        if success is None:
+            messagebox.showerror("Error", "Incorrect Password.")
+        elif success:
             self.controller.update_session_user(new_user)
             messagebox.showinfo("Success", "Username updated successfully!")
             self.user_current_pass_var.set('')
@@ -172,20 +191,14 @@ class SettingsPage(tk.Frame):
             messagebox.showerror("Error", "New passwords do not match.")
             return
 
-        # Verify current password
-        user_id = self.controller.db.verify_user(self.controller.current_user, current_pass)
-        if not user_id:
-            messagebox.showerror("Error", "Current password is incorrect.")
-            return
+        # Verify current password, then update password only
+        self.submit_change(current_pass, self.controller.current_user, new_pass, self.finish_password_update)
 
-        # Update password only
-        success = self.controller.db.update_credentials(
-            user_id,
-            self.controller.current_user,
-            new_pass
-        )
-
-        if success:
+    def finish_password_update(self, result):
+        _, success = result
+        if success is None:
+            messagebox.showerror("Error", "Current password is incorrect.")
+        elif success:
             messagebox.showinfo("Success", "Password updated! Please login again.")
             self.controller.logout(prompt=False)
         else:
@@ -0,0 +1,19 @@
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# database.py resolves its app directory at import time; keep tests out of
+# the real one, on the default SQLite backend, at the cheapest bcrypt cost
+APPDATA = tempfile.mkdtemp(prefix="taskflow-tests-")
+os.environ["APPDATA"] = APPDATA
+os.environ["DB_BACKEND"] = "sqlite"
+
+app_dir = Path(APPDATA) / "TaskFlow"
+app_dir.mkdir(parents=True, exist_ok=True)
+with open(app_dir / "hash_cost.json", "w", encoding="utf-8") as f:
+    json.dump({'rounds': 10, 'target_ms': None}, f)
@@ -0,0 +1,235 @@
+import os
+import random
+import threading
+import time
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+from psycopg2.extensions import make_dsn
+
+import database
+from database import Database, record_factory
+from utils.postgres_backend import PostgresBackend, SCHEMA_VERSION, translate
+
+# Server to test against, e.g. "host=/tmp/pgdata user=postgres dbname=postgres".
+# The tests create a database of their own there and drop it afterwards.
+DSN = os.getenv("TASKFLOW_TEST_PG_DSN")
+
+FILTERS = [
+    {},
+    {'category': 'Work'},
+    {'status': 'Done'},
+    {'tag': 'urgent'},
+    {'search': 'report'},
+    {'timeframe': 'Overdue'},
+]
+
+
+@pytest.fixture(scope="module")
+def db():
+    if not DSN:
+        pytest.skip("TASKFLOW_TEST_PG_DSN is not set")
+
+    name = f"taskflow_test_{os.getpid()}"
+    admin = psycopg2.connect(DSN)
+    admin.autocommit = True
+    admin.cursor().execute(f"DROP DATABASE IF EXISTS {name}")
+    admin.cursor().execute(f"CREATE DATABASE {name}")
+
+    dsn = make_dsn(DSN, dbname=name)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(database, "create_backend",
+                      lambda db_file, on_open=None: PostgresBackend(record_factory, max_connections=4, dsn=dsn))
+        instance = Database()
+    try:
+        yield instance
+    finally:
+        instance.close()
+        admin.cursor().execute(f"DROP DATABASE IF EXISTS {name}")
+        admin.close()
+
+
+@pytest.fixture(scope="module")
+def user_id(db):
+    db.create_user("pgtest", "pgtest@example.com", "secret123")
+    return db.get_user_by_username("pgtest")['id']
+
+
+def new_task(n, **fields):
+    task = {
+        'title': f"report {n}",
+        'category': ['Work', 'Home', 'Study'][n % 3],
+        'status': ['To Do', 'In Progress', 'Done'][n % 3],
+        'deadline': f"2025-{n % 12 + 1:02d}-{n % 28 + 1:02d} 09:00",
+        'description': "quarterly numbers",
+        'tags': "urgent" if n % 4 == 0 else "",
+    }
+    task.update(fields)
+    return task
+
+
+def task_ids(rows):
+    return [row['id'] for row in rows]
+
+
+def test_translate_placeholders():
+    assert translate("SELECT * FROM t WHERE a = ? AND b = ?") == "SELECT * FROM t WHERE a = %s AND b = %s"
+    assert translate("UPDATE t SET a = :a WHERE id = :id") == "UPDATE t SET a = %(a)s WHERE id = %(id)s"
+    # Literal percent signs, in or out of quotes, reach psycopg2 escaped
+    assert translate("SELECT '50%' WHERE a LIKE ?") == "SELECT '50%%' WHERE a LIKE %s"
+    assert translate("SELECT a % 2 FROM t") == "SELECT a %% 2 FROM t"
+    # Placeholder characters inside string literals are left alone
+    assert translate("SELECT 'a?b :c' FROM t WHERE x = ?") == "SELECT 'a?b :c' FROM t WHERE x = %s"
+
+
+def test_migrations_reach_current_version(db):
+    conn = db.get_connection()
+    try:
+        assert db.get_schema_version(conn) == SCHEMA_VERSION
+        # Running them again is a no-op
+        db.migrate(conn)
+        assert db.get_schema_version(conn) == SCHEMA_VERSION
+    finally:
+        db.release_connection(conn)
+
+
+def test_crud(db, user_id):
+    assert db.verify_user("pgtest", "secret123")
+    assert not db.verify_user("pgtest", "wrong")
+
+    db.add_task(new_task(1, title="crud task", tags="alpha, Beta"), user_id)
+    task = db.get_filtered_tasks(user_id, {'search': 'crud task'})[0]
+    assert task['category'] == 'Home'
+    assert sorted(task['tags'].split(', ')) == ['Beta', 'alpha']
+
+    db.update_task(task['id'], new_task(1, title="crud task edited", status='Done', tags="alpha"))
+    task = db.get_tasks_by_ids(user_id, [task['id']])[0]
+    assert (task['title'], task['status'], task['tags']) == ("crud task edited", 'Done', "alpha")
+
+    db.update_status(task['id'], 'In Progress')
+    assert db.get_tasks_by_ids(user_id, [task['id']])[0]['status'] == 'In Progress'
+
+    db.delete_task(task['id'])
+    assert db.get_tasks_by_ids(user_id, [task['id']]) == []
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_paging_and_streaming_match(db, user_id, filters):
+    if db.count_tasks(user_id) < 100:
+        db.add_tasks_bulk((new_task(n) for n in range(100)), user_id)
+
+    expected = task_ids(db.get_filtered_tasks(user_id, filters))
+    assert expected
+    assert db.count_tasks(user_id, filters) == len(expected)
+    assert task_ids(db.iter_tasks(user_id, filters, page_size=7)) == expected
+    assert task_ids(db.stream_tasks(user_id, filters, batch_size=5)) == expected
+
+
+def test_task_stats_survive_concurrent_writes(db, user_id):
+    db.add_tasks_bulk((new_task(n) for n in range(200)), user_id)
+    ids = task_ids(db.get_filtered_tasks(user_id, {}))
+    errors = []
+
+    def bulk(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(10):
+                db.update_status_bulk(rng.sample(ids, 50), rng.choice(['To Do', 'In Progress', 'Done']))
+                db.add_tags_bulk(rng.sample(ids, 50), rng.choice(['x', 'y']))
+                db.remove_tags_bulk(rng.sample(ids, 50), rng.choice(['x', 'y']))
+                db.update_category_bulk(rng.sample(ids, 30), rng.choice(['Work', 'Home']))
+        except Exception as e:
+            errors.append(e)
+
+    def single(seed):
+        rng = random.Random(seed)
+        try:
+            for n in range(40):
+                db.update_task(rng.choice(ids), new_task(n, tags=rng.choice(['x', 'x, y', ''])))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=f, args=(seed,)) for seed, f in enumerate((bulk, bulk, single, single))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert db.check_task_stats() == []
+
+    conn = db.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT COUNT(*) AS drift FROM tags tg
+            WHERE ref_count <> (SELECT COUNT(*) FROM task_tags tt WHERE tt.tag_id = tg.id)
+        ''')
+        assert cursor.fetchone()['drift'] == 0
+    finally:
+        db.release_connection(conn)
+
+    db.delete_tasks_bulk(ids)
+    assert db.check_task_stats() == []
+
+
+def test_change_log_sees_every_concurrent_write(db, user_id):
+    # Transactions commit out of txid order; a reader polling while they
+    # run must still see each insert exactly once
+    version = db.get_change_version()
+
+    def writer(n):
+        for i in range(25):
+            db.add_task(new_task(i, title=f"change {n}-{i}"), user_id)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+
+    seen = []
+    while any(thread.is_alive() for thread in threads):
+        changes = db.get_changes_since(user_id, version)
+        assert not changes['reset']
+        seen.extend(changes['inserted'])
+        version = changes['version']
+    for thread in threads:
+        thread.join()
+    changes = db.get_changes_since(user_id, version)
+    seen.extend(changes['inserted'])
+
+    created = task_ids(db.get_filtered_tasks(user_id, {'search': 'change '}))
+    assert len(created) == 100
+    assert sorted(seen) == sorted(created)
+
+    # Updates and deletes come through as such
+    version = changes['version']
+    db.update_status(created[0], 'Done')
+    db.delete_task(created[1])
+    changes = db.get_changes_since(user_id, version)
+    assert (changes['updated'], changes['deleted'], changes['inserted']) == ([created[0]], [created[1]], [])
+
+
+def test_archive_keeps_reminder_offsets(db, user_id):
+    for n, remind_before in enumerate((None, -1, 60)):
+        db.add_task(new_task(n, title=f"finished {n}", status='Done', remind_before=remind_before), user_id)
+    before = {row['id']: row['remind_before'] for row in db.get_filtered_tasks(user_id, {'search': 'finished'})}
+
+    while db.archive_done_tasks(time.time() + 1):
+        pass
+    archived = db.get_filtered_tasks(user_id, {'archived': True, 'search': 'finished'})
+    assert {row['id']: row['remind_before'] for row in archived} == before
+
+    assert db.restore_tasks(before) == 3
+    restored = db.get_filtered_tasks(user_id, {'search': 'finished'})
+    assert {row['id']: row['remind_before'] for row in restored} == before
+
+
+def test_short_tag_filters_match_literally(db):
+    db.create_user("pgtags", "pgtags@example.com", "secret123")
+    user_id = db.get_user_by_username("pgtags")['id']
+    for tag in ('a_', 'ab', '5%', '50'):
+        db.add_task(new_task(2, title=tag, tags=tag), user_id)
+
+    for text, expected in (('a_', ['a_']), ('%', ['5%']), ('a', ['a_', 'ab'])):
+        assert sorted(task['title'] for task in db.get_filtered_tasks(user_id, {'tag': text})) == expected
@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+import database
+from database import Database
+
+
+def new_task(title, status='To Do'):
+    return {'title': title, 'category': 'Work', 'status': status, 'deadline': "2024-01-01 09:00",
+            'description': "", 'tags': ""}
+
+
+@pytest.fixture
+def dbs(tmp_path):
+    # Two clients of one file, as with the app and dbtool running side by side
+    first, second = Database(tmp_path / "tasks.db"), Database(tmp_path / "tasks.db")
+    first.create_user("cache", "cache@example.com", "secret123")
+    yield first, second, first.get_user_by_username("cache")['id']
+    first.close()
+    second.close()
+
+
+def statements(db, call):
+    # SQL that call() runs on this thread's connection
+    executed = []
+    conn = db.get_connection()
+    conn.set_trace_callback(executed.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+        db.release_connection(conn)
+    return executed
+
+
+def test_cache_hit_does_not_touch_the_database(dbs):
+    db, _, user_id = dbs
+    db.add_task(new_task("cached"), user_id)
+    db.get_filtered_tasks(user_id, {})
+    assert statements(db, lambda: db.get_filtered_tasks(user_id, {})) == []
+
+    # Local writes are seen straight away
+    db.add_task(new_task("cached too"), user_id)
+    assert len(db.get_filtered_tasks(user_id, {})) == 2
+
+
+def test_other_process_writes_show_up_after_the_ttl(dbs, monkeypatch):
+    db, other, user_id = dbs
+    monkeypatch.setattr(database, "CACHE_VERSION_TTL", 0.2)
+    db.add_task(new_task("first"), user_id)
+    assert len(db.get_filtered_tasks(user_id, {})) == 1
+
+    other.add_task(new_task("second"), user_id)
+    time.sleep(0.25)
+    assert len(db.get_filtered_tasks(user_id, {})) == 2
+
+
+def test_archive_deletes_bump_the_change_version(dbs, monkeypatch):
+    db, other, user_id = dbs
+    monkeypatch.setattr(database, "CACHE_VERSION_TTL", 0.2)
+    db.add_task(new_task("done", status='Done'), user_id)
+    db.archive_done_tasks(time.time() + 1)
+    archived = db.get_filtered_tasks(user_id, {'archived': True})
+    assert len(archived) == 1
+
+    version = other.get_change_version()
+    other.delete_archived_tasks([archived[0]['id']])
+    changes = other.get_changes_since(user_id, version)
+    assert changes['deleted'] == [archived[0]['id']]
+
+    time.sleep(0.25)
+    assert db.get_filtered_tasks(user_id, {'archived': True}) == []
@@ -0,0 +1,33 @@
+import database
+from database import Database
+
+
+def test_slow_nested_calls_keep_the_outer_write(tmp_path, monkeypatch):
+    # Every call counts as slow, including the tag helpers add_task runs
+    # inside its transaction; explaining them must not roll that back
+    monkeypatch.setenv("TASKFLOW_TRACE", "1")
+    monkeypatch.setenv("TASKFLOW_SLOW_MS", "0")
+    monkeypatch.setattr(database, "TRACE_LOG", tmp_path / "slow_queries.log")
+
+    db = Database(tmp_path / "tasks.db")
+    try:
+        db.create_user("tracer", "tracer@example.com", "secret123")
+        user_id = db.get_user_by_username("tracer")['id']
+        db.add_task({'title': "traced", 'category': 'Work', 'status': 'To Do', 'deadline': "2030-01-01 09:00",
+                     'description': "", 'tags': "a, b"}, user_id)
+
+        assert [task['title'] for task in db.get_all_tasks(user_id)] == ["traced"]
+        tasks = db.get_filtered_tasks(user_id, {})
+        assert sorted(tasks[0]['tags'].split(', ')) == ['a', 'b']
+
+        task_id = tasks[0]['id']
+        db.update_task(task_id, {'title': "traced again", 'category': 'Work', 'status': 'Done',
+                                 'deadline': "2030-01-01 09:00", 'description': "", 'tags': "c"})
+        task = db.get_tasks_by_ids(user_id, [task_id])[0]
+        assert (task['title'], task['tags']) == ("traced again", "c")
+        assert db.get_trace_stats()['add_task']['slow'] == 1
+    finally:
+        db.close()
+
+    log = (tmp_path / "slow_queries.log").read_text(encoding='utf-8')
+    assert "SLOW add_task" in log and "PLAN:" in log
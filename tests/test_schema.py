@@ -0,0 +1,203 @@
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import Database, SCHEMA_VERSION
+
+# The four tables as the app created them before migrations existed
+BASELINE_SCHEMA = '''
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL
+    );
+    CREATE TABLE tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        category TEXT NOT NULL,
+        status TEXT NOT NULL,
+        deadline TEXT NOT NULL,
+        description TEXT NOT NULL,
+        user_id INTEGER REFERENCES users(id) ON DELETE CASCADE
+    );
+    CREATE TABLE tags (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL
+    );
+    CREATE TABLE task_tags (
+        task_id INTEGER,
+        tag_id INTEGER,
+        PRIMARY KEY (task_id, tag_id),
+        FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE,
+        FOREIGN KEY(tag_id) REFERENCES tags(id) ON DELETE CASCADE
+    );
+'''
+
+CATEGORIES = ['Work', 'Home', 'Study']
+STATUSES = ['To Do', 'In Progress', 'Done']
+
+# Plan lines that read a whole task table instead of one user's rows
+TABLE_SCAN = re.compile(r"^SCAN (t|tasks|tt|task_tags)\b")
+
+
+@pytest.fixture
+def db(tmp_path):
+    # A baseline-shaped file with a few users' tasks, migrated by opening it
+    path = tmp_path / "baseline.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    today = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+    for user_id in (1, 2, 3):
+        conn.execute("INSERT INTO users (id, username, email, password_hash) VALUES (?, ?, ?, 'x')",
+                     (user_id, f"user{user_id}", f"user{user_id}@example.com"))
+        for n in range(60):
+            deadline = today + timedelta(days=n - 20)
+            conn.execute(
+                "INSERT INTO tasks (title, category, status, deadline, description, user_id) VALUES (?, ?, ?, ?, ?, ?)",
+                (f"report {n}", CATEGORIES[n % 3], STATUSES[n % 3], deadline.strftime("%Y-%m-%d %H:%M"),
+                 "quarterly numbers", user_id)
+            )
+    conn.execute("INSERT INTO tags (name) VALUES ('urgent')")
+    conn.execute("INSERT INTO task_tags (task_id, tag_id) SELECT id, 1 FROM tasks WHERE id % 4 = 0")
+    conn.commit()
+    conn.close()
+
+    database = Database(path)
+    yield database
+    database.close()
+
+
+def query_plans(db, call):
+    # EXPLAIN QUERY PLAN details of each SELECT that call() runs
+    statements = []
+    conn = db.get_connection()
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+        db.release_connection(conn)
+
+    plans = {}
+    conn = db.get_connection()
+    try:
+        for sql in statements:
+            # Trigger steps arrive as comments; sqlite_sequence holds the cache's change version
+            if not sql.lstrip().upper().startswith(('SELECT', 'WITH')) or 'sqlite_sequence' in sql:
+                continue
+            plans[sql] = [row['detail'] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+    finally:
+        db.release_connection(conn)
+    return plans
+
+
+def assert_indexed(plans, index):
+    # No whole-table scans, and `index` serves at least one statement
+    assert plans
+    for sql, details in plans.items():
+        scans = [d for d in details if TABLE_SCAN.match(d)]
+        assert not scans, f"table scan in {sql}: {details}"
+    assert any(index in d for details in plans.values() for d in details), plans
+
+
+def test_baseline_migrates_to_current_version(db):
+    conn = db.get_connection()
+    try:
+        assert db.get_schema_version(conn) == SCHEMA_VERSION
+        indexes = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        tasks = conn.execute("SELECT COUNT(*) AS n, COUNT(deadline_ts) AS parsed FROM tasks").fetchone()
+    finally:
+        db.release_connection(conn)
+
+    assert {'idx_tasks_user_deadline_ts', 'idx_tasks_user_status', 'idx_tasks_user_category_status',
+            'idx_task_tags_tag'} <= indexes
+    # Existing rows survive, with their deadlines parsed
+    assert tasks['n'] == tasks['parsed'] == 180
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'category': 'Work'},
+    {'status': 'Done'},
+    {'category': 'Work', 'status': 'Done'},
+    {'tag': 'urgent'},
+    {'timeframe': 'Overdue'},
+    {'timeframe': 'Due Today'},
+    {'timeframe': 'Next 7 Days', 'category': 'Home'},
+])
+def test_filtered_tasks_walk_the_deadline_index(db, filters):
+    plans = query_plans(db, lambda: db.get_filtered_tasks(1, filters))
+    assert_indexed(plans, 'idx_tasks_user_deadline_ts')
+    # Rows come out of the index already in deadline order
+    for sql, details in plans.items():
+        assert 'USE TEMP B-TREE FOR ORDER BY' not in details, f"sort in {sql}: {details}"
+
+
+def test_tag_filter_uses_tag_index(db):
+    plans = query_plans(db, lambda: db.get_filtered_tasks(1, {'tag': 'urgent'}))
+    assert_indexed(plans, 'idx_task_tags_tag')
+
+
+def test_search_reads_only_the_users_rows(db):
+    plans = query_plans(db, lambda: db.get_filtered_tasks(1, {'search': 'report'}))
+    assert_indexed(plans, 'idx_tasks_user_deadline_ts')
+
+
+def test_analytics_uses_indexes(db):
+    plans = query_plans(db, lambda: db.get_analytics(1))
+    assert_indexed(plans, 'idx_tasks_user_deadline_ts')
+
+
+def test_due_today_uses_deadline_index(db):
+    plans = query_plans(db, lambda: db.get_due_today(1))
+    assert_indexed(plans, 'idx_tasks_user_deadline_ts (user_id=? AND deadline_ts<?)')
+
+
+def test_old_archive_file_gains_reminder_column(tmp_path):
+    # An archive file from before reminders is upgraded when attached
+    conn = sqlite3.connect(tmp_path / "tasks.db.archive")
+    conn.execute('''
+        CREATE TABLE archived_tasks (
+            id INTEGER PRIMARY KEY, user_id INTEGER, title TEXT NOT NULL, category TEXT NOT NULL,
+            status TEXT NOT NULL, deadline TEXT NOT NULL, deadline_ts INTEGER, deadline_tz TEXT,
+            description TEXT NOT NULL, tags TEXT, tag_keys TEXT, done_at INTEGER, archived_at INTEGER NOT NULL
+        )
+    ''')
+    conn.execute("INSERT INTO archived_tasks VALUES (1, 1, 'old', 'Work', 'Done', '2024-01-01 09:00', 0, NULL, '', NULL, NULL, 0, 0)")
+    conn.commit()
+    conn.close()
+
+    database = Database(tmp_path / "tasks.db")
+    try:
+        conn = database.get_connection()
+        try:
+            columns = [row['name'] for row in conn.execute("PRAGMA archive.table_info(archived_tasks)")]
+            row = conn.execute("SELECT title, remind_before FROM archive.archived_tasks").fetchone()
+        finally:
+            database.release_connection(conn)
+    finally:
+        database.close()
+
+    assert 'remind_before' in columns
+    assert (row['title'], row['remind_before']) == ('old', None)
+
+
+def test_archive_keeps_reminder_offsets(db):
+    db.create_user("archiver", "archiver@example.com", "secret123")
+    user_id = db.get_user_by_username("archiver")['id']
+    for n, remind_before in enumerate((None, -1, 60)):
+        db.add_task({'title': f"finished {n}", 'category': 'Work', 'status': 'Done',
+                     'deadline': "2024-01-01 09:00", 'description': "", 'tags': "",
+                     'remind_before': remind_before}, user_id)
+    before = {row['id']: row['remind_before'] for row in db.get_filtered_tasks(user_id, {})}
+
+    db.archive_done_tasks(time.time() + 1)
+    archived = db.get_filtered_tasks(user_id, {'archived': True})
+    assert {row['id']: row['remind_before'] for row in archived} == before
+
+    assert db.restore_tasks(before) == 3
+    assert {row['id']: row['remind_before'] for row in db.get_filtered_tasks(user_id, {})} == before
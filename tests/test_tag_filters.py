@@ -0,0 +1,42 @@
+import time
+
+import pytest
+
+from database import Database
+
+TAGS = ['a_', 'ab', 'ax', '5%', '50', 'x\\y', 'xy']
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(tmp_path / "tasks.db")
+    database.create_user("tagger", "tagger@example.com", "secret123")
+    yield database
+    database.close()
+
+
+def tagged_titles(db, user_id, text, archived=False):
+    filters = {'tag': text, 'archived': True} if archived else {'tag': text}
+    return sorted(task['title'] for task in db.get_filtered_tasks(user_id, filters))
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('a_', ['a_']),
+    ('_', ['a_']),
+    ('%', ['5%']),
+    ('5%', ['5%']),
+    ('x\\', ['x\\y']),
+    ('a', ['a_', 'ab', 'ax']),
+])
+def test_short_substring_filters_match_literally(db, text, expected):
+    # Keys under three characters skip the trigram index and use LIKE;
+    # live and archived tasks must match the same tags
+    user_id = db.get_user_by_username("tagger")['id']
+    for tag in TAGS:
+        db.add_task({'title': tag, 'category': 'Work', 'status': 'Done', 'deadline': "2024-01-01 09:00",
+                     'description': "", 'tags': tag}, user_id)
+    assert tagged_titles(db, user_id, text) == expected
+
+    db.archive_done_tasks(time.time() + 1)
+    assert tagged_titles(db, user_id, text) == []
+    assert tagged_titles(db, user_id, text, archived=True) == expected
@@ -0,0 +1,25 @@
+import time
+
+from utils.worker import BatchWorker
+
+
+class TaskArchiver(BatchWorker):
+    """
+    Background move of long-finished tasks into the archive.
+
+    A while after startup, and then every `interval` seconds, archives the
+    tasks that have been Done for more than `after_days` days, a small
+    batch at a time like the other background jobs.
+    """
+
+    counted = 'archived'
+    report = "Archived {} finished task(s)"
+    error_label = "Archive"
+
+    def __init__(self, db, after_days, batch_size=200, pause=0.05, delay=60, interval=3600):
+        self.after_days = after_days
+        super().__init__(db, batch_size, pause=pause, delay=delay, interval=interval)
+
+    def batch(self):
+        before_ts = int(time.time()) - self.after_days * 86400
+        return self.db.archive_done_tasks(before_ts, self.batch_size)
@@ -0,0 +1,96 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncDatabase:
+    """
+    Runs database work on worker threads and hands results back to Tk.
+
+    Callbacks always run on the Tk main thread, picked up by after() polling
+    while requests are outstanding. Requests submitted on the same channel
+    replace each other: only the newest one's callback ever runs. Writes go
+    on `writer` without a channel instead, so they run one at a time in the
+    order given and none is dropped.
+    """
+
+    def __init__(self, widget, max_workers=2, interval=20):
+        self.widget = widget
+        self.interval = interval
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db-worker')
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-writer')
+        self._results = queue.Queue()
+        self._channels = {}  # channel -> future of its newest request
+        self._outstanding = 0
+        self._polling = False
+        self._closed = False
+
+    def submit(self, func, *args, on_done=None, on_error=None, channel=None, executor=None, **kwargs):
+        # Run func(*args, **kwargs) on a worker; on_done(result) / on_error(exc) run on Tk.
+        # executor runs the call on another pool instead, e.g. password hashing
+        if self._closed:
+            return None
+
+        if channel is not None:
+            self.cancel(channel)
+
+        future = (executor or self._executor).submit(func, *args, **kwargs)
+        if channel is not None:
+            self._channels[channel] = future
+
+        self._outstanding += 1
+        future.add_done_callback(lambda f: self._results.put((f, channel, on_done, on_error)))
+
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.interval, self._poll)
+        return future
+
+    def cancel(self, channel):
+        # Drop a channel's request; if it is already running its result is ignored
+        future = self._channels.pop(channel, None)
+        if future:
+            future.cancel()
+
+    def shutdown(self):
+        # Stop accepting work and wait for running requests to finish;
+        # queued writes still run, queued reads are dropped
+        self._closed = True
+        self._channels.clear()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.writer.shutdown(wait=True)
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    future, channel, on_done, on_error = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                self._outstanding -= 1
+                self._deliver(future, channel, on_done, on_error)
+        finally:
+            # Keep polling while anything is in flight, even if a callback raised
+            if self._outstanding and not self._closed:
+                self.widget.after(self.interval, self._poll)
+            else:
+                self._polling = False
+
+    def _deliver(self, future, channel, on_done, on_error):
+        if future.cancelled() or self._closed:
+            return
+
+        # Superseded by a newer request on the same channel
+        if channel is not None:
+            if self._channels.get(channel) is not future:
+                return
+            del self._channels[channel]
+
+        error = future.exception()
+        if error:
+            if on_error:
+                on_error(error)
+            else:
+                print(f"Database Error: {error}")
+        elif on_done:
+            on_done(future.result())
@@ -0,0 +1,143 @@
+import heapq
+import threading
+from bisect import bisect_left
+
+from utils.tags import tag_key, prefix_upper_bound
+
+
+class PrefixIndex:
+    """
+    Sorted array of normalized keys with a usage count per key.
+
+    A prefix is one bisect range over the keys. Narrow ranges are ranked
+    directly; wide ones (short prefixes) instead walk the keys in usage
+    order and stop at the first `limit` inside the range, which is quick
+    precisely because so many keys match.
+    """
+
+    # Above this many matches, walking the usage order beats sorting them
+    WIDE_RANGE = 256
+
+    def __init__(self, usage=()):
+        # usage: (display name, count) pairs; keys that repeat are summed
+        self._names = {}
+        self._counts = {}
+        for name, count in usage:
+            key = tag_key(name)
+            self._names.setdefault(key, name)
+            self._counts[key] = self._counts.get(key, 0) + count
+        self._keys = sorted(self._counts)
+
+        # Positions in _keys, most used first
+        self._by_usage = sorted(range(len(self._keys)), key=lambda i: (-self._counts[self._keys[i]], self._keys[i]))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def suggest(self, prefix, limit=8):
+        # Names starting with prefix, most used first, then alphabetically
+        key = tag_key(prefix)
+        if key:
+            lo = bisect_left(self._keys, key)
+            hi = bisect_left(self._keys, prefix_upper_bound(key), lo)
+        else:
+            lo, hi = 0, len(self._keys)
+
+        if hi - lo > self.WIDE_RANGE:
+            matches = []
+            for i in self._by_usage:
+                if lo <= i < hi:
+                    matches.append(self._keys[i])
+                    if len(matches) == limit:
+                        break
+        else:
+            matches = heapq.nsmallest(limit, self._keys[lo:hi], key=lambda k: (-self._counts[k], k))
+        return [self._names[k] for k in matches]
+
+    def names(self):
+        # Every name, most used first
+        return [self._names[self._keys[i]] for i in self._by_usage]
+
+
+class AutocompleteIndex:
+    """
+    The logged-in user's tags and categories, for as-you-type suggestions.
+
+    Loaded once at login on a worker. Every committed task write marks it
+    stale (see Database.add_change_listener); the next lookup after that
+    starts a background reload and keeps answering from the current
+    snapshot until the new one is swapped in, so lookups never wait on
+    the database.
+    """
+
+    def __init__(self, db, async_db):
+        self.db = db
+        self.async_db = async_db
+
+        self.user_id = None
+        self.tags = PrefixIndex()
+        self.categories = PrefixIndex()
+
+        self._lock = threading.Lock()
+        self._stale = False
+
+        db.add_change_listener(self._on_tasks_changed)
+
+    def load(self, user_id):
+        # Start loading a user's vocabulary; suggestions are empty until it lands
+        with self._lock:
+            self.user_id = user_id
+            self._stale = False
+        self.tags = PrefixIndex()
+        self.categories = PrefixIndex()
+        self._reload()
+
+    def clear(self):
+        with self._lock:
+            self.user_id = None
+            self._stale = False
+        self.async_db.cancel(('autocomplete', 'load'))
+        self.tags = PrefixIndex()
+        self.categories = PrefixIndex()
+
+    def suggest_tags(self, prefix, limit=8):
+        self._refresh_if_stale()
+        return self.tags.suggest(prefix, limit)
+
+    def suggest_categories(self, prefix, limit=8):
+        self._refresh_if_stale()
+        return self.categories.suggest(prefix, limit)
+
+    def _on_tasks_changed(self, user_ids):
+        # Runs on whichever thread committed the write
+        with self._lock:
+            if self.user_id in user_ids:
+                self._stale = True
+
+    def _refresh_if_stale(self):
+        with self._lock:
+            stale, self._stale = self._stale, False
+        if stale:
+            self._reload()
+
+    def _reload(self):
+        user_id = self.user_id
+        if user_id is None:
+            return
+        self.async_db.submit(
+            self._fetch, user_id,
+            on_done=lambda indexes: self._swap(user_id, indexes),
+            channel=('autocomplete', 'load')
+        )
+
+    def _fetch(self, user_id):
+        # Worker side: both vocabularies, built off the Tk thread
+        return (
+            PrefixIndex(self.db.get_tag_usage(user_id)),
+            PrefixIndex(self.db.get_category_usage(user_id))
+        )
+
+    def _swap(self, user_id, indexes):
+        # A logout or another login while loading makes this result moot
+        if user_id == self.user_id:
+            self.tags, self.categories = indexes
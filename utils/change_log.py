@@ -0,0 +1,24 @@
+import time
+
+from utils.worker import BatchWorker
+
+
+class ChangeLogPruner(BatchWorker):
+    """
+    Background trimming of the task change log.
+
+    Every `interval` seconds, deletes change log entries older than
+    `retention_days` in batches. A view that has not refreshed for longer
+    than that gets a reset from get_changes_since and reloads in full.
+    """
+
+    counted = 'pruned'
+    error_label = "Change Log Prune"
+
+    def __init__(self, db, retention_days, batch_size=1000, pause=0.05, delay=120, interval=3600):
+        self.retention_days = retention_days
+        super().__init__(db, batch_size, pause=pause, delay=delay, interval=interval)
+
+    def batch(self):
+        before_ts = int(time.time()) - self.retention_days * 86400
+        return self.db.prune_changes(before_ts, self.batch_size)
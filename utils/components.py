@@ -176,7 +176,133 @@ class DropdownMenu(tk.Toplevel):
         command()
 
 
-def create_input_field(parent, label_text, var, row, col, input_type, mask=False):
+class Autocomplete:
+    """
+    As-you-type suggestion list under an Entry.
+
+    `suggest(text, limit)` returns the names to offer, best first; it is called on
+    every keystroke, so it should be an in-memory lookup such as
+    AutocompleteIndex.suggest_tags. With multiple=True the entry holds a
+    comma-separated list and only the word being typed is completed.
+    """
+
+    def __init__(self, entry, suggest, multiple=False, limit=8):
+        self.entry = entry
+        self.suggest = suggest
+        self.multiple = multiple
+        self.limit = limit
+        self.popup = None
+        self.listbox = None
+
+        # Own bindtag ahead of the entry's, so Return/Tab picking a
+        # suggestion stops before the entry's own Return binding
+        tag = f"autocomplete{id(self)}"
+        entry.bindtags((tag,) + entry.bindtags())
+        entry.bind_class(tag, '<KeyRelease>', self.on_key)
+        entry.bind_class(tag, '<Down>', lambda e: self.move(1))
+        entry.bind_class(tag, '<Up>', lambda e: self.move(-1))
+        entry.bind_class(tag, '<Return>', self.accept)
+        entry.bind_class(tag, '<Tab>', self.accept)
+        entry.bind_class(tag, '<Escape>', self.escape)
+        entry.bind_class(tag, '<FocusOut>', lambda e: entry.after(150, self.hide))
+
+    def current_word(self):
+        # (text before the word being typed, the word)
+        text = self.entry.get()
+        if self.multiple and ',' in text:
+            head, word = text.rsplit(',', 1)
+            return head + ', ', word.strip()
+        return '', text.strip()
+
+    def on_key(self, event):
+        if event.keysym in ('Up', 'Down', 'Return', 'Tab', 'Escape'):
+            return
+
+        _, word = self.current_word()
+        term = word.lstrip('=').rstrip('*')
+        names = self.suggest(term, self.limit) if term else []
+
+        # Nothing to offer beyond what is already typed
+        if not names or (len(names) == 1 and names[0].casefold() == term.casefold()):
+            self.hide()
+            return
+        self.show(names)
+
+    def show(self, names):
+        if self.popup is None:
+            self.popup = tk.Toplevel(self.entry)
+            self.popup.overrideredirect(True)
+            self.popup.attributes('-topmost', True)
+            self.listbox = tk.Listbox(
+                self.popup,
+                font=FONTS['default'],
+                bg=COLORS['primary_bg'],
+                fg=COLORS['primary_txt'],
+                selectbackground=COLORS['primary_accent'],
+                activestyle='none',
+                bd=1,
+                relief='solid'
+            )
+            self.listbox.pack(fill='both', expand=True)
+            self.listbox.bind('<ButtonRelease-1>', self.accept)
+
+        self.listbox.delete(0, 'end')
+        for name in names:
+            self.listbox.insert('end', name)
+        self.listbox.configure(height=len(names))
+        self.listbox.selection_set(0)
+
+        # Drop down under the entry, as wide as it
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        self.popup.geometry(f"{self.entry.winfo_width()}x{self.listbox.winfo_reqheight()}+{x}+{y}")
+        self.popup.deiconify()
+
+    def hide(self):
+        if self.popup is not None:
+            self.popup.withdraw()
+
+    def visible(self):
+        return self.popup is not None and self.popup.winfo_viewable()
+
+    def move(self, step):
+        if not self.visible():
+            return
+        size = self.listbox.size()
+        current = self.listbox.curselection()
+        index = ((current[0] if current else -1) + step) % size
+        self.listbox.selection_clear(0, 'end')
+        self.listbox.selection_set(index)
+        self.listbox.see(index)
+        return 'break'
+
+    def accept(self, event=None):
+        # Replace the word being typed with the selected suggestion
+        if not self.visible():
+            return
+        current = self.listbox.curselection()
+        if not current:
+            self.hide()
+            return
+
+        head, word = self.current_word()
+        choice = self.listbox.get(current[0])
+        if word.startswith('='):
+            choice = '=' + choice
+
+        self.entry.delete(0, 'end')
+        self.entry.insert(0, head + choice + (', ' if self.multiple else ''))
+        self.entry.icursor('end')
+        self.hide()
+        return 'break'
+
+    def escape(self, event=None):
+        if self.visible():
+            self.hide()
+            return 'break'
+
+
+def create_input_field(parent, label_text, var, row, col, input_type, mask=False, values=None):
     # Input label
     label = tk.Label(
         parent,
@@ -227,14 +353,14 @@ def create_input_field(parent, label_text, var, row, col, input_type, mask=False
             return textarea
         
         case 'dropdown':
-            # Status selection dropdown
+            # Selection dropdown, of task statuses unless given values
             status_options = ['To Do', 'In Progress', 'Done']
 
             combobox = ttk.Combobox(
                 parent, 
                 textvariable=var,
                 font=FONTS['default'],
-                values=status_options,
+                values=values or status_options,
                 state='readonly',
             )
             combobox.grid(row=row, column=col+1, sticky='ew', padx=(0, 10), pady=5, ipady=5)
@@ -346,10 +472,11 @@ def create_input_field(parent, label_text, var, row, col, input_type, mask=False
         
 
 class FilterBar(tk.Frame):
-    def __init__(self, parent, controller, on_filter_command):
+    def __init__(self, parent, controller, on_filter_command, show_scope=False):
         super().__init__(parent, bg=COLORS['primary_bg'], padx=10, pady=10, bd=1, relief='groove')
         self.controller = controller
         self.on_filter_command = on_filter_command 
+        self.show_scope = show_scope
 
         # Filter variables
         self.search_var = tk.StringVar()
@@ -357,6 +484,7 @@ class FilterBar(tk.Frame):
         self.status_var = tk.StringVar(value="All Status")
         self.time_var = tk.StringVar(value="Any Time")
         self.tag_var = tk.StringVar()
+        self.scope_var = tk.StringVar(value="Active Tasks")
 
         # Grid layout configuration
         self.grid_columnconfigure(0, weight=0) 
@@ -395,11 +523,17 @@ class FilterBar(tk.Frame):
         )
         self.tag_entry.grid(row=1, column=1, padx=(0, 15), pady=5, sticky='ew')
         self.tag_entry.bind('<Return>', lambda e: self.apply_filters())
+        Autocomplete(self.tag_entry, controller.autocomplete.suggest_tags)
 
         # Timeframe filter
         self.time_cb = ttk.Combobox(self, textvariable=self.time_var, values=["Any Time", "Overdue", "Due Today", "Next 7 Days"], state='readonly', font=FONTS['default'])
         self.time_cb.grid(row=1, column=2, padx=(0, 10), pady=5, sticky='ew')
 
+        # Archive scope: live tasks by default, archived ones on request
+        if show_scope:
+            self.scope_cb = ttk.Combobox(self, textvariable=self.scope_var, values=["Active Tasks", "Archived"], state='readonly', font=FONTS['default'])
+            self.scope_cb.grid(row=2, column=2, padx=(0, 10), pady=5, sticky='ew')
+
         # Action buttons
         btn_frame = tk.Frame(self, bg=COLORS['primary_bg'])
         btn_frame.grid(row=1, column=3, sticky='ew', pady=5)
@@ -416,8 +550,11 @@ class FilterBar(tk.Frame):
         # Refresh category options from database
         user_id = self.controller.current_user_id
         if user_id:
-            cats = self.controller.db.get_all_categories(user_id)
-            self.cat_cb['values'] = ["All Categories"] + cats
+            self.controller.async_db.submit(
+                self.controller.db.get_all_categories, user_id,
+                on_done=lambda cats: self.cat_cb.configure(values=["All Categories"] + cats),
+                channel=('filter_bar', str(self))
+            )
             
     def apply_filters(self):
         # Collect and apply filters
@@ -428,6 +565,8 @@ class FilterBar(tk.Frame):
             'timeframe': self.time_var.get(),
             'tag': self.tag_var.get().strip()
         }
+        if self.show_scope and self.scope_var.get() == "Archived":
+            filters['archived'] = True
         self.on_filter_command(filters)
 
     def clear_filters(self):
@@ -437,4 +576,5 @@ class FilterBar(tk.Frame):
         self.status_var.set("All Status")
         self.time_var.set("Any Time")
         self.tag_var.set("")
+        self.scope_var.set("Active Tasks")
         self.apply_filters()
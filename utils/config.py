@@ -1,19 +1,34 @@
 import tkinter as tk
-# import os
-# from dotenv import load_dotenv
+import os
+from dotenv import load_dotenv
 
 # DB_FILE = 'task_management.db'
 
 # ADMIN_USER = ''
 # ADMIN_PASS = ''
 
-# load_dotenv()
+load_dotenv()
 
-# DB_HOST = os.getenv("DB_HOST")
-# DB_NAME = os.getenv("DB_NAME")
-# DB_USER = os.getenv("DB_USER")
-# DB_PASS = os.getenv("DB_PASS")
-# DB_PORT = os.getenv("DB_PORT")
+# Storage backend: "sqlite" (local file, default) or "postgres" (shared server)
+DB_BACKEND = os.getenv("DB_BACKEND", "sqlite").lower()
+
+# PostgreSQL connection settings, used when DB_BACKEND=postgres
+DB_HOST = os.getenv("DB_HOST")
+DB_NAME = os.getenv("DB_NAME")
+DB_USER = os.getenv("DB_USER")
+DB_PASS = os.getenv("DB_PASS")
+DB_PORT = os.getenv("DB_PORT")
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "8"))
+
+# Days a task stays Done before it moves to the archive; 0 turns archiving off
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+
+# Days of task change history kept for incremental page refreshes
+CHANGE_LOG_DAYS = int(os.getenv("CHANGE_LOG_DAYS", "7"))
+
+# Minutes before a deadline that tasks without an offset of their own
+# remind; -1 leaves them without a reminder
+REMIND_BEFORE_MINUTES = int(os.getenv("REMIND_BEFORE_MINUTES", "60"))
 
 # Centralized color palette
 COLORS = {
@@ -0,0 +1,247 @@
+"""
+Maintenance commands for the TaskFlow database.
+
+    python -m utils.dbtool stats-check
+    python -m utils.dbtool stats-rebuild
+    python -m utils.dbtool hash-calibrate [--target-ms 250]
+    python -m utils.dbtool tags-report
+    python -m utils.dbtool tags-sweep [--recount]
+    python -m utils.dbtool backup [--dir PATH] [--keep 7]
+    python -m utils.dbtool checkpoint [--truncate]
+    python -m utils.dbtool wal-report
+    python -m utils.dbtool archive [--days 90]
+    python -m utils.dbtool restore ID [ID ...]
+    python -m utils.dbtool archive-report
+    python -m utils.dbtool changes-report
+    python -m utils.dbtool changes-prune [--days 7]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from database import Database, HASH_COST_FILE
+from utils.hashing import TARGET_MS, calibrate, save_rounds
+from utils.config import ARCHIVE_AFTER_DAYS, CHANGE_LOG_DAYS
+from utils import maintenance
+
+
+def stats_check(db, args):
+    # Report rollup rows that disagree with the tasks table
+    problems = db.check_task_stats()
+    if not problems:
+        print("task_stats is consistent")
+        return 0
+
+    for user_id, category, status, expected, stored in problems:
+        print(f"user {user_id} / {category} / {status}: expected {expected}, stored {stored}")
+    print(f"{len(problems)} inconsistent row(s), run stats-rebuild to fix")
+    return 1
+
+
+def stats_rebuild(db, args):
+    # Recompute the rollups from scratch
+    db.rebuild_task_stats()
+    print("task_stats rebuilt")
+    return 0
+
+
+def hash_calibrate(db, args):
+    # Re-time bcrypt here; existing hashes move to the new cost at next login
+    rounds = save_rounds(HASH_COST_FILE, calibrate(args.target_ms), args.target_ms)
+    print(f"bcrypt cost set to {rounds} (was {db.hasher.rounds}) for ~{args.target_ms} ms per hash")
+    return 0
+
+
+def tags_report(db, args):
+    # How many tags exist and how many no task uses
+    stats = db.get_tag_stats()
+    print(f"{stats['tags']} tag(s), {stats['orphans']} unreferenced")
+    return 0
+
+
+def tags_sweep(db, args):
+    # Reclaim every unreferenced tag now, in the sweeper's small batches
+    if args.recount:
+        db.recount_tag_refs()
+
+    reclaimed = batches = 0
+    while True:
+        deleted = db.sweep_orphan_tags(args.batch_size)
+        reclaimed += deleted
+        batches += 1
+        if deleted < args.batch_size:
+            break
+
+    stats = db.get_tag_stats()
+    print(f"Reclaimed {reclaimed} orphan tag(s) in {batches} batch(es); {stats['tags']} tag(s) remain")
+    return 0
+
+
+def sqlite_only(db):
+    if db.backend.name != 'sqlite':
+        print("Only the local SQLite database is managed here; use the server's own tools")
+        return False
+    return True
+
+
+def backup(db, args):
+    # Online snapshot of the database file, then rotation
+    if not sqlite_only(db):
+        return 1
+    backup_dir = args.dir or db.backend.db_file.parent / "backups"
+    backup_dir.mkdir(parents=True, exist_ok=True)
+
+    conn = db.get_connection()
+    try:
+        path, pages, archive_pages = maintenance.backup_all(conn, backup_dir)
+    finally:
+        db.release_connection(conn)
+
+    removed = maintenance.rotate_backups(backup_dir, args.keep)
+    removed += maintenance.rotate_backups(backup_dir, args.keep, maintenance.ARCHIVE_PREFIX)
+    print(f"Backed up {pages} page(s) to {path} and {archive_pages} archive page(s); "
+          f"removed {len(removed)} old snapshot(s)")
+    return 0
+
+
+def checkpoint(db, args):
+    if not sqlite_only(db):
+        return 1
+    mode = 'TRUNCATE' if args.truncate else 'PASSIVE'
+    conn = db.get_connection()
+    try:
+        busy, frames, copied = maintenance.checkpoint(conn, mode)
+    finally:
+        db.release_connection(conn)
+    print(f"{mode} checkpoint: {copied}/{frames} WAL frame(s) copied{' (busy)' if busy else ''}")
+    return 1 if busy else 0
+
+
+def wal_report(db, args):
+    # WAL size, how far checkpoints lag, and the snapshots on disk
+    if not sqlite_only(db):
+        return 1
+    conn = db.get_connection()
+    try:
+        # PASSIVE never waits, and reports the frame counts as it copies
+        busy, frames, copied = maintenance.checkpoint(conn, 'PASSIVE')
+    finally:
+        db.release_connection(conn)
+
+    print(f"WAL: {maintenance.wal_size(db.backend.db_file)} bytes, {frames} frame(s), "
+          f"{frames - copied} not yet checkpointed")
+    backups = maintenance.list_backups(db.backend.db_file.parent / "backups")
+    for path in backups:
+        print(f"  {path.name}  {path.stat().st_size} bytes")
+    print(f"{len(backups)} backup(s)")
+    return 0
+
+
+def archive(db, args):
+    # Archive tasks Done for longer than --days now, instead of waiting for the app
+    before_ts = int(time.time()) - args.days * 86400
+    total = 0
+    while True:
+        moved = db.archive_done_tasks(before_ts, args.batch_size)
+        total += moved
+        if moved < args.batch_size:
+            break
+    print(f"Archived {total} task(s) finished more than {args.days} day(s) ago")
+    return 0
+
+
+def restore(db, args):
+    restored = db.restore_tasks(args.ids)
+    print(f"Restored {restored} of {len(args.ids)} task(s)")
+    return 0 if restored == len(args.ids) else 1
+
+
+def archive_report(db, args):
+    before_ts = int(time.time()) - args.days * 86400
+    stats = db.get_archive_stats(before_ts)
+    print(f"{stats['archived']} archived task(s); "
+          f"{stats['due']} finished more than {args.days} day(s) ago still live")
+    if db.backend.name == 'sqlite' and db.backend.archive_file.exists():
+        print(f"Archive file: {db.backend.archive_file} ({db.backend.archive_file.stat().st_size} bytes)")
+    return 0
+
+
+def changes_report(db, args):
+    stats = db.get_change_stats()
+    oldest = time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['oldest'])) if stats['oldest'] else "-"
+    print(f"{stats['entries']} change log entries, oldest {oldest}")
+    print(f"Version {stats['version']}, pruned through {stats['pruned_through']}")
+    return 0
+
+
+def changes_prune(db, args):
+    before_ts = int(time.time()) - args.days * 86400
+    total = 0
+    while True:
+        deleted = db.prune_changes(before_ts)
+        total += deleted
+        if deleted < 1000:
+            break
+    print(f"Pruned {total} change log entries older than {args.days} day(s)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TaskFlow database maintenance.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('stats-check', help="verify analytics rollups").set_defaults(run=stats_check)
+    commands.add_parser('stats-rebuild', help="recompute analytics rollups").set_defaults(run=stats_rebuild)
+
+    calibrate_cmd = commands.add_parser('hash-calibrate', help="re-time the password hashing cost")
+    calibrate_cmd.add_argument('--target-ms', type=int, default=TARGET_MS, help="time one hash should take")
+    calibrate_cmd.set_defaults(run=hash_calibrate)
+
+    commands.add_parser('tags-report', help="count tags and unreferenced tags").set_defaults(run=tags_report)
+    sweep_cmd = commands.add_parser('tags-sweep', help="delete tags no task uses")
+    sweep_cmd.add_argument('--batch-size', type=int, default=200, help="tags deleted per transaction")
+    sweep_cmd.add_argument('--recount', action='store_true', help="recompute reference counts first")
+    sweep_cmd.set_defaults(run=tags_sweep)
+
+    backup_cmd = commands.add_parser('backup', help="snapshot the SQLite database online")
+    backup_cmd.add_argument('--dir', type=Path, help="backup directory (default: next to the database)")
+    backup_cmd.add_argument('--keep', type=int, default=7, help="snapshots to keep")
+    backup_cmd.set_defaults(run=backup)
+
+    checkpoint_cmd = commands.add_parser('checkpoint', help="checkpoint the SQLite WAL")
+    checkpoint_cmd.add_argument('--truncate', action='store_true', help="wait for readers and empty the WAL")
+    checkpoint_cmd.set_defaults(run=checkpoint)
+
+    commands.add_parser('wal-report', help="WAL size, checkpoint lag and backups").set_defaults(run=wal_report)
+
+    archive_cmd = commands.add_parser('archive', help="move long-finished tasks to the archive now")
+    archive_cmd.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS, help="days a task has been Done")
+    archive_cmd.add_argument('--batch-size', type=int, default=200, help="tasks moved per transaction")
+    archive_cmd.set_defaults(run=archive)
+
+    restore_cmd = commands.add_parser('restore', help="move archived tasks back")
+    restore_cmd.add_argument('ids', type=int, nargs='+', help="task ids")
+    restore_cmd.set_defaults(run=restore)
+
+    archive_report_cmd = commands.add_parser('archive-report', help="archive size and tasks due for it")
+    archive_report_cmd.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS, help="days a task has been Done")
+    archive_report_cmd.set_defaults(run=archive_report)
+
+    commands.add_parser('changes-report', help="change log size and version").set_defaults(run=changes_report)
+
+    prune_cmd = commands.add_parser('changes-prune', help="delete old change log entries now")
+    prune_cmd.add_argument('--days', type=int, default=CHANGE_LOG_DAYS, help="days of history to keep")
+    prune_cmd.set_defaults(run=changes_prune)
+
+    args = parser.parse_args(argv)
+
+    db = Database()
+    try:
+        return args.run(db, args)
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Export a TaskFlow account's tasks to CSV, JSON Lines or an iCalendar file.
+
+    python -m utils.exporter --user alice tasks.csv
+    python -m utils.exporter --user alice --status "To Do" --tag "=work" todo.ics
+
+Tasks are streamed from Database.stream_tasks (a server-side cursor on
+PostgreSQL) and written as they arrive, so memory use does not grow with
+the number of tasks. Filters take the same values as the FilterBar. CSV
+and JSON Lines files use utils.importer's field names and can be imported
+back.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from database import Database
+
+FORMATS = ('csv', 'ndjson', 'ics')
+
+# Columns written to CSV and JSON Lines
+FIELDS = ('id', 'title', 'category', 'status', 'deadline', 'description', 'tags')
+
+# Report progress every this many tasks
+PROGRESS_EVERY = 1000
+
+
+def task_record(task):
+    # The exported fields of a task row
+    return {field: task[field] or '' for field in FIELDS}
+
+
+def write_csv(fh, tasks):
+    writer = csv.DictWriter(fh, fieldnames=FIELDS)
+    writer.writeheader()
+    for task in tasks:
+        writer.writerow(task_record(task))
+        yield
+
+
+def write_ndjson(fh, tasks):
+    # One JSON object per line; tags as a list
+    for task in tasks:
+        record = task_record(task)
+        record['tags'] = [t.strip() for t in record['tags'].split(',') if t.strip()]
+        fh.write(json.dumps(record, ensure_ascii=False) + '\n')
+        yield
+
+
+def ics_text(value):
+    # Escape a TEXT value (RFC 5545 section 3.3.11)
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def ics_line(name, value):
+    # Content line folded at 75 octets, continuation lines start with a space
+    line = f"{name}:{value}".encode('utf-8')
+    parts = []
+    limit = 75
+    while len(line) > limit:
+        # Never split a UTF-8 sequence
+        cut = limit
+        while (line[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(line[:cut])
+        line = line[cut:]
+        limit = 74
+    parts.append(line)
+    return "\r\n ".join(p.decode('utf-8') for p in parts) + "\r\n"
+
+
+def write_ics(fh, tasks):
+    # One timed VEVENT per task at its deadline; tasks without a parsed
+    # deadline have no place on a calendar and are skipped
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    fh.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//TaskFlow//Task Export//EN\r\n")
+    for task in tasks:
+        if task['deadline_ts'] is None:
+            continue
+        due = datetime.fromtimestamp(task['deadline_ts'], timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        categories = [task['category']] + [t.strip() for t in (task['tags'] or '').split(',') if t.strip()]
+
+        fh.write("BEGIN:VEVENT\r\n")
+        fh.write(ics_line("UID", f"task-{task['id']}@taskflow"))
+        fh.write(ics_line("DTSTAMP", stamp))
+        fh.write(ics_line("DTSTART", due))
+        fh.write(ics_line("SUMMARY", ics_text(task['title'])))
+        fh.write(ics_line("CATEGORIES", ",".join(ics_text(c) for c in categories)))
+        fh.write(ics_line("DESCRIPTION", ics_text(f"Status: {task['status']}\n\n{task['description'] or ''}".rstrip())))
+        fh.write("END:VEVENT\r\n")
+        yield
+    fh.write("END:VCALENDAR\r\n")
+
+
+WRITERS = {
+    'csv': write_csv,
+    'ndjson': write_ndjson,
+    'ics': write_ics,
+}
+
+
+def detect_format(path):
+    # Guess the format from the file extension
+    suffix = Path(path).suffix.lower().lstrip('.')
+    if suffix in ('jsonl', 'ndjson'):
+        return 'ndjson'
+    if suffix in ('ics', 'ical'):
+        return 'ics'
+    if suffix == 'csv':
+        return 'csv'
+    raise ValueError(f"Cannot tell the format of {path}, pass --format")
+
+
+def export_file(db, path, user_id, fmt=None, filters=None, on_progress=None):
+    """
+    Stream a user's tasks into a file, returning the number written.
+
+    Writes to a .part file next to path and renames it when complete, so a
+    failed export never leaves a truncated file behind.
+    """
+    fmt = fmt or detect_format(path)
+    partial = f"{path}.part"
+
+    tasks = db.stream_tasks(user_id, filters)
+    written = 0
+    try:
+        with open(partial, 'w', newline='', encoding='utf-8') as fh:
+            for _ in WRITERS[fmt](fh, tasks):
+                written += 1
+                if on_progress and written % PROGRESS_EVERY == 0:
+                    on_progress(written)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    finally:
+        tasks.close()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export tasks from TaskFlow.")
+    parser.add_argument('file', help="output .csv, .jsonl or .ics file")
+    parser.add_argument('--user', required=True, help="username whose tasks are exported")
+    parser.add_argument('--format', choices=FORMATS, help="output format (default: from extension)")
+    parser.add_argument('--search', help="text search, as in the filter bar")
+    parser.add_argument('--category', help="only this category")
+    parser.add_argument('--status', help="only this status")
+    parser.add_argument('--tag', help="tag filter: text, =exact or prefix*")
+    parser.add_argument('--timeframe', choices=('Overdue', 'Due Today', 'Next 7 Days'))
+    args = parser.parse_args(argv)
+
+    filters = {key: getattr(args, key) for key in ('search', 'category', 'status', 'tag', 'timeframe')
+               if getattr(args, key)}
+
+    db = Database()
+    try:
+        user = db.get_user_by_username(args.user)
+        if not user:
+            print(f"No user named {args.user}", file=sys.stderr)
+            return 1
+
+        def show_progress(count):
+            print(f"\rExported {count} tasks", end='', file=sys.stderr, flush=True)
+
+        try:
+            total = export_file(db, args.file, user['id'], args.format, filters, show_progress)
+        except (OSError, ValueError) as e:
+            print(f"\nExport failed: {e}", file=sys.stderr)
+            return 1
+
+        print(f"\rExported {total} tasks", file=sys.stderr)
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+# Never go below this cost, however slow the machine
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+DEFAULT_ROUNDS = 12
+
+# How long one hash should take on this machine
+TARGET_MS = 250
+
+
+def hash_rounds(stored_hash):
+    # Cost factor of a bcrypt hash ("$2b$12$..." -> 12), None if unrecognized
+    try:
+        return int(stored_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def calibrate(target_ms=TARGET_MS, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS, samples=3):
+    """
+    Pick the bcrypt cost whose hash time is closest to target_ms here.
+
+    Times a cheap cost and extrapolates: every extra round doubles the work.
+    """
+    probe = 8
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds=probe))
+        timings.append(time.perf_counter() - start)
+    probe_ms = min(timings) * 1000
+
+    best = min(
+        range(min_rounds, max_rounds + 1),
+        key=lambda rounds: abs(probe_ms * 2 ** (rounds - probe) - target_ms)
+    )
+    return best
+
+
+def load_rounds(path, target_ms=None):
+    # Calibrated cost saved for this machine, calibrating on first use or
+    # when a different target_ms is asked for
+    try:
+        with open(path, encoding='utf-8') as f:
+            saved = json.load(f)
+        if target_ms is None or saved.get('target_ms') == target_ms:
+            return max(MIN_ROUNDS, min(MAX_ROUNDS, int(saved['rounds'])))
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    target_ms = target_ms or TARGET_MS
+    return save_rounds(path, calibrate(target_ms), target_ms)
+
+
+def save_rounds(path, rounds, target_ms=TARGET_MS):
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'rounds': rounds, 'target_ms': target_ms}, f)
+    except OSError as e:
+        print(f"Hash Calibration Warning: {e}")
+    return rounds
+
+
+class PasswordHasher:
+    """
+    bcrypt hashing at a fixed cost, with its own worker pool.
+
+    hash/check block; callers on the Tk thread run them (or the Database
+    methods that use them) on `executor`, e.g. through AsyncDatabase.submit,
+    so a slow hash never stalls the UI or the database workers.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, max_workers=2):
+        self.rounds = rounds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+
+        # Checked against when the user does not exist, so a miss costs as
+        # much as a wrong password and timing does not reveal usernames
+        self._dummy_hash = None
+
+    def hash(self, password):
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds)).decode('utf-8')
+
+    def check(self, password, stored_hash):
+        if stored_hash is None:
+            if self._dummy_hash is None:
+                self._dummy_hash = self.hash("not a real password")
+            bcrypt.checkpw(password.encode('utf-8'), self._dummy_hash.encode('utf-8'))
+            return False
+        return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+
+    def needs_rehash(self, stored_hash):
+        # True when the hash was made at a lower cost than the current one.
+        # Costs are calibrated per machine, so on a shared database a higher
+        # cost comes from a faster client and is kept, not downgraded.
+        rounds = hash_rounds(stored_hash)
+        return rounds is None or rounds < self.rounds
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
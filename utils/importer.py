@@ -0,0 +1,136 @@
+"""
+Import tasks from another tracker into a TaskFlow account.
+
+    python -m utils.importer --user alice tasks.csv
+    python -m utils.importer --user alice --format ndjson export.jsonl
+
+Rows are streamed straight into Database.add_tasks_bulk, so memory use does
+not grow with the size of the file. Expected fields: title, category,
+deadline (required), status, description, tags (comma-separated or a list).
+"""
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+from database import Database
+
+FORMATS = ('csv', 'json', 'ndjson')
+
+
+def read_csv(fh):
+    # One task per row, header names as keys
+    yield from csv.DictReader(fh)
+
+
+def read_ndjson(fh):
+    # One JSON object per line, blank lines ignored
+    for line_num, line in enumerate(fh, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_num}: {e}") from None
+
+
+def read_json_array(fh, chunk_size=65536):
+    # Decode a top-level array one element at a time instead of json.load
+    decoder = json.JSONDecoder()
+    buf = ""
+    started = False
+
+    while True:
+        buf = buf.lstrip()
+        if started:
+            buf = buf.lstrip(',').lstrip()
+
+        # Need at least one significant character to decide what comes next
+        if not buf:
+            more = fh.read(chunk_size)
+            if not more:
+                raise ValueError("Unexpected end of JSON input")
+            buf += more
+            continue
+
+        if not started:
+            if buf[0] != '[':
+                raise ValueError("JSON input must be an array of task objects")
+            buf = buf[1:]
+            started = True
+            continue
+
+        if buf[0] == ']':
+            return
+
+        try:
+            obj, end = decoder.raw_decode(buf)
+        except json.JSONDecodeError:
+            # Element is split across reads
+            more = fh.read(chunk_size)
+            if not more:
+                raise
+            buf += more
+            continue
+
+        yield obj
+        buf = buf[end:]
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json_array,
+    'ndjson': read_ndjson,
+}
+
+
+def detect_format(path):
+    # Guess the format from the file extension
+    suffix = Path(path).suffix.lower().lstrip('.')
+    if suffix in ('jsonl', 'ndjson'):
+        return 'ndjson'
+    if suffix in FORMATS:
+        return suffix
+    raise ValueError(f"Cannot tell the format of {path}, pass --format")
+
+
+def import_file(db, path, user_id, fmt=None, on_progress=None):
+    # Stream a file into the database, returning the number of tasks imported
+    fmt = fmt or detect_format(path)
+    with open(path, newline='', encoding='utf-8') as fh:
+        return db.add_tasks_bulk(READERS[fmt](fh), user_id, on_progress=on_progress)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import tasks into TaskFlow.")
+    parser.add_argument('file', help="CSV, JSON array or NDJSON file")
+    parser.add_argument('--user', required=True, help="username that will own the tasks")
+    parser.add_argument('--format', choices=FORMATS, help="input format (default: from extension)")
+    args = parser.parse_args(argv)
+
+    db = Database()
+    try:
+        user = db.get_user_by_username(args.user)
+        if not user:
+            print(f"No user named {args.user}", file=sys.stderr)
+            return 1
+
+        def show_progress(count):
+            print(f"\rImported {count} tasks", end='', file=sys.stderr, flush=True)
+
+        try:
+            total = import_file(db, args.file, user['id'], args.format, show_progress)
+        except (OSError, ValueError) as e:
+            print(f"\nImport failed, nothing was saved: {e}", file=sys.stderr)
+            return 1
+
+        print(f"\rImported {total} tasks", file=sys.stderr)
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+Background upkeep for the local SQLite database: WAL checkpoints and backups.
+
+The database runs in WAL mode, so committed pages collect in the -wal file
+until a checkpoint copies them back. MaintenanceService checkpoints on a
+timer without blocking anyone (PASSIVE), shrinks the WAL once the app has
+gone quiet (TRUNCATE), and takes online snapshots with the SQLite backup
+API a few pages at a time, keeping the newest few. Each snapshot of the
+main file is followed by one of the attached archive file. PostgreSQL
+servers have their own WAL and backup tooling, so this is SQLite-only.
+"""
+import os
+import sqlite3
+import stat
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+BACKUP_PREFIX = "taskflow-"
+ARCHIVE_PREFIX = "archive-"
+BACKUP_SUFFIX = ".db"
+
+# A backup restarts whenever another connection writes mid-copy; after this
+# many restarts the rest is copied in one step (a WAL read never blocks writers)
+MAX_RESTARTS = 5
+
+
+class _Restarted(Exception):
+    pass
+
+
+def checkpoint(conn, mode='PASSIVE'):
+    """
+    Run a WAL checkpoint and return (busy, wal_frames, checkpointed_frames).
+
+    PASSIVE copies what it can without waiting on readers or writers;
+    TRUNCATE waits for them, then empties the WAL file. busy is 1 when the
+    checkpoint could not finish.
+    """
+    row = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    return tuple(row)
+
+
+def backup_database(src, dest_path, pages=256, pause=0.01, name='main'):
+    """
+    Copy an open database into dest_path with the online backup API.
+
+    Copies `pages` pages per step and sleeps `pause` seconds in between, so
+    writers on other connections get the lock in between steps. Writes to
+    a .part file that is renamed when the copy is complete. `name` picks an
+    attached database instead of the main one. Returns the number of pages
+    copied.
+    """
+    dest_path = Path(dest_path)
+    partial = dest_path.with_name(dest_path.name + ".part")
+    state = {'remaining': None, 'restarts': 0, 'pages': 0}
+
+    def progress(status, remaining, total):
+        # Remaining going up means the copy started over after a write
+        if state['remaining'] is not None and remaining > state['remaining']:
+            state['restarts'] += 1
+        state['remaining'] = remaining
+        state['pages'] = total
+        if state['restarts'] >= MAX_RESTARTS:
+            raise _Restarted()
+        time.sleep(pause)
+
+    dest = sqlite3.connect(partial)
+    try:
+        try:
+            src.backup(dest, pages=pages, progress=progress, name=name)
+        except _Restarted:
+            src.backup(dest, pages=-1, name=name)
+        dest.close()
+        os.chmod(partial, stat.S_IREAD | stat.S_IWRITE)
+        os.replace(partial, dest_path)
+    except BaseException:
+        dest.close()
+        if partial.exists():
+            partial.unlink()
+        raise
+    return state['pages']
+
+
+def backup_path(backup_dir, prefix=BACKUP_PREFIX, when=None):
+    # Timestamped snapshot name; sorts oldest first
+    when = when or datetime.now()
+    return Path(backup_dir) / f"{prefix}{when:%Y%m%d-%H%M%S}{BACKUP_SUFFIX}"
+
+
+def list_backups(backup_dir, prefix=BACKUP_PREFIX):
+    # Snapshot files, oldest first
+    backup_dir = Path(backup_dir)
+    if not backup_dir.exists():
+        return []
+    return sorted(backup_dir.glob(f"{prefix}*{BACKUP_SUFFIX}"))
+
+
+def backup_all(conn, backup_dir, pages=256, pause=0.01):
+    """
+    Snapshot the main database, then the attached archive, under one timestamp.
+
+    In this order a task being archived meanwhile lands in at least one of
+    the two snapshots. Returns (main path, main pages, archive pages).
+    """
+    when = datetime.now()
+    path = backup_path(backup_dir, BACKUP_PREFIX, when)
+    main_pages = backup_database(conn, path, pages, pause)
+    archive_pages = backup_database(conn, backup_path(backup_dir, ARCHIVE_PREFIX, when), pages, pause, 'archive')
+    return path, main_pages, archive_pages
+
+
+def rotate_backups(backup_dir, keep, prefix=BACKUP_PREFIX):
+    # Delete all but the newest `keep` snapshots; returns the deleted paths
+    backups = list_backups(backup_dir, prefix)
+    doomed = backups[:-keep] if keep > 0 else backups
+    for path in doomed:
+        path.unlink()
+    return doomed
+
+
+def wal_size(db_file):
+    # Bytes in the -wal file (0 when there is none)
+    try:
+        return os.path.getsize(f"{db_file}-wal")
+    except OSError:
+        return 0
+
+
+class MaintenanceService:
+    """
+    Runs checkpoints and backups for a Database on a background thread.
+
+    Every `checkpoint_interval` seconds: a PASSIVE checkpoint. After no
+    task writes for `idle_after` seconds: one TRUNCATE checkpoint. Every
+    `backup_interval` seconds (and at startup, when the newest snapshot
+    is older than that): a backup into backup_dir, keeping `keep` copies.
+    """
+
+    def __init__(self, db, backup_dir=None, checkpoint_interval=60, idle_after=120,
+                 backup_interval=6 * 3600, keep=7, pages=256, pause=0.01):
+        if db.backend.name != 'sqlite':
+            raise ValueError("MaintenanceService only manages SQLite databases")
+
+        self.db = db
+        self.db_file = db.backend.db_file
+        self.backup_dir = Path(backup_dir) if backup_dir else self.db_file.parent / "backups"
+        self.checkpoint_interval = checkpoint_interval
+        self.idle_after = idle_after
+        self.backup_interval = backup_interval
+        self.keep = keep
+        self.pages = pages
+        self.pause = pause
+
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._last_write = time.monotonic()
+        self._truncated = False
+
+        # Figures for get_stats
+        self._lock = threading.Lock()
+        self.last_checkpoint = None  # (time, mode, busy, wal_frames, checkpointed_frames)
+        self.last_truncate = None
+        self.last_backup = None  # (time, path, pages, seconds)
+        self.errors = 0
+
+        db.add_change_listener(self._on_tasks_changed)
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def checkpoint(self, mode='PASSIVE'):
+        conn = self.db.get_connection()
+        try:
+            result = checkpoint(conn, mode)
+        finally:
+            self.db.release_connection(conn)
+
+        with self._lock:
+            self.last_checkpoint = (time.time(), mode, *result)
+            if mode == 'TRUNCATE' and not result[0]:
+                self.last_truncate = time.time()
+        return result
+
+    def backup(self):
+        # Take a snapshot now and rotate old ones; returns its path
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+
+        start = time.monotonic()
+        conn = self.db.get_connection()
+        try:
+            path, pages, archive_pages = backup_all(conn, self.backup_dir, self.pages, self.pause)
+        finally:
+            self.db.release_connection(conn)
+
+        with self._lock:
+            self.last_backup = (time.time(), path, pages + archive_pages, time.monotonic() - start)
+        rotate_backups(self.backup_dir, self.keep)
+        rotate_backups(self.backup_dir, self.keep, ARCHIVE_PREFIX)
+        return path
+
+    def get_stats(self):
+        """
+        WAL and backup health.
+
+        wal_bytes is the current -wal file size; checkpoint_lag is how many
+        WAL frames the last checkpoint could not copy back yet.
+        """
+        backups = list_backups(self.backup_dir)
+        archives = list_backups(self.backup_dir, ARCHIVE_PREFIX)
+        with self._lock:
+            last = self.last_checkpoint
+            return {
+                'wal_bytes': wal_size(self.db_file),
+                'checkpoint_lag': (last[3] - last[4]) if last and last[3] >= 0 else None,
+                'last_checkpoint': last[0] if last else None,
+                'last_truncate': self.last_truncate,
+                'last_backup': self.last_backup[0] if self.last_backup else None,
+                'backups': len(backups),
+                'backup_bytes': sum(p.stat().st_size for p in backups + archives),
+                'errors': self.errors,
+            }
+
+    def stop(self, timeout=5):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _on_tasks_changed(self, user_ids):
+        with self._cond:
+            self._last_write = time.monotonic()
+            self._truncated = False
+
+    def _backup_due(self):
+        backups = list_backups(self.backup_dir)
+        return not backups or time.time() - backups[-1].stat().st_mtime >= self.backup_interval
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait(self.checkpoint_interval)
+                if self._stopping:
+                    break
+                idle = time.monotonic() - self._last_write >= self.idle_after and not self._truncated
+
+            try:
+                if self._backup_due():
+                    self.backup()
+
+                if idle:
+                    busy = self.checkpoint('TRUNCATE')[0]
+                    with self._cond:
+                        self._truncated = not busy
+                else:
+                    self.checkpoint('PASSIVE')
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"Maintenance Error: {e}")
@@ -0,0 +1,630 @@
+"""
+PostgreSQL storage backend, for several desktop clients sharing one database.
+
+Selected with DB_BACKEND=postgres plus DB_HOST, DB_PORT, DB_NAME, DB_USER
+and DB_PASS (see utils/config.py). Needs psycopg2, which is only imported
+when this backend is in use.
+"""
+import itertools
+import re
+import threading
+
+import psycopg2
+from psycopg2 import extensions, extras
+from psycopg2.pool import ThreadedConnectionPool
+
+from utils.tags import merge_tag_case_duplicates
+
+# Any constant works, as long as every client uses the same one
+MIGRATION_LOCK = 0x7461736b
+
+# Database's SQL uses sqlite3 placeholders; psycopg2 wants pyformat. String
+# literals are matched first so placeholders inside them are left alone.
+PLACEHOLDER = re.compile(r"'(?:[^']|'')*'|\?|(?<!:):([A-Za-z_]\w*)|%")
+
+_translated = {}
+_stream_ids = itertools.count(1)
+
+
+def translate(sql):
+    # Rewrite ? and :name as %s and %(name)s, and escape literal % signs
+    result = _translated.get(sql)
+    if result is None:
+        if len(_translated) > 2000:
+            _translated.clear()
+        def replace(match):
+            token = match.group(0)
+            if token.startswith("'"):
+                return token.replace('%', '%%')
+            if token == '?':
+                return '%s'
+            if token == '%':
+                return '%%'
+            return f"%({match.group(1)})s"
+        result = _translated[sql] = PLACEHOLDER.sub(replace, sql)
+    return result
+
+
+def create_task_stats(cursor):
+    # Same rollups as the SQLite schema, maintained by a PL/pgSQL trigger
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_stats (
+            user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            category TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, category, status)
+        )
+    ''')
+    cursor.execute('''
+        CREATE OR REPLACE FUNCTION task_stats_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL THEN
+                UPDATE task_stats SET count = count - 1
+                WHERE user_id = OLD.user_id AND category = OLD.category AND status = OLD.status;
+                DELETE FROM task_stats
+                WHERE user_id = OLD.user_id AND category = OLD.category AND status = OLD.status
+                AND count <= 0;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL THEN
+                INSERT INTO task_stats (user_id, category, status, count)
+                VALUES (NEW.user_id, NEW.category, NEW.status, 1)
+                ON CONFLICT (user_id, category, status) DO UPDATE SET count = task_stats.count + 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER task_stats_insert_delete AFTER INSERT OR DELETE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION task_stats_sync()
+    ''')
+    # Title, deadline and description edits leave the counts alone
+    cursor.execute('''
+        CREATE TRIGGER task_stats_update AFTER UPDATE OF user_id, category, status ON tasks
+        FOR EACH ROW EXECUTE FUNCTION task_stats_sync()
+    ''')
+
+
+def create_tag_trigrams(cursor):
+    # Substring tag filters (key LIKE '%x%') use a trigram index when the
+    # pg_trgm extension can be installed; a savepoint keeps the migration
+    # going when it cannot
+    cursor.execute("SAVEPOINT tag_trigrams")
+    try:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tags_key_trgm ON tags USING gin (key gin_trgm_ops)")
+        cursor.execute("RELEASE SAVEPOINT tag_trigrams")
+    except psycopg2.Error as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT tag_trigrams")
+        print(f"pg_trgm unavailable, substring tag filters scan tags: {e}".strip())
+
+
+def create_tag_refcounts(cursor):
+    # Tasks linked to each tag, kept by a trigger; 0 marks an orphan to sweep
+    cursor.execute("ALTER TABLE tags ADD COLUMN IF NOT EXISTS ref_count INTEGER NOT NULL DEFAULT 0")
+    cursor.execute('''
+        CREATE OR REPLACE FUNCTION tags_ref_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE tags SET ref_count = ref_count - 1 WHERE id = OLD.tag_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE tags SET ref_count = ref_count + 1 WHERE id = NEW.tag_id;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER tags_ref_insert_delete AFTER INSERT OR DELETE ON task_tags
+        FOR EACH ROW EXECUTE FUNCTION tags_ref_sync()
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER tags_ref_update AFTER UPDATE OF tag_id ON task_tags
+        FOR EACH ROW EXECUTE FUNCTION tags_ref_sync()
+    ''')
+    cursor.execute("UPDATE tags SET ref_count = (SELECT COUNT(*) FROM task_tags tt WHERE tt.tag_id = tags.id)")
+
+
+def create_done_at(cursor):
+    # When each task was last marked Done, set by a BEFORE trigger; the
+    # archiver's clock. Existing Done tasks take their deadline, or now for
+    # deadlines still ahead
+    cursor.execute("ALTER TABLE tasks ADD COLUMN IF NOT EXISTS done_at BIGINT")
+    cursor.execute('''
+        UPDATE tasks SET done_at = LEAST(COALESCE(deadline_ts, extract(epoch FROM now())::bigint),
+                                         extract(epoch FROM now())::bigint)
+        WHERE status = 'Done'
+    ''')
+    cursor.execute('''
+        CREATE OR REPLACE FUNCTION tasks_done_at() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' OR NEW.status IS DISTINCT FROM OLD.status THEN
+                NEW.done_at := CASE WHEN NEW.status = 'Done' THEN extract(epoch FROM now())::bigint END;
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER tasks_done_at BEFORE INSERT OR UPDATE OF status ON tasks
+        FOR EACH ROW EXECUTE FUNCTION tasks_done_at()
+    ''')
+
+
+def create_change_log(cursor):
+    # Same log as the SQLite schema. Sequence values are drawn before
+    # commit, so concurrent writers can make them visible out of order;
+    # each entry also records its transaction id, which readers go by
+    # instead (see PostgresBackend.change_version)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_changes (
+            version BIGSERIAL PRIMARY KEY,
+            task_id BIGINT NOT NULL,
+            user_id BIGINT,
+            op TEXT NOT NULL,
+            txid BIGINT NOT NULL DEFAULT pg_current_xact_id()::text::bigint,
+            changed_at BIGINT NOT NULL DEFAULT extract(epoch FROM now())::bigint
+        )
+    ''')
+    cursor.execute("CREATE TABLE IF NOT EXISTS task_changes_pruned (version BIGINT NOT NULL)")
+    cursor.execute("INSERT INTO task_changes_pruned (version) VALUES (0)")
+    cursor.execute('''
+        CREATE OR REPLACE FUNCTION task_changes_log() RETURNS trigger AS $$
+        BEGIN
+            IF TG_TABLE_NAME = 'tasks' THEN
+                IF TG_OP = 'DELETE' THEN
+                    INSERT INTO task_changes (task_id, user_id, op) VALUES (OLD.id, OLD.user_id, 'delete');
+                ELSE
+                    INSERT INTO task_changes (task_id, user_id, op) VALUES (NEW.id, NEW.user_id, lower(TG_OP));
+                END IF;
+            ELSE
+                -- Tag links changing are updates of their task; links removed
+                -- by a cascading task delete find no task and log nothing
+                INSERT INTO task_changes (task_id, user_id, op)
+                SELECT id, user_id, 'update' FROM tasks
+                WHERE id = CASE WHEN TG_OP = 'DELETE' THEN OLD.task_id ELSE NEW.task_id END;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER task_changes_insert_delete AFTER INSERT OR DELETE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION task_changes_log()
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER task_changes_update
+        AFTER UPDATE OF title, category, status, deadline, deadline_ts, deadline_tz, description ON tasks
+        FOR EACH ROW EXECUTE FUNCTION task_changes_log()
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER task_changes_tags AFTER INSERT OR DELETE ON task_tags
+        FOR EACH ROW EXECUTE FUNCTION task_changes_log()
+    ''')
+
+
+def create_statement_rollups(cursor):
+    # The row triggers of create_task_stats and create_tag_refcounts update
+    # a rollup row once per changed task or link, so one statement touching
+    # thousands of tasks leaves thousands of versions of the same few rows
+    # to walk. Statement triggers read the changed rows from transition
+    # tables and update each rollup row once, locking them in key order so
+    # concurrent bulk statements queue up instead of deadlocking.
+    cursor.execute("DROP TRIGGER IF EXISTS task_stats_insert_delete ON tasks")
+    cursor.execute("DROP TRIGGER IF EXISTS task_stats_update ON tasks")
+    cursor.execute("DROP FUNCTION IF EXISTS task_stats_sync()")
+
+    # Transition tables allow one event per trigger, and no column list on
+    # UPDATE, so every update runs it; edits that keep the counts net to 0
+    net = "SELECT user_id, category, status, {sign} AS n FROM {table} WHERE user_id IS NOT NULL"
+    for name, event, tables, rows in (
+        ('task_stats_insert', 'INSERT', 'NEW TABLE AS new_rows',
+         [net.format(sign=1, table='new_rows')]),
+        ('task_stats_delete', 'DELETE', 'OLD TABLE AS old_rows',
+         [net.format(sign=-1, table='old_rows')]),
+        ('task_stats_update', 'UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+         [net.format(sign=1, table='new_rows'), net.format(sign=-1, table='old_rows')]),
+    ):
+        cursor.execute(f'''
+            CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO task_stats (user_id, category, status, count)
+                SELECT user_id, category, status, SUM(n) FROM ({" UNION ALL ".join(rows)}) changed
+                GROUP BY user_id, category, status HAVING SUM(n) <> 0
+                ORDER BY user_id, category, status
+                ON CONFLICT (user_id, category, status) DO UPDATE SET count = task_stats.count + EXCLUDED.count;
+
+                DELETE FROM task_stats s
+                USING (SELECT DISTINCT user_id, category, status FROM ({" UNION ALL ".join(rows)}) changed) d
+                WHERE s.user_id = d.user_id AND s.category = d.category AND s.status = d.status
+                AND s.count <= 0;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name} ON tasks")
+        cursor.execute(f'''
+            CREATE TRIGGER {name} AFTER {event} ON tasks
+            REFERENCING {tables}
+            FOR EACH STATEMENT EXECUTE FUNCTION {name}()
+        ''')
+
+    cursor.execute("DROP TRIGGER IF EXISTS tags_ref_insert_delete ON task_tags")
+    cursor.execute("DROP TRIGGER IF EXISTS tags_ref_update ON task_tags")
+    cursor.execute("DROP FUNCTION IF EXISTS tags_ref_sync()")
+
+    # Transition tables allow one event per trigger, hence a function each
+    for name, event, tables, delta in (
+        ('tags_ref_insert', 'INSERT', 'NEW TABLE AS new_links',
+         "SELECT tag_id, COUNT(*) AS n FROM new_links GROUP BY tag_id"),
+        ('tags_ref_delete', 'DELETE', 'OLD TABLE AS old_links',
+         "SELECT tag_id, -COUNT(*) AS n FROM old_links GROUP BY tag_id"),
+        ('tags_ref_update', 'UPDATE', 'OLD TABLE AS old_links NEW TABLE AS new_links',
+         "SELECT tag_id, SUM(n) AS n FROM (SELECT tag_id, 1 AS n FROM new_links "
+         "UNION ALL SELECT tag_id, -1 FROM old_links) moved GROUP BY tag_id"),
+    ):
+        cursor.execute(f'''
+            CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$
+            BEGIN
+                PERFORM 1 FROM tags WHERE id IN (SELECT tag_id FROM ({delta}) d)
+                ORDER BY id FOR NO KEY UPDATE;
+                UPDATE tags SET ref_count = ref_count + d.n
+                FROM ({delta}) d
+                WHERE tags.id = d.tag_id AND d.n <> 0;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name} ON task_tags")
+        cursor.execute(f'''
+            CREATE TRIGGER {name} AFTER {event} ON task_tags
+            REFERENCING {tables}
+            FOR EACH STATEMENT EXECUTE FUNCTION {name}()
+        ''')
+
+
+# Same shape as database.MIGRATIONS, numbered independently. Version 1 is
+# the SQLite schema as of its version 4.
+MIGRATIONS = [
+    (1, "Base schema", [
+        '''CREATE TABLE IF NOT EXISTS users (
+            id BIGSERIAL PRIMARY KEY,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL
+        )''',
+        '''CREATE TABLE IF NOT EXISTS tasks (
+            id BIGSERIAL PRIMARY KEY,
+            title TEXT NOT NULL,
+            category TEXT NOT NULL,
+            status TEXT NOT NULL,
+            deadline TEXT NOT NULL,
+            description TEXT NOT NULL,
+            user_id BIGINT REFERENCES users(id) ON DELETE CASCADE,
+            deadline_ts BIGINT,
+            deadline_tz TEXT
+        )''',
+        '''CREATE TABLE IF NOT EXISTS tags (
+            id BIGSERIAL PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL
+        )''',
+        '''CREATE TABLE IF NOT EXISTS task_tags (
+            task_id BIGINT REFERENCES tasks(id) ON DELETE CASCADE,
+            tag_id BIGINT REFERENCES tags(id) ON DELETE CASCADE,
+            PRIMARY KEY (task_id, tag_id)
+        )''',
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_deadline_ts ON tasks(user_id, deadline_ts)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_status ON tasks(user_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_user_category_status ON tasks(user_id, category, status)",
+        "CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags(tag_id)",
+        create_task_stats,
+    ]),
+    (2, "Case-insensitive tag keys", [
+        # Byte-order collation so prefix filters are plain index range scans
+        'ALTER TABLE tags ADD COLUMN IF NOT EXISTS key TEXT COLLATE "C"',
+        lambda cursor: merge_tag_case_duplicates(cursor, placeholder='%s'),
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_tags_key ON tags(key)",
+        create_tag_trigrams,
+    ]),
+    (3, "Tag reference counts", [
+        create_tag_refcounts,
+        "CREATE INDEX IF NOT EXISTS idx_tags_orphans ON tags(id) WHERE ref_count = 0",
+    ]),
+    (4, "Archive of finished tasks", [
+        create_done_at,
+        "CREATE INDEX IF NOT EXISTS idx_tasks_done_at ON tasks(done_at) WHERE status = 'Done'",
+        # A schema where SQLite attaches a file, so queries name it the same way
+        "CREATE SCHEMA IF NOT EXISTS archive",
+        '''CREATE TABLE IF NOT EXISTS archive.archived_tasks (
+            id BIGINT PRIMARY KEY,
+            user_id BIGINT REFERENCES users(id) ON DELETE CASCADE,
+            title TEXT NOT NULL,
+            category TEXT NOT NULL,
+            status TEXT NOT NULL,
+            deadline TEXT NOT NULL,
+            deadline_ts BIGINT,
+            deadline_tz TEXT,
+            description TEXT NOT NULL,
+            tags TEXT,
+            tag_keys TEXT,
+            done_at BIGINT,
+            archived_at BIGINT NOT NULL
+        )''',
+        "CREATE INDEX IF NOT EXISTS idx_archived_user_deadline_ts ON archive.archived_tasks(user_id, deadline_ts)",
+    ]),
+    (5, "Task change log", [
+        create_change_log,
+        "CREATE INDEX IF NOT EXISTS idx_task_changes_user_txid ON task_changes(user_id, txid)",
+    ]),
+    (6, "Statement-level rollup triggers", [
+        create_statement_rollups,
+    ]),
+    (7, "Task reminder offsets", [
+        "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS remind_before INTEGER",
+        # Reminder edits reschedule, so the change log records them too
+        "DROP TRIGGER IF EXISTS task_changes_update ON tasks",
+        '''CREATE TRIGGER task_changes_update
+        AFTER UPDATE OF title, category, status, deadline, deadline_ts, deadline_tz, description, remind_before ON tasks
+        FOR EACH ROW EXECUTE FUNCTION task_changes_log()''',
+    ]),
+    (8, "Reminder offsets of archived tasks", [
+        "ALTER TABLE archive.archived_tasks ADD COLUMN IF NOT EXISTS remind_before INTEGER",
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+class RowShape:
+    """Stable stand-in for a cursor's description, so row classes are reused."""
+
+    def __init__(self, description):
+        self.description = description
+
+
+class PostgresCursor:
+    """sqlite3-style cursor over a psycopg2 cursor, returning Record rows."""
+
+    def __init__(self, raw, row_factory):
+        self.raw = raw
+        self.row_factory = row_factory
+        self._shape = None
+
+    @property
+    def description(self):
+        return self.raw.description
+
+    @property
+    def rowcount(self):
+        return self.raw.rowcount
+
+    def execute(self, sql, params=None):
+        if params:
+            self.raw.execute(translate(sql), params)
+        else:
+            self.raw.execute(sql)
+        self._shape = RowShape(self.raw.description) if self.raw.description else None
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        extras.execute_batch(self.raw, translate(sql), list(seq_of_params))
+        self._shape = None
+        return self
+
+    def _row(self, row):
+        return None if row is None else self.row_factory(self._shape, row)
+
+    def fetchone(self):
+        return self._row(self.raw.fetchone())
+
+    def fetchmany(self, size):
+        return [self.row_factory(self._shape, row) for row in self.raw.fetchmany(size)]
+
+    def fetchall(self):
+        return [self.row_factory(self._shape, row) for row in self.raw.fetchall()]
+
+    def __iter__(self):
+        for row in self.raw:
+            yield self.row_factory(self._shape, row)
+
+    def close(self):
+        self.raw.close()
+
+
+class PostgresConnection:
+    """The parts of the sqlite3.Connection interface that Database uses."""
+
+    def __init__(self, raw, row_factory):
+        self.raw = raw
+        self.row_factory = row_factory
+
+    def cursor(self):
+        return PostgresCursor(self.raw.cursor(), self.row_factory)
+
+    def execute(self, sql, params=None):
+        return self.cursor().execute(sql, params)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    @property
+    def in_transaction(self):
+        return self.raw.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE
+
+
+class PostgresBackend:
+    """
+    Storage backend for a shared PostgreSQL server.
+
+    Connections come from a thread-safe pool; callers wait when all of them
+    are in use. Streams read through server-side (named) cursors so large
+    results never sit in client memory at once. Search uses ILIKE, since the
+    FTS5 index is SQLite-only.
+    """
+
+    name = 'postgres'
+    IntegrityError = psycopg2.IntegrityError
+
+    like = 'ILIKE'
+
+    # Other clients write to the same database
+    shared = True
+
+    # Tags being linked are share-locked, so a concurrent sweep skips them
+    # rather than deleting a row another client is about to reference
+    lock_for_share = ' FOR KEY SHARE'
+    lock_for_update = ' FOR UPDATE SKIP LOCKED'
+
+    # Change log versions are transaction ids; see change_version
+    change_column = 'txid'
+
+    def __init__(self, row_factory, host=None, port=None, dbname=None, user=None, password=None,
+                 min_connections=1, max_connections=8, dsn=None):
+        self.row_factory = row_factory
+        self.pool = ThreadedConnectionPool(
+            min_connections, max_connections, dsn,
+            host=host, port=port, dbname=dbname, user=user, password=password
+        )
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+
+        # Usage counters (see get_stats)
+        self.acquired = 0
+        self.discarded = 0
+        self.in_use = 0
+
+    def acquire(self):
+        # Borrow a pooled connection, waiting for one if all are busy
+        self._slots.acquire()
+        try:
+            raw = self.pool.getconn()
+            if raw.closed:
+                self.pool.putconn(raw, close=True)
+                raw = self.pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.acquired += 1
+            self.in_use += 1
+        return PostgresConnection(raw, self.row_factory)
+
+    def release(self, conn):
+        # End whatever the caller left open and hand the connection back
+        broken = False
+        try:
+            if conn.in_transaction:
+                conn.raw.rollback()
+        except psycopg2.Error:
+            broken = True
+
+        broken = broken or bool(conn.raw.closed)
+        self.pool.putconn(conn.raw, close=broken)
+        with self._lock:
+            self.in_use -= 1
+            if broken:
+                self.discarded += 1
+        self._slots.release()
+
+    def close_all(self):
+        self.pool.closeall()
+
+    def get_stats(self):
+        with self._lock:
+            return {'acquired': self.acquired, 'discarded': self.discarded, 'in_use': self.in_use}
+
+    def init_schema(self, conn):
+        self.migrate(conn)
+
+    def schema_version(self, conn):
+        cursor = conn.raw.cursor()
+        cursor.execute("SELECT to_regclass('schema_version') IS NOT NULL")
+        if not cursor.fetchone()[0]:
+            return 0
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        return cursor.fetchone()[0]
+
+    def migrate(self, conn):
+        # Apply pending MIGRATIONS, one transaction each; an advisory lock
+        # keeps clients that start at the same time from racing
+        if self.schema_version(conn) >= SCHEMA_VERSION:
+            conn.rollback()
+            return
+
+        raw = conn.raw
+        cursor = raw.cursor()
+        for version, description, steps in MIGRATIONS:
+            try:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK,))
+                cursor.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+                if self.schema_version(conn) >= version:
+                    raw.rollback()
+                    continue
+
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+
+                cursor.execute("INSERT INTO schema_version (version) VALUES (%s)", (version,))
+                raw.commit()
+            except Exception as e:
+                raw.rollback()
+                print(f"Migration Error (v{version}, {description}): {e}")
+                raise
+
+    def has_fts(self, conn):
+        return False
+
+    def has_tag_trigrams(self, conn):
+        # pg_trgm, when present, serves key LIKE directly
+        return False
+
+    def begin_write(self, cursor):
+        # psycopg2 opens a transaction with the first statement; row locks
+        # serialize writers, so there is nothing to take up front
+        pass
+
+    def change_version(self, cursor):
+        # Every transaction below the snapshot's xmin has finished, so no
+        # entry at or below xmin - 1 can still appear behind a reader
+        cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint - 1 AS version")
+        return cursor.fetchone()['version']
+
+    def group_concat(self, expr):
+        return f"string_agg({expr}, ', ')"
+
+    def insert_tasks(self, cursor, columns, rows):
+        # One multi-row INSERT per batch; RETURNING gives ids in VALUES order
+        sql = f"INSERT INTO tasks ({', '.join(columns)}) VALUES %s RETURNING id"
+        returned = extras.execute_values(cursor.raw, sql, rows, page_size=len(rows), fetch=True)
+        return [row[0] for row in returned]
+
+    def stream(self, conn, sql, params, batch_size):
+        # Named cursors live on the server and are fetched batch_size rows at a time
+        raw_cursor = conn.raw.cursor(name=f"taskflow_stream_{next(_stream_ids)}")
+        raw_cursor.itersize = batch_size
+        try:
+            raw_cursor.execute(translate(sql), params)
+            shape = None
+            while True:
+                rows = raw_cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                if shape is None:
+                    shape = RowShape(raw_cursor.description)
+                for row in rows:
+                    yield self.row_factory(shape, row)
+        finally:
+            raw_cursor.close()
+
+    def secure(self):
+        # Access control is the server's job
+        pass
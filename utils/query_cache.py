@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    LRU cache of per-user query results.
+
+    Every user has a generation number; writes bump it, which turns all of
+    that user's cached entries stale at once without scanning the cache.
+    Entries are only trusted if they were loaded under the current generation
+    and, when the caller passes one, the current data version too, which
+    catches writes this process was never told about.
+    """
+
+    def __init__(self, max_entries=256, max_rows=5000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (user_id, key) -> (generation, version, value)
+        self._generations = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def generation(self, user_id):
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def invalidate(self, user_id):
+        # Make every cached result for this user stale
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def get_or_load(self, user_id, key, load, version=None):
+        # Return a cached result, or run load() and remember what it returns
+        cache_key = (user_id, key)
+        with self._lock:
+            generation = self._generations.get(user_id, 0)
+            entry = self._entries.get(cache_key)
+            if entry and entry[0] == generation and entry[1] == version:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return self._copy(entry[2])
+            self.misses += 1
+
+        # Generation and version were read before querying, so a write that
+        # commits meanwhile leaves this result already stale
+        value = load()
+
+        # max_entries=0 turns the cache into a pass-through
+        if not self.max_entries or (isinstance(value, list) and len(value) > self.max_rows):
+            return value
+
+        with self._lock:
+            self._entries[cache_key] = (generation, version, value)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return self._copy(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def _copy(self, value):
+        # Callers get their own list; rows themselves are immutable
+        return list(value) if isinstance(value, list) else value
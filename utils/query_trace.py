@@ -0,0 +1,205 @@
+import inspect
+import logging
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+# Database methods that are plumbing rather than queries
+UNTRACED = {
+    'get_connection', 'release_connection', 'close',
+    'get_connection_stats', 'get_cache_stats', 'get_trace_stats',
+}
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class QueryTracer:
+    """
+    Opt-in timing of Database calls.
+
+    instrument() wraps every public Database method so each call records its
+    duration, row count and the SQL it ran (captured with the connection's
+    trace callback). Calls slower than threshold_ms are written to a rotating
+    log together with EXPLAIN QUERY PLAN for their SELECTs, once the
+    outermost traced call on the thread has returned.
+    """
+
+    def __init__(self, log_file, threshold_ms=100, max_bytes=1_000_000, backup_count=3, max_samples=1000):
+        self.threshold = threshold_ms / 1000
+        self.max_samples = max_samples
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._samples = {}  # method -> deque of recent durations (seconds)
+        self._calls = {}
+        self._slow = {}
+
+        self.logger = logging.getLogger(f"taskflow.slow_queries.{id(self)}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self._handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self._handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self.logger.addHandler(self._handler)
+
+    def attach(self, conn):
+        # Called for every new connection
+        conn.set_trace_callback(self._on_statement)
+
+    def instrument(self, db):
+        # Replace db's public methods with timed wrappers on the instance.
+        # Helpers handed a caller's connection run inside its transaction
+        # and are timed as part of the caller.
+        for name, method in inspect.getmembers(type(db), inspect.isfunction):
+            if name.startswith('_') or name in UNTRACED or inspect.isgeneratorfunction(method):
+                continue
+            if 'conn' in inspect.signature(method).parameters:
+                continue
+            setattr(db, name, self._wrap(db, name, getattr(db, name)))
+
+    def _wrap(self, db, name, method):
+        def traced(*args, **kwargs):
+            # Nested Database calls get their own frame; SQL goes to the innermost
+            frames = self._frames()
+            statements = []
+            frames.append(statements)
+            start = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                frames.pop()
+
+            self._record(name, duration, self._row_count(result), statements)
+            # Slow calls are explained once nothing on this thread is mid-transaction
+            if not frames:
+                self._log_pending(db)
+            return result
+
+        traced.__name__ = name
+        traced.__doc__ = method.__doc__
+        return traced
+
+    def _frames(self):
+        frames = getattr(self._local, 'frames', None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def _on_statement(self, sql):
+        frames = getattr(self._local, 'frames', None)
+        if not frames or sql.startswith('--') or sql == 'SELECT 1':
+            return
+        # Trigger statements arrive as "-- ..." comments; RETURNING re-reports each step
+        statements = frames[-1]
+        if not statements or statements[-1] != sql:
+            statements.append(sql)
+
+    def _row_count(self, result):
+        if result is None:
+            return 0
+        if isinstance(result, list):
+            return len(result)
+        if isinstance(result, tuple):
+            return 1
+        return None
+
+    def _record(self, name, duration, rows, statements):
+        slow = duration >= self.threshold
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.max_samples)
+            samples.append(duration)
+            self._calls[name] = self._calls.get(name, 0) + 1
+            if slow:
+                self._slow[name] = self._slow.get(name, 0) + 1
+
+        if slow:
+            pending = getattr(self._local, 'pending', None)
+            if pending is None:
+                pending = self._local.pending = []
+            pending.append((name, duration, rows, statements))
+
+    def _log_pending(self, db):
+        pending = getattr(self._local, 'pending', None)
+        if not pending:
+            return
+        self._local.pending = []
+        for name, duration, rows, statements in pending:
+            self._log_slow(db, name, duration, rows, statements)
+
+    def _log_slow(self, db, name, duration, rows, statements):
+        lines = [f"SLOW {name} {duration * 1000:.1f} ms, rows={rows}"]
+        plans = self._explain(db, statements)
+        for sql in statements:
+            lines.append(f"  SQL: {' '.join(sql.split())}")
+            for detail in plans.get(sql, []):
+                lines.append(f"    PLAN: {detail}")
+        self.logger.info("\n".join(lines))
+
+    def _explain(self, db, statements):
+        # Plans for the read statements; writes are not re-run
+        plans = {}
+        selects = [sql for sql in statements if sql.lstrip().upper().startswith(('SELECT', 'WITH'))]
+        if not selects:
+            return plans
+
+        conn = db.get_connection()
+        # Releasing would roll back a transaction the caller still has open
+        # on this thread's connection, so leave such a connection alone
+        if getattr(conn, 'in_transaction', False):
+            return {sql: ["unavailable: connection is in a transaction"] for sql in selects}
+        try:
+            for sql in selects:
+                try:
+                    plans[sql] = [row['detail'] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+                except Exception as e:
+                    plans[sql] = [f"unavailable: {e}"]
+        finally:
+            db.release_connection(conn)
+        return plans
+
+    def get_stats(self):
+        """
+        Per-method call counts and latency percentiles in milliseconds.
+
+        Percentiles cover the most recent max_samples calls of each method.
+        """
+        with self._lock:
+            snapshot = {name: sorted(samples) for name, samples in self._samples.items()}
+            calls = dict(self._calls)
+            slow = dict(self._slow)
+
+        stats = {}
+        for name, durations in snapshot.items():
+            stats[name] = {
+                'calls': calls[name],
+                'slow': slow.get(name, 0),
+                'p50_ms': percentile(durations, 50) * 1000,
+                'p95_ms': percentile(durations, 95) * 1000,
+                'p99_ms': percentile(durations, 99) * 1000,
+                'max_ms': durations[-1] * 1000,
+            }
+        return stats
+
+    def write_summary(self):
+        # Append the percentile table to the log, slowest p95 first
+        stats = self.get_stats()
+        if not stats:
+            return
+        lines = ["SUMMARY method calls slow p50_ms p95_ms p99_ms max_ms"]
+        for name, s in sorted(stats.items(), key=lambda item: item[1]['p95_ms'], reverse=True):
+            lines.append(f"  {name} {s['calls']} {s['slow']} {s['p50_ms']:.1f} {s['p95_ms']:.1f} "
+                         f"{s['p99_ms']:.1f} {s['max_ms']:.1f}")
+        self.logger.info("\n".join(lines))
+
+    def close(self):
+        self.logger.removeHandler(self._handler)
+        self._handler.close()
@@ -0,0 +1,306 @@
+import heapq
+import threading
+import time
+from datetime import datetime
+
+# Reminders are loaded this far ahead; the window reloads as it runs out
+HORIZON = 24 * 3600
+
+# Reminders firing within this many seconds of each other share one notification
+GROUP_WINDOW = 60
+
+# Past this many changed tasks, reloading the window beats patching it
+MAX_CHANGES = 500
+
+# Wait before retrying after a failed load
+RETRY_DELAY = 60
+
+# Titles listed in a grouped notification before "and N more"
+MAX_LISTED = 5
+
+# Windows notifications take at most 256 characters of message
+MAX_MESSAGE = 250
+
+# Choices offered for a task's reminder, as (label, minutes before the
+# deadline); None follows REMIND_BEFORE_MINUTES and -1 turns it off
+REMINDER_OPTIONS = [
+    ('Default', None),
+    ('Off', -1),
+    ('At deadline', 0),
+    ('15 minutes before', 15),
+    ('1 hour before', 60),
+    ('1 day before', 1440),
+    ('1 week before', 10080),
+]
+
+
+def reminder_label(minutes):
+    # Display text for a remind_before value, including ones not offered
+    for label, value in REMINDER_OPTIONS:
+        if value == minutes:
+            return label
+    return f"{minutes} minutes before"
+
+
+def reminder_minutes(label):
+    # remind_before value for reminder_label text; blank means the default
+    for text, value in REMINDER_OPTIONS:
+        if text == label:
+            return value
+    if not label:
+        return None
+    return int(label.split()[0])
+
+
+def format_due(deadline_ts, now):
+    # "14:30" for deadlines today, "Tue 14 Jan 14:30" further out
+    due = datetime.fromtimestamp(deadline_ts)
+    if due.date() == datetime.fromtimestamp(now).date():
+        return due.strftime('%H:%M')
+    return due.strftime('%a %d %b %H:%M')
+
+
+def shorten(text, width):
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+
+def format_reminders(reminders, now):
+    # (title, message) of one notification for (title, deadline_ts) pairs
+    if len(reminders) == 1:
+        title, deadline_ts = reminders[0]
+        when = "now" if deadline_ts <= now else format_due(deadline_ts, now)
+        return "TaskFlow Reminder", f"{shorten(title, MAX_MESSAGE - 30)} is due {when}"
+
+    # Share the message out between the listed titles, soonest due first
+    reminders = sorted(reminders, key=lambda reminder: reminder[1])
+    listed = reminders[:MAX_LISTED]
+    width = MAX_MESSAGE // (len(listed) + 1) - 20
+    lines = [f"{format_due(deadline_ts, now)}  {shorten(title, width)}" for title, deadline_ts in listed]
+    if len(reminders) > MAX_LISTED:
+        lines.append(f"and {len(reminders) - MAX_LISTED} more")
+    return f"TaskFlow Reminder: {len(reminders)} tasks due", "\n".join(lines)
+
+
+class ReminderScheduler:
+    """
+    Desktop reminders for the logged-in user's task deadlines.
+
+    Keeps the reminders of the next `horizon` seconds in a heap ordered by
+    firing time and sleeps until the earliest one, or until a task change
+    wakes it; changes are read from the change log and patch the heap in
+    place. Reminders firing within `group_window` seconds of each other
+    go out as one call of notify(title, message), which runs on the
+    scheduler thread.
+    """
+
+    def __init__(self, db, notify, default_before, group_window=GROUP_WINDOW, horizon=HORIZON):
+        self.db = db
+        self.notify = notify
+        self.default_before = default_before
+        self.group_window = group_window
+        self.horizon = horizon
+
+        # Requests from other threads, guarded by _cond
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._user_id = None
+        self._reload = False
+        self._changed = False
+        self._summary = False
+
+        # Schedule, touched only by the scheduler thread. Heap entries are
+        # (fire_at, task_id); one whose task is rescheduled or gone no
+        # longer matches _scheduled and is dropped when it surfaces.
+        self._heap = []
+        self._scheduled = {}
+        self._loaded_user = None
+        self._version = None
+        self._checked_at = 0
+        self._window_end = 0
+
+        # Totals for get_stats
+        self._lock = threading.Lock()
+        self.notifications = 0
+        self.reminders = 0
+        self.loads = 0
+        self.last_sent = None
+
+        db.add_change_listener(self._on_tasks_changed)
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def start(self, user_id):
+        # Schedule a user's reminders, led by a summary of what is due today
+        with self._cond:
+            self._user_id = user_id
+            self._reload = True
+            self._summary = True
+            self._cond.notify_all()
+
+    def clear(self):
+        # Drop the schedule on logout
+        with self._cond:
+            self._user_id = None
+            self._reload = True
+            self._summary = False
+            self._cond.notify_all()
+
+    def stop(self, timeout=5):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def get_stats(self):
+        with self._lock:
+            return {'scheduled': len(self._scheduled), 'notifications': self.notifications,
+                    'reminders': self.reminders, 'loads': self.loads, 'last_sent': self.last_sent}
+
+    def _on_tasks_changed(self, user_ids):
+        # Runs on the writing thread; the scheduler reads the change log itself
+        with self._cond:
+            if self._user_id in user_ids:
+                self._changed = True
+                self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not (self._stopping or self._reload or self._changed):
+                    wake_at = self._next_wake()
+                    if wake_at is None:
+                        self._cond.wait()
+                        continue
+                    wait = wake_at - time.time()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                if self._stopping:
+                    break
+                user_id = self._user_id
+                reload, self._reload = self._reload, False
+                changed, self._changed = self._changed, False
+                summary, self._summary = self._summary, False
+
+            try:
+                if user_id is None:
+                    self._unload()
+                    continue
+                if reload or user_id != self._loaded_user:
+                    self._load(user_id, fresh=True)
+                elif time.time() >= self._window_end:
+                    self._load(user_id)
+                elif changed:
+                    self._apply_changes(user_id)
+                if summary:
+                    self._send_summary(user_id)
+                self._fire_due()
+            except Exception as e:
+                print(f"Reminder Error: {e}")
+                # Start over with a full load after a pause
+                self._version = None
+                self._window_end = time.time() + RETRY_DELAY
+
+    def _next_wake(self):
+        # When the earliest live reminder fires or the window runs out
+        if self._user_id is None:
+            return None
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+        if self._heap:
+            return min(self._heap[0][0], self._window_end)
+        return self._window_end
+
+    def _is_live(self, entry):
+        fire_at, task_id = entry
+        scheduled = self._scheduled.get(task_id)
+        return scheduled is not None and scheduled[0] == fire_at
+
+    def _unload(self):
+        self._heap = []
+        self._scheduled = {}
+        self._loaded_user = None
+        self._version = None
+
+    def _load(self, user_id, fresh=False):
+        # Rebuild the schedule for the next `horizon` seconds. A fresh
+        # session starts from now; otherwise loading picks up where the
+        # last check left off, so reminders due meanwhile still fire.
+        now = time.time()
+        if fresh:
+            self._checked_at = now
+
+        # Read the version first: changes made during the load are seen again
+        version = self.db.get_change_version()
+        window_end = now + self.horizon
+        rows = self.db.get_reminders(user_id, self._checked_at, window_end, self.default_before)
+
+        self._scheduled = {row['id']: (row['fire_at'], row['title'], row['deadline_ts']) for row in rows}
+        self._heap = [(row['fire_at'], row['id']) for row in rows]
+        heapq.heapify(self._heap)
+        self._loaded_user = user_id
+        self._version = version
+        self._window_end = window_end
+
+        with self._lock:
+            self.loads += 1
+
+    def _apply_changes(self, user_id):
+        # Reschedule only the tasks changed since the last load
+        changes = self.db.get_changes_since(user_id, self._version)
+        changed_ids = changes['inserted'] + changes['updated']
+        if changes['reset'] or len(changed_ids) + len(changes['deleted']) > MAX_CHANGES:
+            self._load(user_id)
+            return
+
+        for task_id in changed_ids + changes['deleted']:
+            self._scheduled.pop(task_id, None)
+
+        # Edits reschedule from now on; a reminder time already past is skipped
+        after_ts = max(self._checked_at, time.time())
+        if changed_ids:
+            for row in self.db.get_reminders(user_id, after_ts, self._window_end, self.default_before, changed_ids):
+                self._scheduled[row['id']] = (row['fire_at'], row['title'], row['deadline_ts'])
+                heapq.heappush(self._heap, (row['fire_at'], row['id']))
+        self._version = changes['version']
+
+    def _send_summary(self, user_id):
+        tasks = self.db.get_due_today(user_id)
+        if tasks:
+            self._send("TaskFlow Reminder", f"You have {len(tasks)} task/s due or overdue today!", 0)
+
+    def _fire_due(self):
+        # Send every reminder that is due, together with those about to be
+        now = time.time()
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+        if not self._heap or self._heap[0][0] > now:
+            self._checked_at = max(self._checked_at, now)
+            return
+
+        group = []
+        checked_at = now
+        while self._heap and self._heap[0][0] <= now + self.group_window:
+            entry = heapq.heappop(self._heap)
+            if not self._is_live(entry):
+                continue
+            fire_at, title, deadline_ts = self._scheduled.pop(entry[1])
+            group.append((title, deadline_ts))
+            checked_at = max(checked_at, fire_at)
+        self._checked_at = max(self._checked_at, checked_at)
+
+        title, message = format_reminders(group, now)
+        self._send(title, message, len(group))
+
+    def _send(self, title, message, count):
+        try:
+            self.notify(title, message)
+        except Exception as e:
+            print(f"Notification failed: {e}")
+            return
+
+        with self._lock:
+            self.notifications += 1
+            self.reminders += count
+            self.last_sent = time.time()
@@ -0,0 +1,94 @@
+import queue
+import threading
+
+
+class StatusWriter:
+    """
+    Write-behind queue for task status changes.
+
+    The UI queues a change and moves on; a background thread coalesces
+    repeated moves of the same task and commits them in batches. Failures
+    are handed back to the Tk main loop through poll().
+    """
+
+    def __init__(self, db, batch_delay=0.2):
+        self.db = db
+        self.batch_delay = batch_delay
+
+        self._cond = threading.Condition()
+        self._pending = {}  # task_id -> (status, on_error)
+        self._busy = False
+        self._flushing = False
+        self._stopping = False
+        self._failures = queue.Queue()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def queue_status(self, task_id, status, on_error=None):
+        # Schedule a status change; a later change to the same task replaces it
+        with self._cond:
+            self._pending[task_id] = (status, on_error)
+            self._cond.notify_all()
+
+    def is_idle(self):
+        # True when nothing queued is still waiting to be committed
+        with self._cond:
+            return not self._pending and not self._busy
+
+    def flush(self, timeout=5):
+        # Block until everything queued so far is committed (or failed);
+        # not for the Tk thread, except at shutdown
+        with self._cond:
+            self._flushing = True
+            self._cond.notify_all()
+            done = self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+            self._flushing = False
+            return done
+
+    def stop(self, timeout=5):
+        # Commit what is left and end the worker thread
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def poll(self, widget, interval=100):
+        # Deliver failures to their callbacks on the Tk thread
+        while True:
+            try:
+                task_id, status, on_error, error = self._failures.get_nowait()
+            except queue.Empty:
+                break
+            if on_error:
+                on_error(task_id, status, error)
+            else:
+                print(f"Status Update Error (task {task_id}): {error}")
+
+        if not self._stopping:
+            widget.after(interval, self.poll, widget, interval)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending:
+                    break
+
+                # Give quick successive drops a moment to coalesce
+                if not (self._flushing or self._stopping):
+                    self._cond.wait(self.batch_delay)
+
+                batch, self._pending = self._pending, {}
+                self._busy = True
+
+            try:
+                self.db.update_statuses({task_id: status for task_id, (status, _) in batch.items()})
+            except Exception as e:
+                for task_id, (status, on_error) in batch.items():
+                    self._failures.put((task_id, status, on_error, e))
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
@@ -0,0 +1,27 @@
+from utils.worker import BatchWorker
+
+
+class TagSweeper(BatchWorker):
+    """
+    Background deletion of tags no task uses any more.
+
+    Runs once task writes settle (and on a slow timer as a backstop),
+    deleting orphans a small batch at a time. Reference counts come from
+    triggers, so finding orphans never scans task_tags.
+    """
+
+    counted = 'reclaimed'
+    report = "Tag sweep reclaimed {} orphan tag(s)"
+    error_label = "Tag Sweep"
+
+    def __init__(self, db, batch_size=200, pause=0.05, settle=30, interval=3600):
+        # The first sweep comes one settle period after startup
+        super().__init__(db, batch_size, pause=pause, delay=settle, interval=interval, settle=settle)
+        db.add_change_listener(self._on_tasks_changed)
+
+    def batch(self):
+        return self.db.sweep_orphan_tags(self.batch_size)
+
+    def _on_tasks_changed(self, user_ids):
+        # Removed links may have orphaned tags; sweep once writes go quiet
+        self.wake()
@@ -0,0 +1,69 @@
+"""
+Tag identity and tag filter parsing, shared by every storage backend.
+
+Tags are matched on a normalized key rather than their display name, so
+"Urgent", "urgent" and " URGENT " are one tag, shown as first entered.
+"""
+
+
+def tag_key(name):
+    # Case- and spacing-insensitive identity of a tag: " Deep  Work" -> "deep work"
+    return " ".join(name.split()).casefold()
+
+
+def parse_tag_filter(text):
+    """
+    Split FilterBar tag text into (key, mode).
+
+    "=urgent" matches that tag exactly and "urg*" tags starting with "urg";
+    anything else matches tags containing the text. key is empty when there
+    is nothing to filter on.
+    """
+    text = (text or "").strip()
+    if text.startswith('='):
+        return tag_key(text[1:]), 'exact'
+    if text.endswith('*'):
+        return tag_key(text[:-1]), 'prefix'
+    return tag_key(text), 'contains'
+
+
+def prefix_upper_bound(prefix):
+    # Smallest string greater than every string starting with prefix, so a
+    # prefix match is the index range key >= prefix AND key < bound
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def merge_tag_case_duplicates(cursor, placeholder='?'):
+    """
+    Fill tags.key and fold tags whose names differ only in case or spacing.
+
+    The oldest tag of each group survives; task links of the others move
+    to it. Works on a sqlite3 or psycopg2 cursor (placeholder '%s').
+    """
+    p = placeholder
+    cursor.execute("SELECT id, name FROM tags ORDER BY id")
+
+    keepers = {}
+    merges = []
+    keys = []
+    for tag_id, name in (tuple(row) for row in cursor.fetchall()):
+        key = tag_key(name)
+        if key in keepers:
+            merges.append((keepers[key], tag_id))
+        else:
+            keepers[key] = tag_id
+            keys.append((key, tag_id))
+
+    for keeper, duplicate in merges:
+        cursor.execute(
+            f"INSERT INTO task_tags (task_id, tag_id) SELECT task_id, {p} FROM task_tags "
+            f"WHERE tag_id = {p} ON CONFLICT DO NOTHING",
+            (keeper, duplicate)
+        )
+    if merges:
+        duplicates = [(duplicate,) for _, duplicate in merges]
+        cursor.executemany(f"DELETE FROM task_tags WHERE tag_id = {p}", duplicates)
+        cursor.executemany(f"DELETE FROM tags WHERE id = {p}", duplicates)
+        print(f"Merged {len(merges)} case-variant duplicate tag(s)")
+
+    cursor.executemany(f"UPDATE tags SET key = {p} WHERE id = {p}", keys)
@@ -0,0 +1,101 @@
+import threading
+import time
+
+
+class BatchWorker:
+    """
+    Base for background jobs that work through a backlog in small batches.
+
+    A subclass supplies batch(), which handles up to `batch_size` rows and
+    returns how many it did. run() repeats it until a batch comes back
+    short, pausing between batches so the UI's own writes never wait on
+    the database lock for long. The worker thread runs it `delay` seconds
+    after startup and then every `interval` seconds; wake() brings the
+    next run forward, once `settle` seconds pass without another wake().
+    """
+
+    # Key of the running total in get_stats
+    counted = 'processed'
+    # Printed after a run that did something, with the total filled in
+    report = None
+    # Prefix of the message printed when a run fails
+    error_label = "Batch Worker"
+
+    def __init__(self, db, batch_size, pause=0.05, delay=60, interval=3600, settle=0):
+        self.db = db
+        self.batch_size = batch_size
+        self.pause = pause
+        self.delay = delay
+        self.interval = interval
+        self.settle = settle
+
+        self._cond = threading.Condition()
+        self._woken = False
+        self._stopping = False
+
+        # Totals for get_stats
+        self._lock = threading.Lock()
+        self.total = 0
+        self.runs = 0
+        self.last_run = None
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def batch(self):
+        raise NotImplementedError
+
+    def run(self):
+        # Work batches until none are left; returns how many rows they handled
+        total = 0
+        while not self._stopping:
+            done = self.batch()
+            total += done
+            if done < self.batch_size:
+                break
+            time.sleep(self.pause)
+
+        with self._lock:
+            self.total += total
+            self.runs += 1
+            self.last_run = time.time()
+        return total
+
+    def wake(self):
+        with self._cond:
+            self._woken = True
+            self._cond.notify_all()
+
+    def stop(self, timeout=5):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def get_stats(self):
+        with self._lock:
+            return {self.counted: self.total, 'runs': self.runs, 'last_run': self.last_run}
+
+    def _run(self):
+        # Keep out of the way of the first page loads after startup
+        wait = self.delay
+        while True:
+            with self._cond:
+                if not self._woken:
+                    self._cond.wait(wait)
+
+                # Let a burst of wakes finish first; each new one restarts the wait
+                while self._woken and not self._stopping:
+                    self._woken = False
+                    self._cond.wait(self.settle)
+
+                if self._stopping:
+                    break
+            wait = self.interval
+
+            try:
+                total = self.run()
+                if total and self.report:
+                    print(self.report.format(total))
+            except Exception as e:
+                print(f"{self.error_label} Error: {e}")